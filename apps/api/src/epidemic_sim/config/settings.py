@@ -23,6 +23,11 @@ class ApiSettings(BaseSettings):
     redis_url: AnyUrl = Field(..., alias="REDIS_URL")
     supabase_service_role_key: str = Field(..., alias="SUPABASE_SERVICE_ROLE_KEY")
     clerk_jwks_url: HttpUrl = Field(..., alias="CLERK_JWKS_URL")
+    jwks_cache_ttl_seconds: int = Field(default=3600, ge=1, alias="JWKS_CACHE_TTL_SECONDS")
+    jwks_refetch_interval_seconds: int = Field(
+        default=30, ge=0, alias="JWKS_REFETCH_INTERVAL_SECONDS"
+    )
+    auth_token_cache_size: int = Field(default=4096, ge=0, alias="AUTH_TOKEN_CACHE_SIZE")
     sentry_dsn: HttpUrl | None = Field(default=None, alias="SENTRY_DSN")
     otel_exporter_otlp_endpoint: str | None = Field(
         default=None, alias="OTEL_EXPORTER_OTLP_ENDPOINT"
@@ -34,6 +39,11 @@ class ApiSettings(BaseSettings):
     rate_limit_per_minute: int = Field(default=120, ge=1, alias="RATE_LIMIT_PER_MINUTE")
     idempotency_ttl_seconds: int = Field(default=3600, ge=1, alias="IDEMPOTENCY_TTL_SECONDS")
     run_frame_stream_buffer: int = Field(default=256, ge=1, alias="RUN_FRAME_STREAM_BUFFER")
+    response_cache_ttl_seconds: int = Field(default=3600, ge=1, alias="RESPONSE_CACHE_TTL_SECONDS")
+    response_cache_max_entries: int = Field(default=2048, ge=1, alias="RESPONSE_CACHE_MAX_ENTRIES")
+    response_cache_max_bytes: int = Field(
+        default=8 * 1024 * 1024, ge=0, alias="RESPONSE_CACHE_MAX_BYTES"
+    )
 
 
 @lru_cache(maxsize=1)
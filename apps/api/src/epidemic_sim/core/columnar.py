@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+# Mirrors the worker's ``epidemic_sim_worker.columnar`` chunk format; the API only decodes.
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<I")
+
+
+@dataclass(frozen=True)
+class SeriesChunk:
+    t: list[int]
+    region_ids: list[str]
+    fields: list[str]
+    # Shaped (frames, fields, regions).
+    values: np.ndarray
+
+    def frame(self, index: int) -> dict[str, list[float]]:
+        """Field -> per-region values of the ``index``-th frame in the chunk."""
+
+        return dict(zip(self.fields, self.values[index].tolist(), strict=True))
+
+
+def decode_chunk(payload: bytes) -> SeriesChunk:
+    raw = zlib.decompress(payload)
+    (size,) = _HEADER.unpack_from(raw)
+    header = json.loads(raw[_HEADER.size : _HEADER.size + size])
+    if header["version"] != FORMAT_VERSION:
+        raise ValueError(f"unsupported chunk format version {header['version']}")
+    # Undo the byte shuffle: plane k holds byte k of every value.
+    dtype = np.dtype(header["dtype"])
+    planes = np.frombuffer(raw, dtype=np.uint8, offset=_HEADER.size + size)
+    values = np.ascontiguousarray(planes.reshape(dtype.itemsize, -1).T).view(dtype)
+    return SeriesChunk(
+        t=header["t"],
+        region_ids=header["regions"],
+        fields=header["fields"],
+        values=values.reshape(header["shape"]),
+    )
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
@@ -28,3 +29,14 @@ async def get_session() -> AsyncIterator[AsyncSession]:
     assert _session_factory is not None
     async with _session_factory() as session:
         yield session
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[AsyncSession]:
+    """Session outside request scope, e.g. inside streaming responses that outlive dependencies."""
+
+    if _session_factory is None:
+        init_engine()
+    assert _session_factory is not None
+    async with _session_factory() as session:
+        yield session
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import numpy as np
+
+# Packed frames: a 16-byte little-endian header followed by (fields, regions) values. Region ids
+# travel once per stream in the run's frame index instead of in every frame.
+FRAME_FIELDS = ("S", "E", "I", "R", "D", "new_cases", "rt")
+PACKED_MAGIC = b"EF"
+PACKED_VERSION = 1
+FLAG_DELTA = 1
+
+_HEADER = struct.Struct("<2sBBcB2xiI")  # magic, version, flags, typecode, fields, t, regions
+_DTYPES = {b"d": "<f8", b"f": "<f4", b"i": "<i4", b"h": "<i2", b"b": "<i1"}
+_INT_TYPECODES = (b"b", b"h", b"i")
+_PAYLOAD_KEYS = ("S", "E", "I", "R", "D", "newCases", "rt")
+
+
+def stream_key(run_id: str) -> str:
+    """Capped Redis Stream the worker appends every frame of a run to."""
+
+    return f"run:{run_id}:frames"
+
+
+def index_key(run_id: str) -> str:
+    return f"run:{run_id}:index"
+
+
+@dataclass(frozen=True)
+class Frame:
+    t: int
+    values: np.ndarray  # (fields, regions) in ``FRAME_FIELDS`` order
+    region_ids: list[str] | None = None
+
+
+def pack_frame(t: int, values: np.ndarray, typecode: bytes = b"d", flags: int = 0) -> bytes:
+    body = np.ascontiguousarray(values, dtype=_DTYPES[typecode])
+    fields, regions = body.shape
+    header = _HEADER.pack(PACKED_MAGIC, PACKED_VERSION, flags, typecode, fields, t, regions)
+    return header + body.tobytes()
+
+
+def unpack_frame(payload: bytes) -> tuple[Frame, int, bytes]:
+    """Frame with its raw wire values, plus the header flags and typecode."""
+
+    magic, version, flags, typecode, fields, t, regions = _HEADER.unpack_from(payload)
+    if magic != PACKED_MAGIC or version != PACKED_VERSION:
+        raise ValueError("not a packed frame")
+    values = np.frombuffer(payload, dtype=_DTYPES[typecode], offset=_HEADER.size)
+    return Frame(t=t, values=values.reshape(fields, regions)), flags, typecode
+
+
+def parse_frame(message: bytes | str) -> Frame:
+    """Frame from a worker publish, either a packed frame or the JSON payload."""
+
+    if isinstance(message, bytes) and message.startswith(PACKED_MAGIC):
+        frame, flags, typecode = unpack_frame(message)
+        if flags & FLAG_DELTA or typecode in _INT_TYPECODES:
+            raise ValueError("worker frames carry absolute values")
+        return frame
+    payload = json.loads(message)
+    series = payload["series"]
+    values = np.array(
+        [[point.get(key) or 0.0 for point in series] for key in _PAYLOAD_KEYS], dtype=np.float64
+    )
+    return Frame(
+        t=int(payload["t"]),
+        values=values,
+        region_ids=[point["regionId"] for point in series],
+    )
+
+
+def frame_json(
+    run_id: str,
+    frame: Frame,
+    region_ids: list[str],
+    fields: tuple[str, ...] = FRAME_FIELDS,
+) -> dict[str, Any]:
+    """JSON frame message; ``fields`` names the rows of ``frame.values``."""
+
+    keys = ("regionId", *(_PAYLOAD_KEYS[FRAME_FIELDS.index(field)] for field in fields))
+    return {
+        "runId": run_id,
+        "t": frame.t,
+        "series": [
+            dict(zip(keys, cell, strict=True))
+            for cell in zip(region_ids, *frame.values.tolist(), strict=True)
+        ],
+        "perf": {"stepsPerSecond": 0.0},
+    }
+
+
+class PackedFrameEncoder:
+    """Per-connection packed encoder with optional quantization and deltas.
+
+    With ``quantum`` every value is sent as an integer multiple of it, in the narrowest integer
+    type that fits; with ``delta`` as well, frames after the first carry the change since the
+    previous one, which usually fits 8 or 16 bits. Frames too large to quantize go out as full
+    float frames and restart the delta chain.
+    """
+
+    def __init__(
+        self,
+        precision: Literal["f8", "f4"] = "f8",
+        quantum: float | None = None,
+        delta: bool = False,
+    ) -> None:
+        if delta and quantum is None:
+            raise ValueError("delta frames need a quantum")
+        self._float_typecode = b"d" if precision == "f8" else b"f"
+        self._quantum = quantum
+        self._delta = delta
+        self._previous: np.ndarray | None = None
+
+    def encode(self, frame: Frame) -> bytes:
+        if self._quantum is None:
+            return pack_frame(frame.t, frame.values, self._float_typecode)
+        quantized = np.rint(np.asarray(frame.values, dtype=np.float64) / self._quantum)
+        limit = np.iinfo(np.int32).max
+        if not np.isfinite(quantized).all() or np.abs(quantized).max(initial=0) > limit:
+            self._previous = None
+            return pack_frame(frame.t, frame.values, b"d")
+        quantized = quantized.astype(np.int64)
+        previous, self._previous = self._previous, quantized if self._delta else None
+        if previous is not None:
+            change = quantized - previous
+            typecode = _narrowest(change)
+            if typecode is not None:
+                return pack_frame(frame.t, change, typecode, FLAG_DELTA)
+        return pack_frame(frame.t, quantized, _narrowest(quantized) or b"i")
+
+
+def _narrowest(values: np.ndarray) -> bytes | None:
+    low, high = (int(values.min()), int(values.max())) if values.size else (0, 0)
+    for typecode in _INT_TYPECODES:
+        info = np.iinfo(_DTYPES[typecode])
+        if info.min <= low and high <= info.max:
+            return typecode
+    return None
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Registered on the default registry, which the instrumentator serves at ``{api_prefix}/metrics``.
+STREAM_SUBSCRIBERS = Gauge("run_stream_subscribers", "SSE clients attached to live run feeds.")
+STREAM_DROPPED_FRAMES = Counter(
+    "run_stream_dropped_frames_total",
+    "Frames conflated away because a stream client fell behind.",
+    ["policy"],
+)
+STREAM_QUEUE_DEPTH = Histogram(
+    "run_stream_queue_depth",
+    "Frames still queued for a stream client when it takes the next one.",
+    buckets=(0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+STREAM_LAG_SECONDS = Histogram(
+    "run_stream_lag_seconds",
+    "Time from a frame entering the run stream to its hand-off to a stream client.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
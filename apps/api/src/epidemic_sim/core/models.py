@@ -3,7 +3,18 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, Integer, MetaData, String, UniqueConstraint
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column, relationship
 
@@ -73,6 +84,8 @@ class Scenarios(Base):
     pathogen_id: Mapped[str] = mapped_column(ForeignKey("pathogens.id"))
     datasets: Mapped[list[dict[str, Any]]] = mapped_column(JSONB)
     npi_catalog: Mapped[list[dict[str, Any]]] = mapped_column(JSONB)
+    npi_timeline: Mapped[list[dict[str, Any]]] = mapped_column(JSONB)
+    engine: Mapped[dict[str, Any]] = mapped_column(JSONB)
 
 
 class Runs(Base):
@@ -87,6 +100,9 @@ class Runs(Base):
     started_at: Mapped[datetime | None] = mapped_column(DateTime)
     finished_at: Mapped[datetime | None] = mapped_column(DateTime)
     metrics_summary: Mapped[dict[str, Any] | None] = mapped_column(JSONB)
+    fingerprint: Mapped[str | None] = mapped_column(String, index=True)
+    # Set on runs deduplicated against an earlier run: the run whose series they serve.
+    results_run_id: Mapped[str | None] = mapped_column(ForeignKey("runs.id"))
 
 
 class RunSeries(Base):
@@ -115,3 +131,16 @@ class Artifacts(Base):
     kind: Mapped[str] = mapped_column(String)
     storage_path: Mapped[str] = mapped_column(String)
     bytes: Mapped[int] = mapped_column(Integer)
+
+
+class RunSeriesChunks(Base):
+    __tablename__ = "run_series_chunks"
+    __table_args__ = (UniqueConstraint("run_id", "t_start", name="uq_run_series_chunks"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_id: Mapped[str] = mapped_column(ForeignKey("runs.id"), index=True)
+    artifact_id: Mapped[str] = mapped_column(ForeignKey("artifacts.id"))
+    t_start: Mapped[int] = mapped_column(Integer)
+    t_end: Mapped[int] = mapped_column(Integer)
+    frames: Mapped[int] = mapped_column(Integer)
+    payload: Mapped[bytes] = mapped_column(LargeBinary)
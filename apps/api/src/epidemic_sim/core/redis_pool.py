@@ -6,6 +6,7 @@ import redis
 from epidemic_sim.config.settings import get_settings
 
 _async_client: redis_async.Redis | None = None
+_async_binary_client: redis_async.Redis | None = None
 _sync_client: redis.Redis | None = None
 
 
@@ -19,6 +20,16 @@ def get_redis() -> redis_async.Redis:
     return _async_client
 
 
+def get_binary_redis() -> redis_async.Redis:
+    """Async client that leaves payloads as bytes, for packed frames on the run channels."""
+
+    global _async_binary_client
+    if _async_binary_client is None:
+        settings = get_settings()
+        _async_binary_client = redis_async.from_url(str(settings.redis_url))
+    return _async_binary_client
+
+
 def get_sync_redis() -> redis.Redis:
     global _sync_client
     if _sync_client is None:
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections.abc import AsyncIterator
+
+from redis.exceptions import RedisError
+
+from epidemic_sim.config.settings import get_settings
+from epidemic_sim.core.logging import get_logger
+from epidemic_sim.core.redis_pool import get_binary_redis
+
+_logger = get_logger(__name__)
+
+_KEY_PREFIX = "response-cache:"
+# Sorted set of cached keys scored by last access, for least-recently-used eviction.
+_RECENCY_KEY = "response-cache:recency"
+
+# Responses of finished runs are private to their owner but never change.
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def strong_etag(*parts: object) -> str:
+    digest = hashlib.sha256("\x1f".join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """``If-None-Match`` check; weak validators match too, as RFC 9110 allows for GET."""
+
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def _key(key: str) -> str:
+    return f"{_KEY_PREFIX}{key}"
+
+
+async def cache_get(key: str) -> bytes | None:
+    """Cached body, refreshing its TTL and recency; misses and Redis errors return None."""
+
+    client = get_binary_redis()
+    settings = get_settings()
+    try:
+        body = await client.getex(_key(key), ex=settings.response_cache_ttl_seconds)
+        if body is not None:
+            await client.zadd(_RECENCY_KEY, {_key(key): time.time()})
+    except RedisError as exc:
+        _logger.warning("response_cache.get_failed", key=key, error=str(exc))
+        return None
+    return body
+
+
+async def cache_set(key: str, body: bytes) -> None:
+    """Store ``body`` for the TTL, evicting least recently used entries past the size cap.
+
+    Bodies over ``response_cache_max_bytes`` are not cached.
+    """
+
+    client = get_binary_redis()
+    settings = get_settings()
+    if len(body) > settings.response_cache_max_bytes:
+        return
+    now = time.time()
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.set(_key(key), body, ex=settings.response_cache_ttl_seconds)
+            pipe.zadd(_RECENCY_KEY, {_key(key): now})
+            # Entries idle for a whole TTL have already expired.
+            pipe.zremrangebyscore(_RECENCY_KEY, 0, now - settings.response_cache_ttl_seconds)
+            pipe.zcard(_RECENCY_KEY)
+            *_, size = await pipe.execute()
+        excess = size - settings.response_cache_max_entries
+        if excess > 0:
+            evicted = [member for member, _ in await client.zpopmin(_RECENCY_KEY, excess)]
+            await client.delete(*evicted)
+    except RedisError as exc:
+        _logger.warning("response_cache.set_failed", key=key, error=str(exc))
+
+
+async def cache_delete(key: str) -> None:
+    client = get_binary_redis()
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.delete(_key(key))
+            pipe.zrem(_RECENCY_KEY, _key(key))
+            await pipe.execute()
+    except RedisError as exc:
+        _logger.warning("response_cache.delete_failed", key=key, error=str(exc))
+
+
+async def cache_stream(key: str, body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Pass ``body`` through, caching it once complete unless it outgrows the size cap."""
+
+    limit = get_settings().response_cache_max_bytes
+    parts: list[bytes] | None = []
+    size = 0
+    async for part in body:
+        if parts is not None:
+            size += len(part)
+            if size <= limit:
+                parts.append(part)
+            else:
+                parts = None
+        yield part
+    if parts is not None:
+        await cache_set(key, b"".join(parts))
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
 from functools import lru_cache
-from typing import Annotated
+from typing import Annotated, Any
 
 import httpx
 from fastapi import Header, Query
+from jwt import PyJWTError, get_unverified_header
 from jwt import decode as jwt_decode
-from jwt import get_unverified_header
 from jwt.algorithms import RSAAlgorithm
 
 from epidemic_sim.config.settings import get_settings
 from epidemic_sim.core.errors import ApiError
+from epidemic_sim.core.logging import get_logger
+
+_logger = get_logger(__name__)
+
+# The JWKS only serves RSA keys, so tokens may not pick any other algorithm.
+_ALGORITHMS = ("RS256", "RS384", "RS512")
 
 
 class AuthContext:
@@ -19,19 +29,120 @@ class AuthContext:
         self.email = email
 
 
+class JwksCache:
+    """Signing keys from a JWKS endpoint, parsed once and refreshed ahead of expiry.
+
+    Keys are trusted for ``ttl`` seconds. Past half of that, lookups start a background refresh
+    and keep answering from the current keys. Once they expire, the caller that refreshes waits
+    while concurrent ones keep using the stale set. An unknown ``kid`` (keys were rotated)
+    refetches right away. Attempts, failed or not, are spaced at least ``min_refetch`` seconds
+    apart, so made-up kids and an unreachable endpoint cannot stall requests on repeated fetches.
+    """
+
+    def __init__(self, url: str, ttl: float, min_refetch: float) -> None:
+        self._url = url
+        self._ttl = ttl
+        self._min_refetch = min_refetch
+        self._keys: dict[str, Any] = {}
+        self._fetched_at = float("-inf")
+        self._attempted_at = float("-inf")
+        self._lock = asyncio.Lock()
+        self._refresh: asyncio.Task[None] | None = None
+
+    async def _fetch(self) -> None:
+        async with httpx.AsyncClient(timeout=5) as client:
+            response = await client.get(self._url)
+            response.raise_for_status()
+        self._keys = {
+            jwk["kid"]: RSAAlgorithm.from_jwk(jwk)
+            for jwk in response.json().get("keys", [])
+            if "kid" in jwk and jwk.get("kty") == "RSA"
+        }
+        self._fetched_at = time.monotonic()
+        _logger.info("jwks.refreshed", keys=len(self._keys))
+
+    async def _refetch(self, wait: bool) -> None:
+        # Callers holding usable keys never queue behind a fetch that is already running.
+        if not wait and self._keys and self._lock.locked():
+            return
+        async with self._lock:
+            # Whoever waited finds the attempt it queued behind too recent to repeat.
+            if time.monotonic() - self._attempted_at < self._min_refetch:
+                return
+            self._attempted_at = time.monotonic()
+            try:
+                await self._fetch()
+            except (httpx.HTTPError, ValueError) as exc:
+                _logger.warning("jwks.refresh_failed", error=str(exc))
+
+    async def get(self, kid: str) -> Any | None:
+        age = time.monotonic() - self._fetched_at
+        if age >= self._ttl:
+            await self._refetch(wait=False)
+        elif age >= self._ttl / 2 and (self._refresh is None or self._refresh.done()):
+            self._refresh = asyncio.create_task(self._refetch(wait=False))
+        key = self._keys.get(kid)
+        if key is None:
+            # A fetch in flight may bring the kid, so wait for it rather than start another. The
+            # kid comes from an unverified token, so a failed lookup is a 401, never a 500.
+            await self._refetch(wait=True)
+            key = self._keys.get(kid)
+        return key
+
+
+class VerifiedTokenCache:
+    """LRU of already verified tokens, keyed by their SHA-256 and kept until ``exp``."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[AuthContext, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> AuthContext | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        context, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return context
+
+    def put(self, token: str, context: AuthContext, expires_at: float) -> None:
+        if self._maxsize == 0:
+            return
+        self._entries[self._key(token)] = (context, expires_at)
+        self._entries.move_to_end(self._key(token))
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+
 @lru_cache(maxsize=1)
-async def fetch_jwks() -> dict[str, dict[str, str]]:
+def get_jwks_cache() -> JwksCache:
     settings = get_settings()
-    async with httpx.AsyncClient(timeout=5) as client:
-        response = await client.get(str(settings.clerk_jwks_url))
-        response.raise_for_status()
-        jwks = response.json()
-        return {key["kid"]: key for key in jwks.get("keys", [])}
+    return JwksCache(
+        str(settings.clerk_jwks_url),
+        ttl=settings.jwks_cache_ttl_seconds,
+        min_refetch=settings.jwks_refetch_interval_seconds,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_token_cache() -> VerifiedTokenCache:
+    return VerifiedTokenCache(get_settings().auth_token_cache_size)
 
 
 async def resolve_auth(
-    authorization: Annotated[str | None, Header(alias="Authorization")],
-    token: Annotated[str | None, Query(alias="token", default=None)],
+    authorization: Annotated[str | None, Header(alias="Authorization")] = None,
+    token: Annotated[str | None, Query(alias="token")] = None,
 ) -> AuthContext:
     raw_token: str | None = None
     if authorization:
@@ -45,23 +156,36 @@ async def resolve_auth(
     if not raw_token:
         raise ApiError(code="auth.required", title="Authentication required", status_code=401)
 
-    jwks = await fetch_jwks()
-    header = get_unverified_header(raw_token)
+    tokens = get_token_cache()
+    cached = tokens.get(raw_token)
+    if cached is not None:
+        return cached
+
+    try:
+        header = get_unverified_header(raw_token)
+    except PyJWTError as exc:
+        raise ApiError(code="auth.invalid_token", title="Invalid token", status_code=401) from exc
     kid = header.get("kid")
     if not kid:
         raise ApiError(code="auth.missing_kid", title="Missing key identifier", status_code=401)
-    jwk = jwks.get(kid)
-    if not jwk:
+    public_key = await get_jwks_cache().get(kid)
+    if public_key is None:
         raise ApiError(code="auth.unknown_key", title="Unknown signing key", status_code=401)
 
-    public_key = RSAAlgorithm.from_jwk(jwk)
-    payload = jwt_decode(
-        raw_token,
-        key=public_key,
-        algorithms=[header.get("alg", "RS256")],
-        options={"verify_aud": False},
-    )
+    try:
+        payload = jwt_decode(
+            raw_token,
+            key=public_key,
+            algorithms=list(_ALGORITHMS),
+            options={"verify_aud": False},
+        )
+    except PyJWTError as exc:
+        raise ApiError(code="auth.invalid_token", title="Invalid token", status_code=401) from exc
     sub = payload.get("sub")
     if not sub:
         raise ApiError(code="auth.invalid_token", title="Invalid token", status_code=401)
-    return AuthContext(sub=sub, email=payload.get("email"))
+    context = AuthContext(sub=sub, email=payload.get("email"))
+    # Tokens without an expiry are verified every time rather than trusted indefinitely.
+    if isinstance(payload.get("exp"), int | float):
+        tokens.put(raw_token, context, float(payload["exp"]))
+    return context
@@ -1,15 +1,34 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from epidemic_sim.core.db import get_session
 from epidemic_sim.core.errors import ApiError
 from epidemic_sim.core.idempotency import check_idempotency, store_idempotency
+from epidemic_sim.core.response_cache import (
+    IMMUTABLE_CACHE_CONTROL,
+    cache_get,
+    cache_set,
+    cache_stream,
+    etag_matches,
+    strong_etag,
+)
 from epidemic_sim.core.security import AuthContext, resolve_auth
-from epidemic_sim.schemas.dto import PaginatedResponse, Run, RunCreateRequest
+from epidemic_sim.schemas.dto import (
+    PaginatedResponse,
+    Run,
+    RunCreateRequest,
+    RunSeriesAggregate,
+    SeriesField,
+    SeriesQuery,
+)
 from epidemic_sim.services import run_series as run_series_service
 from epidemic_sim.services import runs as run_service
+from epidemic_sim.services import series_query as series_query_service
 
 router = APIRouter(prefix="/runs", tags=["runs"])
 
@@ -40,15 +59,26 @@ async def create_run_endpoint(
     return run
 
 
+def _immutable_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+
+
 @router.get("/{run_id}", response_model=Run)
 async def get_run(
     run_id: str,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
     auth: AuthContext = Depends(resolve_auth),
     session: AsyncSession = Depends(get_session),
-) -> Run:
+) -> Run | Response:
     run = await run_service.get_run(session, auth.sub, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
+    if run.status == "completed":
+        headers = _immutable_headers(strong_etag(run.id, run.finished_at))
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
     return run
 
 
@@ -56,16 +86,121 @@ async def get_run(
 async def get_run_frames(
     run_id: str,
     cursor: int | None = None,
-    limit: int = 100,
+    limit: int = Query(default=100, ge=1, le=1000),
+    regions: list[str] | None = Query(default=None),
+    t_from: int | None = None,
+    t_to: int | None = None,
+    precision: Literal["f8", "f4"] = "f8",
+    accept: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
     auth: AuthContext = Depends(resolve_auth),
     session: AsyncSession = Depends(get_session),
-) -> PaginatedResponse:
+) -> Response:
+    """Whole frames in time order; ``limit`` counts frames, not region rows.
+
+    ``regions`` (repeatable) narrows every frame's series and ``t_from``/``t_to`` bound ``t``
+    inclusively. ``nextCursor`` is the last frame's ``t`` while more frames may follow.
+    Clients accepting ``PACKED_FRAMES_MEDIA_TYPE`` get the page as packed ``precision`` frames
+    instead, streamed as it is read; a page of ``limit`` frames means more may follow.
+
+    Pages of completed runs never change: they carry a strong ETag and immutable caching
+    headers, and are served from the response cache after the first read.
+    """
+
     run = await run_service.get_run(session, auth.sub, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
-    frames = await run_series_service.list_frames(session, run_id, limit=limit, cursor=cursor)
-    next_cursor = frames[-1].t if frames else None
-    return PaginatedResponse(
+    packed = bool(accept and run_series_service.PACKED_FRAMES_MEDIA_TYPE in accept)
+    media_type = run_series_service.PACKED_FRAMES_MEDIA_TYPE if packed else "application/json"
+    headers = {"Vary": "Accept"}
+    cache_key: str | None = None
+    if run.status == "completed":
+        etag = strong_etag(
+            run.id, run.finished_at, media_type, precision, cursor, limit, regions, t_from, t_to
+        )
+        headers.update(_immutable_headers(etag))
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        cache_key = f"frames:{run_id}:" + etag.strip('"')
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return Response(cached, media_type=media_type, headers=headers)
+
+    if packed:
+        body = run_series_service.iter_packed_frames(
+            run_id,
+            limit=limit,
+            cursor=cursor,
+            region_ids=regions,
+            t_from=t_from,
+            t_to=t_to,
+            precision=precision,
+            results_run_id=run.results_run_id,
+        )
+        if cache_key is not None:
+            body = cache_stream(cache_key, body)
+        return StreamingResponse(body, media_type=media_type, headers=headers)
+    frames = await run_series_service.list_frames(
+        session,
+        run_id,
+        limit=limit,
+        cursor=cursor,
+        region_ids=regions,
+        t_from=t_from,
+        t_to=t_to,
+        results_run_id=run.results_run_id,
+    )
+    next_cursor = frames[-1].t if len(frames) == limit else None
+    page = PaginatedResponse(
         items=[frame.model_dump() for frame in frames],
         next_cursor=str(next_cursor) if next_cursor is not None else None,
     )
+    content = page.model_dump_json(by_alias=True).encode()
+    if cache_key is not None:
+        await cache_set(cache_key, content)
+    return Response(content, media_type=media_type, headers=headers)
+
+
+@router.get("/{run_id}/series", response_model=RunSeriesAggregate)
+async def get_run_series(
+    run_id: str,
+    fields: list[SeriesField] = Query(default=["S", "E", "I", "R", "D"]),
+    agg: Literal["sum", "mean"] = "sum",
+    group: list[str] | None = Query(default=None),
+    step: int = Query(default=1, ge=1),
+    t_from: int | None = None,
+    t_to: int | None = None,
+    points: int | None = Query(default=None, ge=3, le=5000),
+    auth: AuthContext = Depends(resolve_auth),
+    session: AsyncSession = Depends(get_session),
+) -> RunSeriesAggregate:
+    """Series aggregated across regions, for charts that need curves rather than frames.
+
+    Each repeatable ``group`` is ``label:region,region,...``; without one, every region is summed
+    (or averaged) into a single ``all`` group. ``step`` keeps one frame per ``step`` days and
+    ``points`` downsamples each series with LTTB.
+    """
+
+    run = await run_service.get_run(session, auth.sub, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    groups: dict[str, list[str]] | None = None
+    if group:
+        groups = {}
+        for spec in group:
+            label, separator, regions = spec.partition(":")
+            if not separator or not label or not regions:
+                raise HTTPException(status_code=422, detail=f"Invalid group {spec!r}")
+            groups[label] = regions.split(",")
+    query = SeriesQuery(
+        fields=fields,
+        agg=agg,
+        groups=groups,
+        step=step,
+        t_from=t_from,
+        t_to=t_to,
+        points=points,
+    )
+    return await series_query_service.aggregate_series(
+        session, run_id, query, results_run_id=run.results_run_id
+    )
@@ -1,46 +1,256 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import json
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+import redis.asyncio as redis_async
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sse_starlette.sse import EventSourceResponse
 
-from epidemic_sim.core.redis_pool import get_redis
+from epidemic_sim.config.settings import get_settings
+from epidemic_sim.core.db import get_session, session_scope
+from epidemic_sim.core.errors import ApiError
+from epidemic_sim.core.frames import (
+    FRAME_FIELDS,
+    PACKED_MAGIC,
+    PackedFrameEncoder,
+    frame_json,
+    index_key,
+)
+from epidemic_sim.core.logging import get_logger
+from epidemic_sim.core.redis_pool import get_binary_redis
 from epidemic_sim.core.security import AuthContext, resolve_auth
+from epidemic_sim.schemas.dto import FrameSubscription, SeriesField
 from epidemic_sim.services import runs as run_service
-from epidemic_sim.core.db import get_session
-from sqlalchemy.ext.asyncio import AsyncSession
+from epidemic_sim.services.frame_stream import FrameSelector, get_frame_hub, replay_frames
 
 router = APIRouter(prefix="/runs", tags=["run-stream"])
+LOGGER = get_logger(__name__)
+
+
+async def _index_regions(redis: redis_async.Redis, run_id: str) -> list[str] | None:
+    """Region order of a run's packed frames, from the index the worker stores."""
+
+    index = await redis.get(index_key(run_id))
+    if index is None:
+        LOGGER.warning("stream.index_missing", run_id=run_id)
+        return None
+    return json.loads(index)["regions"]
 
 
 @router.get("/{run_id}/stream")
 async def stream_run_frames(
     run_id: str,
+    format: Literal["json", "packed"] = "json",
+    precision: Literal["f8", "f4"] = "f8",
+    quantum: float | None = Query(default=None, gt=0),
+    delta: bool = False,
+    conflate: Literal["latest", "stride"] = "latest",
+    stride: int = Query(default=2, ge=2),
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+    resume_from: str | None = Query(default=None, alias="lastEventId"),
     auth: AuthContext = Depends(resolve_auth),
     session: AsyncSession = Depends(get_session),
 ) -> EventSourceResponse:
+    """Live frames as SSE ``frame`` events, replaying what the client missed first.
+
+    Every frame carries an event id, so reconnecting with ``Last-Event-ID`` (or ``lastEventId``
+    for clients that reconnect by hand) resumes right after it; new clients start from the first
+    frame. ``format=packed`` sends base64 packed frames (see ``core.frames``) after a single
+    ``index`` event naming the regions and fields; ``precision``, ``quantum`` and ``delta`` tune
+    them. A client that falls ``run_frame_stream_buffer`` frames behind skips frames per
+    ``conflate``: ``latest`` keeps the newest, ``stride`` keeps every ``stride``-th. An ``end``
+    event follows the run's last frame.
+    """
+
     run = await run_service.get_run(session, auth.sub, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
+    if delta and quantum is None:
+        raise HTTPException(status_code=422, detail="delta frames need a quantum")
 
-    redis = get_redis()
-    pubsub = redis.pubsub()
-    channel = f"run:{run_id}:frames"
-    await pubsub.subscribe(channel)
+    redis = get_binary_redis()
+    settings = get_settings()
+    encoder = PackedFrameEncoder(precision, quantum, delta) if format == "packed" else None
+    results_id = run_service.results_id(run)
+    events = replay_frames(
+        redis,
+        get_frame_hub(),
+        results_id,
+        last_event_id or resume_from,
+        settings.run_frame_stream_buffer,
+        policy=conflate,
+        stride=stride,
+        status=run.status,
+    )
 
     async def event_generator():
+        region_ids: list[str] | None = None
         try:
-            async for message in pubsub.listen():
-                if message["type"] != "message":
+            async for event in events:
+                if event.end:
+                    yield {"event": "end", "data": ""}
+                    return
+                message = event.message
+                # Aliased runs re-render frames, as stored JSON names the run that produced them.
+                passthrough = encoder is None and run.results_run_id is None
+                if passthrough and message is not None and not message.startswith(PACKED_MAGIC):
+                    yield {"event": "frame", "id": event.event_id, "data": message.decode()}
                     continue
-                data = message["data"]
-                yield {
-                    "event": "frame",
-                    "data": data if isinstance(data, str) else json.dumps(data),
-                }
+
+                frame = event.decoded
+                if region_ids is None:
+                    region_ids = frame.region_ids
+                    if region_ids is None:
+                        region_ids = await _index_regions(redis, results_id)
+                        if region_ids is None:
+                            continue
+                    if encoder is not None:
+                        index_event = {
+                            "regions": region_ids,
+                            "fields": list(FRAME_FIELDS),
+                            "quantum": quantum,
+                        }
+                        yield {"event": "index", "data": json.dumps(index_event)}
+                if encoder is None:
+                    payload = json.dumps(frame_json(run_id, frame, region_ids))
+                else:
+                    payload = base64.b64encode(encoder.encode(frame)).decode()
+                yield {"event": "frame", "id": event.event_id, "data": payload}
         finally:
-            await pubsub.unsubscribe(channel)
-            await pubsub.close()
+            await events.aclose()
 
     return EventSourceResponse(event_generator())
+
+
+async def _receive_subscriptions(websocket: WebSocket, selector: FrameSelector) -> None:
+    while True:
+        message = await websocket.receive_text()
+        try:
+            selector.update(FrameSubscription.model_validate_json(message))
+        except ValidationError as exc:
+            errors = json.loads(exc.json(include_url=False))
+            await websocket.send_json({"type": "error", "errors": errors})
+
+
+@router.websocket("/{run_id}/ws")
+async def stream_run_frames_ws(
+    websocket: WebSocket,
+    run_id: str,
+    format: Literal["json", "packed"] = "json",
+    precision: Literal["f8", "f4"] = "f8",
+    quantum: float | None = Query(default=None, gt=0),
+    delta: bool = False,
+    conflate: Literal["latest", "stride"] = "latest",
+    stride: int = Query(default=2, ge=2),
+    regions: list[str] | None = Query(default=None),
+    fields: list[SeriesField] | None = Query(default=None),
+    step: int = Query(default=1, ge=1),
+    resume_from: str | None = Query(default=None, alias="lastEventId"),
+    token: str | None = Query(default=None),
+) -> None:
+    """Live frames cut down to the regions, fields and time step a client is looking at.
+
+    The query's ``regions``, ``fields`` and ``step`` form the first subscription; sending a
+    ``FrameSubscription`` as a JSON text message replaces it from the next frame on, and invalid
+    ones are answered with an ``error`` message. Each layout is announced by an ``index`` message
+    before the frames that follow it. JSON frames arrive as ``frame`` text messages with an
+    ``id``; ``format=packed`` sends binary packed frames, whose ``t`` is their id, and restarts
+    the delta chain on every ``index``. Resume with ``lastEventId``; replay and conflation work as
+    on the SSE stream. Message compression is the server's permessage-deflate.
+    """
+
+    try:
+        auth = await resolve_auth(websocket.headers.get("authorization"), token)
+    except ApiError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Unauthorized")
+        return
+    async with session_scope() as session:
+        run = await run_service.get_run(session, auth.sub, run_id)
+    if not run:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Run not found")
+        return
+    if delta and quantum is None:
+        await websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION, reason="delta frames need a quantum"
+        )
+        return
+
+    await websocket.accept()
+    redis = get_binary_redis()
+    settings = get_settings()
+    selector = FrameSelector(FrameSubscription(regions=regions, fields=fields, step=step))
+    results_id = run_service.results_id(run)
+    events = replay_frames(
+        redis,
+        get_frame_hub(),
+        results_id,
+        resume_from,
+        settings.run_frame_stream_buffer,
+        policy=conflate,
+        stride=stride,
+        status=run.status,
+    )
+
+    async def send_frames() -> None:
+        region_ids: list[str] | None = None
+        encoder: PackedFrameEncoder | None = None
+        async for event in events:
+            if event.end:
+                await websocket.send_json({"type": "end"})
+                await websocket.close()
+                return
+            frame = event.decoded
+            if frame.region_ids is not None:
+                region_ids = frame.region_ids
+            elif region_ids is None:
+                region_ids = await _index_regions(redis, results_id)
+                if region_ids is None:
+                    continue
+            selected = selector.select(frame, region_ids)
+            if selected is None:
+                continue
+            if selector.changed:
+                selector.changed = False
+                if format == "packed":
+                    encoder = PackedFrameEncoder(precision, quantum, delta)
+                index_message = {
+                    "type": "index",
+                    "regions": selector.region_ids,
+                    "fields": list(selector.fields),
+                    "quantum": quantum,
+                    "step": selector.subscription.step,
+                }
+                await websocket.send_json(index_message)
+            if encoder is None:
+                payload = frame_json(run_id, selected, selector.region_ids, selector.fields)
+                await websocket.send_json({"type": "frame", "id": event.event_id, **payload})
+            else:
+                await websocket.send_bytes(encoder.encode(selected))
+
+    sender = asyncio.create_task(send_frames())
+    receiver = asyncio.create_task(_receive_subscriptions(websocket, selector))
+    try:
+        await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        failure = sender.exception() if sender.done() else None
+        if failure is not None and not isinstance(failure, WebSocketDisconnect):
+            LOGGER.warning("stream.ws_failed", run_id=run_id, error=str(failure))
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        sender.cancel()
+        receiver.cancel()
+        await asyncio.gather(sender, receiver, return_exceptions=True)
+        await events.aclose()
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class Pathogen(BaseModel):
@@ -25,6 +25,14 @@ class EngineCfg(BaseModel):
     seed: int
     dt: float
     horizon: int
+    mode: Literal["stepwise", "fused"] = "fused"
+    integrator: Literal["rk4", "dopri5", "tau-leap"] = "rk4"
+    rtol: float = Field(default=1e-6, gt=0)
+    atol: float = Field(default=1e-3, gt=0)
+    output_interval: int = Field(default=1, ge=1)
+    frame_dtype: Literal["float64", "float32"] = "float64"
+    # Members > 1 run as one stochastic ensemble and store the member mean as the run's series.
+    ensemble_members: int = Field(default=1, ge=1, le=64)
 
 
 class NpiDefinition(BaseModel):
@@ -84,12 +92,32 @@ class Run(BaseModel):
     started_at: datetime | None = None
     finished_at: datetime | None = None
     metrics_summary: dict[str, Any] | None = None
+    fingerprint: str | None = None
+    results_run_id: str | None = None
 
 
 class RunCreateRequest(BaseModel):
     scenario_id: str
     engine: EngineCfg
     seed: int
+    # Runs identical to a completed one reuse its results unless this asks for a fresh run.
+    recompute: bool = False
+
+    @model_validator(mode="after")
+    def _runnable_engine(self) -> RunCreateRequest:
+        # Checked here rather than on EngineCfg so stored runs and scenarios stay readable.
+        engine = self.engine
+        if engine.dt <= 0:
+            raise ValueError("engine.dt must be positive")
+        # Fixed-step integrators land on every frame exactly; dopri5 only starts from ``dt``.
+        if engine.integrator != "dopri5":
+            steps = max(round(engine.output_interval / engine.dt), 1)
+            if abs(steps * engine.dt - engine.output_interval) > 1e-9 * engine.output_interval:
+                raise ValueError("engine.output_interval must be a whole multiple of engine.dt")
+        # Deterministic members would all integrate the same trajectory.
+        if engine.ensemble_members > 1 and engine.integrator != "tau-leap":
+            raise ValueError("engine.ensemble_members above 1 needs the tau-leap integrator")
+        return self
 
 
 class RunFrameSeriesPoint(BaseModel):
@@ -110,6 +138,46 @@ class RunFrame(BaseModel):
     perf: dict[str, float] | None = None
 
 
+SeriesField = Literal["S", "E", "I", "R", "D", "new_cases", "rt"]
+
+
+class FrameSubscription(BaseModel):
+    """What a WebSocket stream client wants; ``None`` means every region or field."""
+
+    regions: list[str] | None = None
+    fields: list[SeriesField] | None = None
+    step: int = Field(default=1, ge=1)
+
+
+class SeriesQuery(BaseModel):
+    """Aggregated run series: ``agg`` over each group's regions, every ``step`` days.
+
+    ``groups`` maps a label to region ids and may overlap; without it every region forms one
+    ``all`` group. ``points`` downsamples each series to that many points with LTTB.
+    """
+
+    fields: list[SeriesField] = Field(default_factory=lambda: ["S", "E", "I", "R", "D"])
+    agg: Literal["sum", "mean"] = "sum"
+    groups: dict[str, list[str]] | None = None
+    step: int = Field(default=1, ge=1)
+    t_from: int | None = None
+    t_to: int | None = None
+    points: int | None = Field(default=None, ge=3)
+
+
+class AggregateSeries(BaseModel):
+    group: str
+    field: SeriesField
+    t: list[int]
+    values: list[float | None]
+
+
+class RunSeriesAggregate(BaseModel):
+    run_id: str
+    agg: Literal["sum", "mean"]
+    series: list[AggregateSeries]
+
+
 class PaginatedResponse(BaseModel):
     items: list[Any]
     next_cursor: str | None = Field(default=None, alias="nextCursor")
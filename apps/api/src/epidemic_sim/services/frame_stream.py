@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+import redis.asyncio as redis_async
+from sqlalchemy import select
+
+from epidemic_sim.config.settings import get_settings
+from epidemic_sim.core.db import session_scope
+from epidemic_sim.core.frames import FRAME_FIELDS, Frame, parse_frame, stream_key
+from epidemic_sim.core.logging import get_logger
+from epidemic_sim.core.metrics import (
+    STREAM_DROPPED_FRAMES,
+    STREAM_LAG_SECONDS,
+    STREAM_QUEUE_DEPTH,
+    STREAM_SUBSCRIBERS,
+)
+from epidemic_sim.core.models import Runs
+from epidemic_sim.core.redis_pool import get_binary_redis
+from epidemic_sim.schemas.dto import FrameSubscription, RunFrame
+from epidemic_sim.services.run_series import list_frames
+
+LOGGER = get_logger(__name__)
+
+CONFLATION_POLICIES = ("latest", "stride")
+# Runs in these states append no more frames.
+FINISHED_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+_BLOCK_MS = 15_000
+# A live tail idle this long re-reads the run's status, so a dead worker cannot hold it open.
+_STATUS_CHECK_SECONDS = 30.0
+_ENTRY_ID = re.compile(r"^(\d+)-(\d+)$")
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """A stored ``frame`` or a raw worker ``message``; neither once the run has finished.
+
+    Events read by a ``RunFrameHub`` are shared by every subscriber of the run, so the message is
+    decoded at most once.
+    """
+
+    event_id: str | None
+    t: int | None = None
+    frame: Frame | None = None
+    message: bytes | None = None
+
+    @property
+    def end(self) -> bool:
+        return self.frame is None and self.message is None
+
+    @cached_property
+    def decoded(self) -> Frame:
+        return self.frame if self.frame is not None else parse_frame(self.message or b"")
+
+    @property
+    def published_at(self) -> float | None:
+        """Epoch seconds the worker appended the frame, for events read from the stream."""
+
+        if self.message is None or self.event_id is None:
+            return None
+        return int(self.event_id.partition(":")[2].partition("-")[0]) / 1000
+
+
+def _entry_event(entry_id: bytes, fields: dict[bytes, bytes]) -> StreamEvent:
+    if b"end" in fields:
+        return StreamEvent(None)
+    t = int(fields[b"t"])
+    return StreamEvent(f"{t}:{entry_id.decode()}", t=t, message=fields[b"data"])
+
+
+def parse_event_id(value: str | None) -> tuple[int, str | None]:
+    """Last frame time and stream entry id from a ``Last-Event-ID`` of the form ``t[:entry]``."""
+
+    if not value:
+        return -1, None
+    t, _, entry = value.partition(":")
+    try:
+        last_t = int(t)
+    except ValueError:
+        return -1, None
+    return last_t, entry if _ENTRY_ID.match(entry) else None
+
+
+def _entry_order(entry_id: bytes | str) -> tuple[int, int]:
+    text = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+    ms, _, seq = text.partition("-")
+    return int(ms), int(seq)
+
+
+def _frame_from_run_frame(run_frame: RunFrame) -> Frame:
+    values = np.array(
+        [[getattr(point, name) or 0.0 for point in run_frame.series] for name in FRAME_FIELDS],
+        dtype=np.float64,
+    )
+    return Frame(
+        t=run_frame.t,
+        values=values,
+        region_ids=[point.region_id for point in run_frame.series],
+    )
+
+
+async def _stored_frames(run_id: str, after_t: int, page_frames: int) -> AsyncIterator[Frame]:
+    cursor = after_t if after_t >= 0 else None
+    while True:
+        async with session_scope() as session:
+            page = await list_frames(session, run_id, limit=page_frames, cursor=cursor)
+        for run_frame in page:
+            yield _frame_from_run_frame(run_frame)
+        if len(page) < page_frames:
+            return
+        cursor = page[-1].t
+
+
+async def _run_status(run_id: str) -> str | None:
+    async with session_scope() as session:
+        result = await session.execute(select(Runs.status).where(Runs.id == run_id))
+    return result.scalar_one_or_none()
+
+
+class FrameQueue:
+    """Bounded queue of live events for one client.
+
+    Past ``maxsize`` queued frames, ``latest`` drops the oldest ones and ``stride`` thins the
+    backlog to every ``stride``-th frame counting back from the newest; either way a slow client
+    skips frames instead of growing server memory. The end or failure marker always comes last,
+    so it is never dropped.
+    """
+
+    def __init__(self, maxsize: int, policy: str = "latest", stride: int = 2) -> None:
+        if policy not in CONFLATION_POLICIES:
+            raise ValueError(f"conflation policy must be one of {CONFLATION_POLICIES}")
+        self._items: deque[StreamEvent | Exception] = deque()
+        self._maxsize = maxsize
+        self._policy = policy
+        self._stride = stride
+        self._wakeup = asyncio.Event()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put_nowait(self, item: StreamEvent | Exception) -> None:
+        self._items.append(item)
+        if len(self._items) > self._maxsize:
+            before = len(self._items)
+            if self._policy == "stride":
+                self._items = deque(list(self._items)[:: -self._stride][::-1])
+            while len(self._items) > self._maxsize:
+                self._items.popleft()
+            dropped = before - len(self._items)
+            self.dropped += dropped
+            STREAM_DROPPED_FRAMES.labels(self._policy).inc(dropped)
+        self._wakeup.set()
+
+    async def get(self) -> StreamEvent | Exception:
+        while not self._items:
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        return self._items.popleft()
+
+
+class _RunFeed:
+    """Single upstream reader of one run's stream, pushing each entry to every local queue."""
+
+    def __init__(self, redis: redis_async.Redis, run_id: str, page_frames: int) -> None:
+        self._redis = redis
+        self._key = stream_key(run_id)
+        self._page_frames = page_frames
+        self.queues: set[FrameQueue] = set()
+        self.ready = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        try:
+            newest = await self._redis.xrevrange(self._key, count=1)
+            cursor = newest[0][0] if newest else "0-0"
+            self.ready.set()
+            while True:
+                response = await self._redis.xread(
+                    {self._key: cursor}, count=self._page_frames, block=_BLOCK_MS
+                )
+                for _, entries in response:
+                    for entry_id, fields in entries:
+                        cursor = entry_id
+                        event = _entry_event(entry_id, fields)
+                        for queue in self.queues:
+                            queue.put_nowait(event)
+                        if event.end:
+                            return
+        except Exception as exc:
+            LOGGER.warning("stream.feed_failed", stream=self._key, error=str(exc))
+            for queue in self.queues:
+                queue.put_nowait(exc)
+        finally:
+            self.ready.set()
+
+
+class RunFrameHub:
+    """Per-process fan-out: one Redis reader per run, however many clients watch it.
+
+    Feeds start with their first subscriber and stop when the last one leaves. Every subscriber
+    gets its own ``FrameQueue`` of ``buffer_frames`` frames.
+    """
+
+    def __init__(self, redis: redis_async.Redis, buffer_frames: int) -> None:
+        self._redis = redis
+        self._buffer_frames = buffer_frames
+        self._feeds: dict[str, _RunFeed] = {}
+
+    @property
+    def active_runs(self) -> int:
+        return len(self._feeds)
+
+    @asynccontextmanager
+    async def subscribe(
+        self, run_id: str, policy: str = "latest", stride: int = 2
+    ) -> AsyncIterator[FrameQueue]:
+        """Queue of stream entries appended after the feed's position when this returns."""
+
+        queue = FrameQueue(self._buffer_frames, policy, stride)
+        feed = self._feeds.get(run_id)
+        if feed is None or feed.task.done():
+            feed = self._feeds[run_id] = _RunFeed(self._redis, run_id, self._buffer_frames)
+        feed.queues.add(queue)
+        STREAM_SUBSCRIBERS.inc()
+        try:
+            await feed.ready.wait()
+            yield queue
+        finally:
+            STREAM_SUBSCRIBERS.dec()
+            feed.queues.discard(queue)
+            if not feed.queues and self._feeds.get(run_id) is feed:
+                del self._feeds[run_id]
+                feed.task.cancel()
+
+
+class FrameSelector:
+    """Cuts frames down to one client's ``FrameSubscription``.
+
+    Regions keep the run's order and fields keep ``FRAME_FIELDS`` order whatever order the client
+    names them in; regions the run does not have are ignored. Frames less than ``step`` days after
+    the last selected one are skipped. ``update`` swaps the subscription mid-stream and sets
+    ``changed`` until the caller has announced the new layout.
+    """
+
+    def __init__(self, subscription: FrameSubscription | None = None) -> None:
+        self._last_t: int | None = None
+        self.update(subscription or FrameSubscription())
+
+    def update(self, subscription: FrameSubscription) -> None:
+        self.subscription = subscription
+        wanted = set(subscription.fields or FRAME_FIELDS)
+        self.fields = tuple(field for field in FRAME_FIELDS if field in wanted)
+        self._rows = [FRAME_FIELDS.index(field) for field in self.fields]
+        self._source: list[str] | None = None
+        self.region_ids: list[str] = []
+        self.changed = True
+
+    def _layout(self, region_ids: list[str]) -> None:
+        self._source = region_ids
+        wanted = self.subscription.regions
+        if wanted is None:
+            self._columns = None
+            selected = list(region_ids)
+        else:
+            wanted_set = set(wanted)
+            self._columns = [i for i, region in enumerate(region_ids) if region in wanted_set]
+            selected = [region_ids[i] for i in self._columns]
+        if selected != self.region_ids:
+            self.region_ids = selected
+            self.changed = True
+
+    def select(self, frame: Frame, region_ids: list[str]) -> Frame | None:
+        """``frame`` restricted to the subscription, or ``None`` when its step skips it."""
+
+        if self._last_t is not None and frame.t - self._last_t < self.subscription.step:
+            return None
+        if region_ids is not self._source and region_ids != self._source:
+            self._layout(region_ids)
+        self._last_t = frame.t
+        values = frame.values
+        if len(self._rows) < len(FRAME_FIELDS):
+            values = values[self._rows]
+        if self._columns is not None:
+            values = values[:, self._columns]
+        return Frame(t=frame.t, values=values, region_ids=self.region_ids)
+
+
+_hub: RunFrameHub | None = None
+
+
+def get_frame_hub() -> RunFrameHub:
+    global _hub
+    if _hub is None:
+        settings = get_settings()
+        _hub = RunFrameHub(get_binary_redis(), settings.run_frame_stream_buffer)
+    return _hub
+
+
+async def _catch_up(
+    redis: redis_async.Redis, run_id: str, last_event_id: str | None, page_frames: int
+) -> AsyncIterator[StreamEvent]:
+    """Frames after ``last_event_id`` already stored or buffered, then the stream's end marker."""
+
+    key = stream_key(run_id)
+    last_t, entry = parse_event_id(last_event_id)
+    oldest = await redis.xrange(key, count=1)
+    start = "-"
+    if entry is not None and oldest and _entry_order(oldest[0][0]) <= _entry_order(entry):
+        start = f"({entry}"
+    else:
+        async for frame in _stored_frames(run_id, last_t, page_frames):
+            last_t = frame.t
+            yield StreamEvent(str(frame.t), t=frame.t, frame=frame)
+
+    while True:
+        entries = await redis.xrange(key, min=start, count=page_frames)
+        for entry_id, fields in entries:
+            event = _entry_event(entry_id, fields)
+            if event.end:
+                yield event
+                return
+            # Workers resuming from a checkpoint re-append frames already sent.
+            if event.t is not None and event.t > last_t:
+                last_t = event.t
+                yield event
+        if len(entries) < page_frames:
+            return
+        start = f"({entries[-1][0].decode()}"
+
+
+async def replay_frames(
+    redis: redis_async.Redis,
+    hub: RunFrameHub,
+    run_id: str,
+    last_event_id: str | None,
+    page_frames: int,
+    policy: str = "latest",
+    stride: int = 2,
+    status: str | None = None,
+) -> AsyncIterator[StreamEvent]:
+    """Frames after ``last_event_id``, then live ones, in time order and without repeats.
+
+    The live subscription opens first so nothing slips through while catching up. While
+    ``last_event_id`` is still in the run's capped stream, catching up reads Redis only;
+    otherwise the stored series is replayed first, ``page_frames`` frames per query, and the
+    buffered stream follows from its oldest entry. Workers keep more frames buffered than they
+    leave uncommitted, so the sources always overlap, and repeats are dropped by frame time.
+    Live frames then go through the subscriber's ``FrameQueue`` with ``policy`` and ``stride``.
+
+    Runs whose ``status`` is final get no live subscription: catching up is all there is, and
+    the end follows it even once the stream has expired or was never written. A live tail that
+    sees no event for ``_STATUS_CHECK_SECONDS`` re-reads the status and ends once it is final,
+    for workers that died or were requeued without appending the end marker.
+    """
+
+    if status in FINISHED_STATUSES:
+        async with aclosing(_catch_up(redis, run_id, last_event_id, page_frames)) as events:
+            async for event in events:
+                yield event
+                if event.end:
+                    return
+        yield StreamEvent(None)
+        return
+
+    last_t, _ = parse_event_id(last_event_id)
+    async with (
+        hub.subscribe(run_id, policy, stride) as live,
+        aclosing(_catch_up(redis, run_id, last_event_id, page_frames)) as events,
+    ):
+        async for event in events:
+            yield event
+            if event.end:
+                return
+            if event.t is not None:
+                last_t = event.t
+
+        while True:
+            try:
+                event = await asyncio.wait_for(live.get(), _STATUS_CHECK_SECONDS)
+            except TimeoutError:
+                if await _run_status(run_id) in FINISHED_STATUSES:
+                    yield StreamEvent(None)
+                    return
+                continue
+            if isinstance(event, Exception):
+                raise event
+            STREAM_QUEUE_DEPTH.observe(len(live))
+            if event.published_at is not None:
+                STREAM_LAG_SECONDS.observe(max(time.time() - event.published_at, 0.0))
+            if event.end:
+                yield event
+                return
+            if event.t is not None and event.t > last_t:
+                last_t = event.t
+                yield event
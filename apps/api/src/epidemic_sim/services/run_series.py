@@ -1,26 +1,180 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import json
+import struct
+from collections.abc import AsyncIterator, Iterator
+from typing import Any, Literal
 
-from sqlalchemy import select
+import numpy as np
+from sqlalchemy import Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from epidemic_sim.core.models import RunSeries
+from epidemic_sim.core.columnar import SeriesChunk, decode_chunk
+from epidemic_sim.core.db import session_scope
+from epidemic_sim.core.frames import FRAME_FIELDS, pack_frame
+from epidemic_sim.core.models import Artifacts, RunSeries, RunSeriesChunks
 from epidemic_sim.schemas.dto import RunFrame, RunFrameSeriesPoint
 
+# Binary frame pages: a little-endian u32 length and a JSON index naming the regions and fields,
+# then one packed frame (see ``core.frames``) per timestep.
+PACKED_FRAMES_MEDIA_TYPE = "application/vnd.epidemic-sim.frames"
+
+_INDEX_LENGTH = struct.Struct("<I")
+_ROW_PARTITION = 4096
+
+
+async def has_series_artifact(session: AsyncSession, run_id: str) -> bool:
+    """Whether the run stores its series as columnar chunks rather than ``run_series`` rows."""
+
+    artifact = select(Artifacts.id).where(Artifacts.run_id == run_id, Artifacts.kind == "series")
+    return (await session.execute(artifact.limit(1))).first() is not None
+
+
+def _start_after(cursor: int | None, t_from: int | None) -> int | None:
+    if t_from is not None and (cursor is None or cursor < t_from - 1):
+        return t_from - 1
+    return cursor
+
+
+async def _chunk_payloads(
+    session: AsyncSession, run_id: str, limit: int, cursor: int | None, t_to: int | None
+) -> list[bytes] | None:
+    """Payloads of the chunks covering the next ``limit`` frames, or None for row-stored runs.
+
+    Only chunk bounds are read up front, so payloads past the page are never fetched.
+    """
+
+    bounds = select(RunSeriesChunks.id, RunSeriesChunks.frames).where(
+        RunSeriesChunks.run_id == run_id
+    )
+    if cursor is not None:
+        bounds = bounds.where(RunSeriesChunks.t_end > cursor)
+    if t_to is not None:
+        bounds = bounds.where(RunSeriesChunks.t_start <= t_to)
+    covering = (await session.execute(bounds.order_by(RunSeriesChunks.t_start.asc()))).all()
+    if not covering:
+        return [] if await has_series_artifact(session, run_id) else None
+
+    # The first chunk may straddle the cursor, so it never counts towards the limit.
+    chunk_ids = [covering[0].id]
+    available = 0
+    for chunk_id, frames in covering[1:]:
+        if available >= limit:
+            break
+        chunk_ids.append(chunk_id)
+        available += frames
+    payloads = await session.execute(
+        select(RunSeriesChunks.payload)
+        .where(RunSeriesChunks.id.in_(chunk_ids))
+        .order_by(RunSeriesChunks.t_start.asc())
+    )
+    return list(payloads.scalars())
+
+
+def _page_indices(
+    chunk: SeriesChunk, taken: int, limit: int, cursor: int | None, t_to: int | None
+) -> tuple[list[int], bool]:
+    """Indices of ``chunk``'s frames on the page, and whether the page ends inside it."""
+
+    indices = []
+    for index, t in enumerate(chunk.t):
+        if cursor is not None and t <= cursor:
+            continue
+        if taken + len(indices) == limit or (t_to is not None and t > t_to):
+            return indices, True
+        indices.append(index)
+    return indices, False
+
+
+async def _frame_times(
+    session: AsyncSession, run_id: str, limit: int, cursor: int | None, t_to: int | None
+) -> list[int]:
+    # ``limit`` counts frames, so pages never cut a frame's regions apart. This and the row query
+    # after it walk the ``(run_id, t, region_id)`` index from the cursor.
+    scope = [RunSeries.run_id == run_id]
+    if cursor is not None:
+        scope.append(RunSeries.t > cursor)
+    if t_to is not None:
+        scope.append(RunSeries.t <= t_to)
+    stmt = select(RunSeries.t).where(*scope).distinct().order_by(RunSeries.t.asc())
+    return list((await session.execute(stmt.limit(limit))).scalars())
+
+
+def _page_rows(
+    run_id: str, times: list[int], region_ids: list[str] | None, *columns: Any
+) -> Select[Any]:
+    stmt = select(*columns).where(
+        RunSeries.run_id == run_id, RunSeries.t.between(times[0], times[-1])
+    )
+    if region_ids is not None:
+        stmt = stmt.where(RunSeries.region_id.in_(region_ids))
+    return stmt.order_by(RunSeries.t.asc(), RunSeries.region_id.asc())
+
+
+def _chunk_run_frames(
+    run_id: str, chunk: SeriesChunk, indices: list[int], wanted: set[str] | None
+) -> Iterator[RunFrame]:
+    columns = [
+        column
+        for column, region_id in enumerate(chunk.region_ids)
+        if wanted is None or region_id in wanted
+    ]
+    region_ids = [chunk.region_ids[column] for column in columns]
+    rows = [chunk.fields.index(field) for field in FRAME_FIELDS]
+    # One slice of the decoded array for the whole page, read back as (regions, fields) rows.
+    page = chunk.values[np.ix_(indices, rows, columns)].transpose(0, 2, 1).tolist()
+    for index, points in zip(indices, page, strict=True):
+        yield RunFrame(
+            run_id=run_id,
+            t=chunk.t[index],
+            series=[
+                RunFrameSeriesPoint(
+                    region_id=region_id, **dict(zip(FRAME_FIELDS, values, strict=True))
+                )
+                for region_id, values in zip(region_ids, points, strict=True)
+            ],
+            perf=None,
+        )
+
 
 async def list_frames(
-    session: AsyncSession, run_id: str, limit: int = 100, cursor: int | None = None
+    session: AsyncSession,
+    run_id: str,
+    limit: int = 100,
+    cursor: int | None = None,
+    *,
+    region_ids: list[str] | None = None,
+    t_from: int | None = None,
+    t_to: int | None = None,
+    results_run_id: str | None = None,
 ) -> list[RunFrame]:
-    stmt = select(RunSeries).where(RunSeries.run_id == run_id).order_by(RunSeries.t.asc())
-    if cursor is not None:
-        stmt = stmt.where(RunSeries.t > cursor)
-    stmt = stmt.limit(limit)
-    result = await session.execute(stmt)
-    rows = result.scalars().all()
+    """Up to ``limit`` whole frames after ``cursor``, optionally within ``[t_from, t_to]``.
+
+    ``region_ids`` narrows each frame's series; frames keep their place in the page even when
+    none of their regions match, so ``cursor`` stays the last frame's ``t``. Series are read
+    from ``results_run_id`` when the run aliases another run's results.
+    """
+
+    source = results_run_id or run_id
+    cursor = _start_after(cursor, t_from)
+    payloads = await _chunk_payloads(session, source, limit, cursor, t_to)
+    if payloads is not None:
+        wanted = set(region_ids) if region_ids is not None else None
+        frames: list[RunFrame] = []
+        for payload in payloads:
+            chunk = decode_chunk(payload)
+            indices, full = _page_indices(chunk, len(frames), limit, cursor, t_to)
+            frames.extend(_chunk_run_frames(run_id, chunk, indices, wanted))
+            if full:
+                break
+        return frames
 
-    grouped: dict[int, list[RunFrameSeriesPoint]] = defaultdict(list)
-    for row in rows:
+    times = await _frame_times(session, source, limit, cursor, t_to)
+    if not times:
+        return []
+    result = await session.execute(_page_rows(source, times, region_ids, RunSeries))
+    grouped: dict[int, list[RunFrameSeriesPoint]] = {t: [] for t in times}
+    for row in result.scalars():
         grouped[row.t].append(
             RunFrameSeriesPoint(
                 region_id=row.region_id,
@@ -38,3 +192,94 @@ async def list_frames(
         for t, series in sorted(grouped.items())
     ]
     return frames
+
+
+def _index_block(run_id: str, region_ids: list[str]) -> bytes:
+    index = {"runId": run_id, "regions": region_ids, "fields": list(FRAME_FIELDS)}
+    encoded = json.dumps(index).encode()
+    return _INDEX_LENGTH.pack(len(encoded)) + encoded
+
+
+async def iter_packed_frames(
+    run_id: str,
+    limit: int = 100,
+    cursor: int | None = None,
+    *,
+    region_ids: list[str] | None = None,
+    t_from: int | None = None,
+    t_to: int | None = None,
+    precision: Literal["f8", "f4"] = "f8",
+    results_run_id: str | None = None,
+) -> AsyncIterator[bytes]:
+    """The page ``list_frames`` would return, as ``PACKED_FRAMES_MEDIA_TYPE`` bytes.
+
+    Chunks are sliced as decoded arrays and rows are read from a server-side cursor into one
+    array per frame, so no per-row objects are built. Every frame carries the index's regions;
+    regions a frame lacks are NaN. A page is full, and more may follow, when it holds ``limit``
+    frames. Opens its own session, as the response body outlives the request's.
+    """
+
+    source = results_run_id or run_id
+    typecode = b"d" if precision == "f8" else b"f"
+    cursor = _start_after(cursor, t_from)
+    async with session_scope() as session:
+        payloads = await _chunk_payloads(session, source, limit, cursor, t_to)
+        if payloads is not None:
+            taken = 0
+            columns: list[int] | None = None
+            for payload in payloads:
+                chunk = decode_chunk(payload)
+                if columns is None:
+                    wanted = set(region_ids) if region_ids is not None else None
+                    columns = [
+                        column
+                        for column, region in enumerate(chunk.region_ids)
+                        if wanted is None or region in wanted
+                    ]
+                    yield _index_block(run_id, [chunk.region_ids[i] for i in columns])
+                indices, full = _page_indices(chunk, taken, limit, cursor, t_to)
+                rows = [chunk.fields.index(field) for field in FRAME_FIELDS]
+                page = chunk.values[np.ix_(indices, rows, columns)]
+                for index, frame in zip(indices, page, strict=True):
+                    yield pack_frame(chunk.t[index], frame, typecode)
+                taken += len(indices)
+                if full:
+                    break
+            if columns is None:
+                yield _index_block(run_id, [])
+            return
+
+        times = await _frame_times(session, source, limit, cursor, t_to)
+        if not times:
+            yield _index_block(run_id, [])
+            return
+        first = times[0]
+        regions = (
+            await session.execute(
+                _page_rows(source, [first, first], region_ids, RunSeries.region_id)
+            )
+        ).scalars()
+        column_of = {region: column for column, region in enumerate(regions)}
+        yield _index_block(run_id, list(column_of))
+
+        fields = [getattr(RunSeries, field) for field in FRAME_FIELDS]
+        stmt = _page_rows(source, times, region_ids, RunSeries.t, RunSeries.region_id, *fields)
+        result = await session.stream(stmt.execution_options(yield_per=_ROW_PARTITION))
+        frame = np.full((len(FRAME_FIELDS), len(column_of)), np.nan)
+        position = 0
+        async for partition in result.partitions():
+            for t, region_id, *cells in partition:
+                if t != times[position]:
+                    yield pack_frame(times[position], frame, typecode)
+                    frame.fill(np.nan)
+                    position += 1
+                    # Frames without any matching region still take their place in the page.
+                    while times[position] != t:
+                        yield pack_frame(times[position], frame, typecode)
+                        position += 1
+                column = column_of.get(region_id)
+                if column is not None:
+                    frame[:, column] = cells
+        for t in times[position:]:
+            yield pack_frame(t, frame, typecode)
+            frame.fill(np.nan)
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import uuid
 from datetime import datetime
+from typing import Any
 
 from rq import Queue
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from epidemic_sim.core.models import Runs
+from epidemic_sim.core.logging import get_logger
+from epidemic_sim.core.models import Datasets, Pathogens, Runs, Scenarios
 from epidemic_sim.core.redis_pool import get_sync_redis
 from epidemic_sim.core.utils import orm_to_dict
 from epidemic_sim.schemas.dto import EngineCfg, Run, RunCreateRequest
 
 _QUEUE_NAME = "simulation-runs"
+# Bumped whenever the fingerprinted inputs change, so older fingerprints stop matching.
+_FINGERPRINT_VERSION = 1
+
+LOGGER = get_logger(__name__)
 
 
 def _queue() -> Queue:
@@ -24,12 +32,85 @@ async def list_runs(session: AsyncSession, owner_id: str) -> list[Run]:
     return [Run.model_validate(orm_to_dict(row)) for row in result.scalars().all()]
 
 
+def fingerprint(
+    scenario: Scenarios,
+    pathogen_params: dict[str, Any],
+    dataset_versions: dict[str, str],
+    engine: EngineCfg,
+    seed: int,
+) -> str:
+    """Content address of everything a run's output depends on.
+
+    Covers the scenario's datasets (by version) and NPIs, the pathogen parameters, the engine
+    config and the seed; ids are left out, so identical inputs match across scenarios.
+    """
+
+    dataset_ids = scenario.datasets or []
+    inputs = {
+        "version": _FINGERPRINT_VERSION,
+        "datasets": [[dataset_id, dataset_versions.get(dataset_id)] for dataset_id in dataset_ids],
+        "npi_catalog": scenario.npi_catalog,
+        "npi_timeline": scenario.npi_timeline,
+        "pathogen": pathogen_params,
+        "engine": engine.model_dump(mode="json"),
+        "seed": seed,
+    }
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+async def run_fingerprint(session: AsyncSession, request: RunCreateRequest) -> str | None:
+    """``fingerprint`` of the requested run as its inputs stand now, or None without a scenario."""
+
+    row = (
+        await session.execute(
+            select(Scenarios, Pathogens.params)
+            .join(Pathogens, Scenarios.pathogen_id == Pathogens.id)
+            .where(Scenarios.id == request.scenario_id)
+        )
+    ).first()
+    if row is None:
+        return None
+    scenario, pathogen_params = row
+    result = await session.execute(
+        select(Datasets.id, Datasets.version).where(Datasets.id.in_(scenario.datasets or []))
+    )
+    versions = dict(result.tuples().all())
+    return fingerprint(scenario, pathogen_params, versions, request.engine, request.seed)
+
+
+async def _completed_run(session: AsyncSession, owner_id: str, fingerprint: str) -> Runs | None:
+    # Scoped to the owner: an alias exposes its source's series through results_run_id.
+    stmt = (
+        select(Runs)
+        .where(
+            Runs.owner_id == owner_id,
+            Runs.fingerprint == fingerprint,
+            Runs.status == "completed",
+        )
+        .order_by(Runs.finished_at.asc())
+        .limit(1)
+    )
+    return (await session.execute(stmt)).scalar_one_or_none()
+
+
 async def create_run(
     session: AsyncSession,
     owner_id: str,
     request: RunCreateRequest,
 ) -> Run:
+    """Enqueue a simulation, or alias the owner's completed run with the same fingerprint.
+
+    Aliases are completed on creation and read their series from ``results_run_id``; no worker
+    runs for them. ``request.recompute`` always enqueues.
+    """
+
     run_id = str(uuid.uuid4())
+    fingerprint = await run_fingerprint(session, request)
+    source = None
+    if fingerprint is not None and not request.recompute:
+        source = await _completed_run(session, owner_id, fingerprint)
+
     record = Runs(
         id=run_id,
         scenario_id=request.scenario_id,
@@ -40,11 +121,23 @@ async def create_run(
         started_at=None,
         finished_at=None,
         metrics_summary=None,
+        fingerprint=fingerprint,
+        results_run_id=None,
     )
+    if source is not None:
+        now = datetime.utcnow()
+        record.status = "completed"
+        record.started_at = record.finished_at = now
+        record.metrics_summary = source.metrics_summary
+        record.results_run_id = source.results_run_id or source.id
     session.add(record)
     await session.commit()
     await session.refresh(record)
 
+    if source is not None:
+        LOGGER.info("runs.deduplicated", run_id=run_id, results_run_id=record.results_run_id)
+        return Run.model_validate(orm_to_dict(record))
+
     _queue().enqueue(
         "epidemic_sim_worker.queue.jobs.run_simulation",
         run_payload={
@@ -60,6 +153,12 @@ async def create_run(
     return Run.model_validate(orm_to_dict(record))
 
 
+def results_id(run: Run) -> str:
+    """Id under which ``run``'s series, chunks and frame stream are stored."""
+
+    return run.results_run_id or run.id
+
+
 async def get_run(session: AsyncSession, owner_id: str, run_id: str) -> Run | None:
     result = await session.execute(
         select(Runs).where(Runs.id == run_id, Runs.owner_id == owner_id)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import String, column, func, select, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from epidemic_sim.core.columnar import SeriesChunk, decode_chunk
+from epidemic_sim.core.models import RunSeries, RunSeriesChunks
+from epidemic_sim.schemas.dto import AggregateSeries, RunSeriesAggregate, SeriesQuery
+from epidemic_sim.services.run_series import has_series_artifact
+
+ALL_REGIONS = "all"
+
+# Per (group, field): frame times and the aggregated value at each of them.
+_Aggregated = dict[tuple[str, str], tuple[np.ndarray, np.ndarray]]
+
+
+def lttb(t: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of ``points`` samples that keep the shape of ``y`` (Largest-Triangle-Three-Buckets).
+
+    The first and last samples are always kept; every bucket in between contributes the sample
+    forming the largest triangle with the previous pick and the next bucket's mean.
+    """
+
+    size = len(t)
+    if points >= size:
+        return np.arange(size)
+    x = t.astype(np.float64)
+    y = np.nan_to_num(y.astype(np.float64))
+    edges = np.linspace(1, size - 1, points - 1).astype(np.intp)
+    picked = np.empty(points, dtype=np.intp)
+    picked[0], picked[-1] = 0, size - 1
+    previous = 0
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        after = edges[bucket + 2] if bucket + 2 < len(edges) else size
+        mean_x, mean_y = x[stop:after].mean(), y[stop:after].mean()
+        area = np.abs(
+            (x[previous] - mean_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (mean_y - y[previous])
+        )
+        previous = picked[bucket + 1] = start + int(area.argmax())
+    return picked
+
+
+def aggregate_chunk(chunk: SeriesChunk, query: SeriesQuery) -> _Aggregated:
+    """Per-group, per-field aggregates of a decoded chunk's frames within the query's range."""
+
+    t, cube = np.asarray(chunk.t), chunk.values
+    in_range = np.ones(len(t), dtype=bool)
+    if query.t_from is not None:
+        in_range &= t >= query.t_from
+    if query.t_to is not None:
+        in_range &= t <= query.t_to
+    t, cube = t[in_range], cube[in_range]
+
+    column_of = {region: index for index, region in enumerate(chunk.region_ids)}
+    groups = query.groups if query.groups is not None else {ALL_REGIONS: chunk.region_ids}
+    reduce = np.sum if query.agg == "sum" else np.mean
+    result: _Aggregated = {}
+    for group, region_ids in groups.items():
+        columns = [column_of[region] for region in region_ids if region in column_of]
+        if not columns:
+            continue
+        for field in query.fields:
+            plane = cube[:, chunk.fields.index(field), columns]
+            result[group, field] = t, reduce(plane, axis=1, dtype=np.float64)
+    return result
+
+
+async def _aggregate_chunks(
+    session: AsyncSession, run_id: str, query: SeriesQuery
+) -> _Aggregated | None:
+    stmt = select(RunSeriesChunks.payload).where(RunSeriesChunks.run_id == run_id)
+    if query.t_from is not None:
+        stmt = stmt.where(RunSeriesChunks.t_end >= query.t_from)
+    if query.t_to is not None:
+        stmt = stmt.where(RunSeriesChunks.t_start <= query.t_to)
+    payloads = (await session.execute(stmt.order_by(RunSeriesChunks.t_start.asc()))).scalars()
+    parts: dict[tuple[str, str], list[tuple[np.ndarray, np.ndarray]]] = defaultdict(list)
+    for payload in payloads:
+        for key, part in aggregate_chunk(decode_chunk(payload), query).items():
+            parts[key].append(part)
+    if not parts and not await has_series_artifact(session, run_id):
+        return None
+    return {
+        key: (np.concatenate([t for t, _ in chunks]), np.concatenate([v for _, v in chunks]))
+        for key, chunks in parts.items()
+    }
+
+
+async def _aggregate_rows(session: AsyncSession, run_id: str, query: SeriesQuery) -> _Aggregated:
+    """One ``GROUP BY t, group`` over the ``(run_id, t, region_id)`` index range."""
+
+    reduce = func.sum if query.agg == "sum" else func.avg
+    measures = [reduce(getattr(RunSeries, field)) for field in query.fields]
+    scope = [RunSeries.run_id == run_id]
+    if query.t_from is not None:
+        scope.append(RunSeries.t >= query.t_from)
+    if query.t_to is not None:
+        scope.append(RunSeries.t <= query.t_to)
+
+    if query.groups is None:
+        stmt = select(RunSeries.t, *measures).where(*scope).group_by(RunSeries.t)
+        stmt = stmt.order_by(RunSeries.t.asc())
+        rows = [(t, ALL_REGIONS, *measured) for t, *measured in await session.execute(stmt)]
+    else:
+        # A VALUES list joins each region to every group naming it, so groups may overlap.
+        pairs = [(region, group) for group, regions in query.groups.items() for region in regions]
+        if not pairs:
+            return {}
+        membership = values(
+            column("region_id", String), column("label", String), name="series_groups"
+        ).data(pairs)
+        stmt = (
+            select(RunSeries.t, membership.c.label, *measures)
+            .join(membership, membership.c.region_id == RunSeries.region_id)
+            .where(*scope)
+            .group_by(RunSeries.t, membership.c.label)
+            .order_by(membership.c.label, RunSeries.t.asc())
+        )
+        rows = list(await session.execute(stmt))
+
+    by_group: dict[str, list[tuple]] = defaultdict(list)
+    for row in rows:
+        by_group[row[1]].append(row)
+    result: _Aggregated = {}
+    for group, group_rows in by_group.items():
+        t = np.array([row[0] for row in group_rows])
+        measured = np.array([row[2:] for row in group_rows], dtype=np.float64)
+        for offset, field in enumerate(query.fields):
+            result[group, field] = t, measured[:, offset]
+    return result
+
+
+def _thin(t: np.ndarray, step: int) -> np.ndarray:
+    """Indices of the first frame in each ``step``-day window, counted from the first frame."""
+
+    if step == 1 or not len(t):
+        return np.arange(len(t))
+    _, first = np.unique((t - t[0]) // step, return_index=True)
+    return first
+
+
+async def aggregate_series(
+    session: AsyncSession, run_id: str, query: SeriesQuery, results_run_id: str | None = None
+) -> RunSeriesAggregate:
+    source = results_run_id or run_id
+    aggregated = await _aggregate_chunks(session, source, query)
+    if aggregated is None:
+        aggregated = await _aggregate_rows(session, source, query)
+
+    series = []
+    for (group, field), (t, y) in aggregated.items():
+        kept = _thin(t, query.step)
+        t, y = t[kept], y[kept]
+        if query.points is not None:
+            kept = lttb(t, y, query.points)
+            t, y = t[kept], y[kept]
+        series.append(
+            AggregateSeries(
+                group=group,
+                field=field,
+                t=t.tolist(),
+                values=[None if np.isnan(value) else value for value in y.tolist()],
+            )
+        )
+    return RunSeriesAggregate(run_id=run_id, agg=query.agg, series=series)
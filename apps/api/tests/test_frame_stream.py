@@ -0,0 +1,214 @@
+import asyncio
+import contextlib
+import json
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+from epidemic_sim.core.frames import Frame
+from epidemic_sim.schemas.dto import FrameSubscription, RunFrame, RunFrameSeriesPoint
+from epidemic_sim.services import frame_stream
+
+STORED = [
+    RunFrame(
+        run_id="run-1",
+        t=t,
+        series=[
+            RunFrameSeriesPoint(region_id="a", S=90 - t, E=0, I=t, R=0, D=0, new_cases=1, rt=2)
+        ],
+        perf=None,
+    )
+    for t in range(10)
+]
+
+
+def _message(t: int) -> bytes:
+    return json.dumps({"t": t}).encode()
+
+
+class FakeStreamRedis:
+    """Stream holding frames 6-11 (frames before 6 were trimmed) and the end marker."""
+
+    def __init__(self) -> None:
+        self.entries = [
+            (f"{100 + t}-0".encode(), {b"t": str(t).encode(), b"data": _message(t)})
+            for t in range(6, 12)
+        ]
+        self.entries.append((b"200-0", {b"end": b"1"}))
+        self.reads = 0
+        self.appended = asyncio.Event()
+
+    def append(self, entry: tuple[bytes, dict[bytes, bytes]]) -> None:
+        self.entries.append(entry)
+        self.appended.set()
+
+    def _from(self, start: bytes | str, exclusive: bool) -> list:
+        start = start.decode() if isinstance(start, bytes) else start
+        if start == "-":
+            return list(self.entries)
+        if start.startswith("("):
+            start, exclusive = start[1:], True
+        bound = frame_stream._entry_order(start)
+        return [
+            entry
+            for entry in self.entries
+            if frame_stream._entry_order(entry[0]) > bound
+            or (not exclusive and frame_stream._entry_order(entry[0]) == bound)
+        ]
+
+    async def xrange(self, key: str, min: str = "-", count: int | None = None) -> list:
+        return self._from(min, exclusive=False)[:count]
+
+    async def xrevrange(self, key: str, count: int) -> list:
+        return self.entries[::-1][:count]
+
+    async def xread(self, streams: dict, count: int, block: int) -> list:
+        self.reads += 1
+        (cursor,) = streams.values()
+        entries = self._from(cursor, exclusive=True)[:count]
+        if not entries:
+            # Like Redis, wait up to ``block`` ms for an append, then answer with nothing.
+            self.appended.clear()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self.appended.wait(), block / 1000)
+            entries = self._from(cursor, exclusive=True)[:count]
+        return [(b"stream", entries)] if entries else []
+
+
+@pytest.fixture(autouse=True)
+def stored_frames(monkeypatch: pytest.MonkeyPatch) -> None:
+    @asynccontextmanager
+    async def session_scope():
+        yield None
+
+    async def list_frames(session, run_id, limit, cursor):
+        return [frame for frame in STORED if cursor is None or frame.t > cursor][:limit]
+
+    monkeypatch.setattr(frame_stream, "session_scope", session_scope)
+    monkeypatch.setattr(frame_stream, "list_frames", list_frames)
+
+
+async def _collect(events) -> list[str | None]:
+    return [event.event_id async for event in events]
+
+
+async def _event_ids(last_event_id: str | None) -> list[str | None]:
+    redis = FakeStreamRedis()
+    hub = frame_stream.RunFrameHub(redis, buffer_frames=4)
+    events = frame_stream.replay_frames(redis, hub, "run-1", last_event_id, page_frames=4)
+    ids = await _collect(events)
+    assert hub.active_runs == 0
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_late_joiner_replays_stored_frames_then_the_stream() -> None:
+    ids = await _event_ids(None)
+    assert ids == [str(t) for t in range(10)] + ["10:110-0", "11:111-0", None]
+
+
+@pytest.mark.asyncio
+async def test_resume_inside_the_buffer_reads_only_the_stream() -> None:
+    assert await _event_ids("7:107-0") == ["8:108-0", "9:109-0", "10:110-0", "11:111-0", None]
+
+
+@pytest.mark.asyncio
+async def test_resume_before_the_buffer_falls_back_to_stored_frames() -> None:
+    ids = await _event_ids("3:50-0")
+    assert ids[:3] == ["4", "5", "6"]
+    assert ids[-3:] == ["10:110-0", "11:111-0", None]
+
+
+@pytest.mark.asyncio
+async def test_finished_runs_end_after_stored_frames_without_a_stream() -> None:
+    redis = FakeStreamRedis()
+    redis.entries = []
+    hub = frame_stream.RunFrameHub(redis, buffer_frames=4)
+    events = frame_stream.replay_frames(redis, hub, "run-1", "7", page_frames=4, status="completed")
+    ids = [event.event_id async for event in events]
+    assert ids == ["8", "9", None]
+    assert redis.reads == 0
+    assert hub.active_runs == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_tails_end_once_the_run_is_marked_finished(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    statuses = iter(["running", "failed"])
+    checked: list[str] = []
+
+    async def run_status(run_id: str) -> str:
+        checked.append(run_id)
+        return next(statuses)
+
+    monkeypatch.setattr(frame_stream, "_run_status", run_status)
+    monkeypatch.setattr(frame_stream, "_STATUS_CHECK_SECONDS", 0.01)
+    redis = FakeStreamRedis()
+    redis.entries = []  # the worker died before appending anything, let alone the end marker
+    hub = frame_stream.RunFrameHub(redis, buffer_frames=4)
+    events = frame_stream.replay_frames(redis, hub, "run-1", "7", page_frames=4, status="running")
+    ids = await asyncio.wait_for(_collect(events), 1)
+    assert ids == ["8", "9", None]
+    assert checked == ["run-1", "run-1"]
+    assert hub.active_runs == 0
+
+
+@pytest.mark.asyncio
+async def test_subscribers_of_a_run_share_one_upstream_reader() -> None:
+    redis = FakeStreamRedis()
+    redis.entries = redis.entries[:2]
+    hub = frame_stream.RunFrameHub(redis, buffer_frames=4)
+    async with hub.subscribe("run-1") as first, hub.subscribe("run-1") as second:
+        assert hub.active_runs == 1
+        redis.append((b"300-0", {b"t": b"20", b"data": _message(20)}))
+        shared = await asyncio.wait_for(first.get(), 1)
+        assert shared is await asyncio.wait_for(second.get(), 1)
+        assert shared.t == 20
+    assert hub.active_runs == 0
+    assert redis.reads >= 1
+
+
+def _live(t: int) -> frame_stream.StreamEvent:
+    return frame_stream.StreamEvent(f"{t}:{1000 + t}-0", t=t, message=_message(t))
+
+
+@pytest.mark.asyncio
+async def test_slow_clients_keep_the_latest_frames() -> None:
+    queue = frame_stream.FrameQueue(maxsize=3, policy="latest")
+    for t in range(10):
+        queue.put_nowait(_live(t))
+    queue.put_nowait(frame_stream.StreamEvent(None))
+    assert queue.dropped == 8
+    assert [(await queue.get()).t for _ in range(3)] == [8, 9, None]
+
+
+@pytest.mark.asyncio
+async def test_stride_conflation_thins_the_backlog() -> None:
+    queue = frame_stream.FrameQueue(maxsize=4, policy="stride", stride=2)
+    for t in range(5):
+        queue.put_nowait(_live(t))
+    assert [(await queue.get()).t for _ in range(len(queue))] == [0, 2, 4]
+
+
+def test_selector_cuts_frames_to_the_subscription() -> None:
+    regions = ["a", "b", "c"]
+    values = np.arange(21, dtype=np.float64).reshape(7, 3)
+    selector = frame_stream.FrameSelector(
+        FrameSubscription(regions=["c", "a", "zz"], fields=["I", "S"], step=7)
+    )
+    first = selector.select(Frame(t=0, values=values), regions)
+    assert selector.changed
+    assert selector.region_ids == ["a", "c"]
+    assert selector.fields == ("S", "I")
+    assert first.values.tolist() == [[0.0, 2.0], [6.0, 8.0]]
+    selector.changed = False
+    assert selector.select(Frame(t=3, values=values), regions) is None
+    assert selector.select(Frame(t=7, values=values), regions) is not None
+
+    selector.update(FrameSubscription(regions=["b"]))
+    widened = selector.select(Frame(t=8, values=values), regions)
+    assert selector.changed
+    assert widened.values.shape == (7, 1)
+    assert widened.region_ids == ["b"]
@@ -0,0 +1,54 @@
+import numpy as np
+
+from epidemic_sim.core.frames import (
+    FLAG_DELTA,
+    FRAME_FIELDS,
+    Frame,
+    PackedFrameEncoder,
+    frame_json,
+    pack_frame,
+    parse_frame,
+    unpack_frame,
+)
+
+
+def _frames(count: int, regions: int) -> list[Frame]:
+    rng = np.random.default_rng(3)
+    values = np.abs(rng.normal(5_000.0, 2_000.0, (len(FRAME_FIELDS), regions)))
+    frames = []
+    for t in range(count):
+        values = values + rng.normal(0.0, 40.0, values.shape)
+        frames.append(Frame(t=t, values=values.copy()))
+    return frames
+
+
+def test_packed_worker_frames_expand_to_json() -> None:
+    frame = _frames(1, 3)[0]
+    parsed = parse_frame(pack_frame(7, frame.values.astype(np.float32), b"f"))
+    assert parsed.t == 7
+    assert parsed.region_ids is None
+    payload = frame_json("run-1", parsed, ["a", "b", "c"])
+    assert [point["regionId"] for point in payload["series"]] == ["a", "b", "c"]
+    assert payload["series"][1]["newCases"] == float(np.float32(frame.values[5, 1]))
+
+    subset = Frame(t=7, values=parsed.values[[2, 5]])
+    payload = frame_json("run-1", subset, ["a", "b", "c"], ("I", "new_cases"))
+    assert set(payload["series"][0]) == {"regionId", "I", "newCases"}
+
+
+def test_quantized_deltas_reconstruct_every_frame() -> None:
+    encoder = PackedFrameEncoder(quantum=0.1, delta=True)
+    reconstructed = None
+    sizes = []
+    for frame in _frames(6, 50):
+        decoded, flags, _ = unpack_frame(encoder.encode(frame))
+        values = decoded.values.astype(np.int64)
+        if flags & FLAG_DELTA:
+            values = reconstructed + values
+        else:
+            assert reconstructed is None
+        reconstructed = values
+        sizes.append(decoded.values.nbytes)
+        assert np.abs(values * 0.1 - frame.values).max() <= 0.05 + 1e-9
+    # The first frame needs 32-bit integers, the deltas after it fit in 16 bits.
+    assert sizes[0] == 2 * sizes[1]
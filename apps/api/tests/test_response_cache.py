@@ -0,0 +1,112 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from epidemic_sim.core import response_cache
+
+
+class FakeCacheRedis:
+    """Just enough of Redis for the response cache: strings, one sorted set, pipelines."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.scores: dict[str, float] = {}
+
+    async def getex(self, key: str, ex: int) -> bytes | None:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int) -> None:
+        self.values[key] = value
+
+    async def zadd(self, name: str, mapping: dict[str, float]) -> None:
+        self.scores.update(mapping)
+
+    async def zremrangebyscore(self, name: str, low: float, high: float) -> None:
+        self.scores = {m: s for m, s in self.scores.items() if not low <= s <= high}
+
+    async def zcard(self, name: str) -> int:
+        return len(self.scores)
+
+    async def zrem(self, name: str, member: str) -> None:
+        self.scores.pop(member, None)
+
+    async def zpopmin(self, name: str, count: int) -> list[tuple[str, float]]:
+        oldest = sorted(self.scores.items(), key=lambda item: item[1])[:count]
+        for member, _ in oldest:
+            del self.scores[member]
+        return oldest
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.values.pop(key, None)
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeCacheRedis) -> None:
+        self.redis = redis
+        self.calls: list = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self) -> list:
+        return [await getattr(self.redis, n)(*args, **kwargs) for n, args, kwargs in self.calls]
+
+
+@pytest.fixture
+def redis(monkeypatch: pytest.MonkeyPatch) -> FakeCacheRedis:
+    fake = FakeCacheRedis()
+    clock = itertools.count(1_000_000)
+    settings = SimpleNamespace(
+        response_cache_ttl_seconds=3600, response_cache_max_entries=2, response_cache_max_bytes=8
+    )
+    monkeypatch.setattr(response_cache, "get_binary_redis", lambda: fake)
+    monkeypatch.setattr(response_cache, "get_settings", lambda: settings)
+    monkeypatch.setattr(response_cache.time, "time", lambda: float(next(clock)))
+    return fake
+
+
+def test_etags_are_strong_and_match_if_none_match() -> None:
+    etag = response_cache.strong_etag("run-1", "2026-01-01T00:00:00", 100)
+    assert etag.startswith('"')
+    assert etag == response_cache.strong_etag("run-1", "2026-01-01T00:00:00", 100)
+    assert response_cache.etag_matches(f'"other", W/{etag}', etag)
+    assert response_cache.etag_matches("*", etag)
+    assert not response_cache.etag_matches(None, etag)
+    assert not response_cache.etag_matches('"other"', etag)
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entries_are_evicted(redis: FakeCacheRedis) -> None:
+    await response_cache.cache_set("a", b"1")
+    await response_cache.cache_set("b", b"2")
+    assert await response_cache.cache_get("a") == b"1"
+    await response_cache.cache_set("c", b"3")
+    assert await response_cache.cache_get("b") is None
+    assert await response_cache.cache_get("a") == b"1"
+    await response_cache.cache_set("big", b"123456789")
+    assert await response_cache.cache_get("big") is None
+
+
+@pytest.mark.asyncio
+async def test_streamed_bodies_are_cached_once_complete(redis: FakeCacheRedis) -> None:
+    async def body(parts: list[bytes]):
+        for part in parts:
+            yield part
+
+    streamed = response_cache.cache_stream("s", body([b"ab", b"cd"]))
+    assert [part async for part in streamed] == [b"ab", b"cd"]
+    assert await response_cache.cache_get("s") == b"abcd"
+    streamed = response_cache.cache_stream("l", body([b"abcde", b"fghij"]))
+    assert len([part async for part in streamed]) == 2
+    assert await response_cache.cache_get("l") is None
@@ -0,0 +1,140 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from epidemic_sim.core.models import Runs, Scenarios
+from epidemic_sim.schemas.dto import EngineCfg, RunCreateRequest
+from epidemic_sim.services import runs
+
+ENGINE = EngineCfg(type="mechanistic", version="1.0.0", seed=7, dt=1.0, horizon=30)
+PATHOGEN = {"beta": 0.25, "sigma": 0.2, "gamma": 0.1, "mu": 0.01}
+
+
+def _scenario(scenario_id: str = "scn-1", **fields: object) -> Scenarios:
+    values = {
+        "datasets": ["ds-1"],
+        "npi_catalog": [{"id": "lockdown", "effects": {"beta": 0.5}}],
+        "npi_timeline": [{"day": 10, "npiId": "lockdown"}],
+        **fields,
+    }
+    return Scenarios(id=scenario_id, owner_id="user-1", title=scenario_id, **values)
+
+
+def _fingerprint(scenario: Scenarios | None = None, **overrides: object) -> str:
+    inputs = {
+        "pathogen_params": PATHOGEN,
+        "dataset_versions": {"ds-1": "v1"},
+        "engine": ENGINE,
+        "seed": 7,
+        **overrides,
+    }
+    return runs.fingerprint(scenario or _scenario(), **inputs)
+
+
+def test_identical_inputs_share_a_fingerprint() -> None:
+    reordered = dict(reversed(PATHOGEN.items()))
+    assert _fingerprint() == _fingerprint(_scenario("scn-2"), pathogen_params=reordered)
+
+
+def test_any_input_change_gives_a_new_fingerprint() -> None:
+    baseline = _fingerprint()
+    variants = [
+        _fingerprint(seed=8),
+        _fingerprint(engine=ENGINE.model_copy(update={"integrator": "dopri5"})),
+        _fingerprint(engine=ENGINE.model_copy(update={"version": "1.0.1"})),
+        _fingerprint(pathogen_params={**PATHOGEN, "beta": 0.3}),
+        _fingerprint(dataset_versions={"ds-1": "v2"}),
+        _fingerprint(_scenario(npi_timeline=[{"day": 11, "npiId": "lockdown"}])),
+        _fingerprint(_scenario(datasets=["ds-2"])),
+    ]
+    assert baseline not in variants
+    assert len(set(variants)) == len(variants)
+
+
+class FakeRunSession:
+    """Holds ``Runs`` rows and answers ``select(Runs)`` lookups whose filters are equalities."""
+
+    def __init__(self, *rows: Runs) -> None:
+        self.rows = list(rows)
+
+    async def execute(self, stmt):
+        clauses = getattr(stmt.whereclause, "clauses", [stmt.whereclause])
+        matches = [
+            row
+            for row in self.rows
+            if all(getattr(row, c.left.key) == c.right.value for c in clauses)
+        ]
+        return SimpleNamespace(scalar_one_or_none=lambda: matches[0] if matches else None)
+
+    def add(self, row: Runs) -> None:
+        self.rows.append(row)
+
+    async def commit(self) -> None:
+        return None
+
+    async def refresh(self, row: Runs) -> None:
+        return None
+
+
+def _completed(run_id: str, owner_id: str = "user-1", results_run_id: str | None = None) -> Runs:
+    return Runs(
+        id=run_id,
+        scenario_id="scn-1",
+        owner_id=owner_id,
+        engine=ENGINE.model_dump(),
+        status="completed",
+        seed=7,
+        started_at=datetime(2026, 1, 1),
+        finished_at=datetime(2026, 1, 1),
+        metrics_summary={"peak_infected": 12.0},
+        fingerprint="fp",
+        results_run_id=results_run_id,
+    )
+
+
+@pytest.fixture
+def enqueued(monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    jobs: list[dict] = []
+
+    async def run_fingerprint(session, request):
+        return "fp"
+
+    monkeypatch.setattr(runs, "run_fingerprint", run_fingerprint)
+    queue = SimpleNamespace(enqueue=lambda *args, **kwargs: jobs.append(kwargs))
+    monkeypatch.setattr(runs, "_queue", lambda: queue)
+    return jobs
+
+
+def _request(**fields: object) -> RunCreateRequest:
+    return RunCreateRequest(scenario_id="scn-1", engine=ENGINE, seed=7, **fields)
+
+
+@pytest.mark.asyncio
+async def test_identical_runs_alias_the_completed_results(enqueued: list[dict]) -> None:
+    session = FakeRunSession(_completed("alias-0", results_run_id="run-0"))
+    run = await runs.create_run(session, "user-1", _request())
+    assert run.status == "completed"
+    assert run.results_run_id == "run-0"
+    assert run.metrics_summary == {"peak_infected": 12.0}
+    assert run.fingerprint == "fp"
+    assert enqueued == []
+
+
+@pytest.mark.asyncio
+async def test_recompute_enqueues_despite_a_match(enqueued: list[dict]) -> None:
+    session = FakeRunSession(_completed("run-0"))
+    run = await runs.create_run(session, "user-1", _request(recompute=True))
+    assert run.status == "queued"
+    assert run.results_run_id is None
+    assert run.fingerprint == "fp"
+    assert [job["job_id"] for job in enqueued] == [run.id]
+
+
+@pytest.mark.asyncio
+async def test_other_owners_results_are_never_aliased(enqueued: list[dict]) -> None:
+    session = FakeRunSession(_completed("run-0", owner_id="user-2"))
+    run = await runs.create_run(session, "user-1", _request())
+    assert run.status == "queued"
+    assert run.results_run_id is None
+    assert len(enqueued) == 1
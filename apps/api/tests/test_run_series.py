@@ -0,0 +1,163 @@
+import json
+import struct
+import zlib
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from epidemic_sim.core.columnar import decode_chunk
+from epidemic_sim.core.frames import FRAME_FIELDS, unpack_frame
+from epidemic_sim.core.models import Artifacts, RunSeries, RunSeriesChunks
+from epidemic_sim.services import run_series
+
+
+def _encode(times: list[int], regions: list[str], values: np.ndarray) -> bytes:
+    """Chunk in the worker's format: header length, JSON header, byte-shuffled values."""
+
+    header = json.dumps(
+        {
+            "version": 1,
+            "dtype": "<f8",
+            "shape": list(values.shape),
+            "fields": list(FRAME_FIELDS),
+            "t": times,
+            "regions": regions,
+        }
+    ).encode()
+    shuffled = values.astype("<f8").view(np.uint8).reshape(-1, 8).T.tobytes()
+    return zlib.compress(struct.pack("<I", len(header)) + header + shuffled)
+
+
+CUBE = np.arange(4 * len(FRAME_FIELDS) * 3, dtype=np.float64).reshape(4, -1, 3)
+REGIONS = ["a", "b", "c"]
+
+
+def _payloads() -> list[bytes]:
+    return [_encode([0, 1], REGIONS, CUBE[:2]), _encode([2, 3], REGIONS, CUBE[2:])]
+
+
+def test_decode_undoes_the_byte_shuffle() -> None:
+    chunk = decode_chunk(_payloads()[1])
+    assert chunk.t == [2, 3]
+    assert chunk.region_ids == REGIONS
+    assert np.array_equal(chunk.values, CUBE[2:])
+    assert chunk.frame(1)["I"] == CUBE[3, 2].tolist()
+
+
+@pytest.mark.asyncio
+async def test_packed_pages_slice_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    @asynccontextmanager
+    async def session_scope():
+        yield None
+
+    async def chunk_payloads(session, run_id, limit, cursor, t_to):
+        return _payloads()
+
+    monkeypatch.setattr(run_series, "session_scope", session_scope)
+    monkeypatch.setattr(run_series, "_chunk_payloads", chunk_payloads)
+    parts = [
+        part
+        async for part in run_series.iter_packed_frames(
+            "run-1", limit=2, cursor=0, region_ids=["c", "a"], precision="f4"
+        )
+    ]
+    (size,) = struct.unpack_from("<I", parts[0])
+    index = json.loads(parts[0][4 : 4 + size])
+    assert index["regions"] == ["a", "c"]
+    frames = [unpack_frame(part)[0] for part in parts[1:]]
+    assert [frame.t for frame in frames] == [1, 2]
+    assert frames[1].values.dtype == np.float32
+    assert frames[1].values[:, 1].tolist() == [44.0 + 3 * f for f in range(len(FRAME_FIELDS))]
+
+
+class SqliteSession:
+    """Runs the service's statements on an in-memory SQLite database."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    async def execute(self, stmt):
+        return self.session.execute(stmt)
+
+
+_TABLES = (
+    "CREATE TABLE run_series (id INTEGER PRIMARY KEY, run_id TEXT, t INTEGER, region_id TEXT,"
+    " S REAL, E REAL, I REAL, R REAL, D REAL, new_cases REAL, rt REAL, policy_state TEXT)",
+    "CREATE TABLE run_series_chunks (id INTEGER PRIMARY KEY, run_id TEXT, artifact_id TEXT,"
+    " t_start INTEGER, t_end INTEGER, frames INTEGER, payload BLOB)",
+    "CREATE TABLE artifacts (id TEXT PRIMARY KEY, run_id TEXT, kind TEXT, storage_path TEXT,"
+    " bytes INTEGER)",
+)
+
+
+@pytest.fixture(params=["rows", "chunks"])
+def store(request: pytest.FixtureRequest):
+    """``CUBE`` stored for ``run-1`` as ``run_series`` rows or as two columnar chunks."""
+
+    engine = create_engine("sqlite://").execution_options(schema_translate_map={"public": None})
+    with engine.begin() as connection:
+        for ddl in _TABLES:
+            connection.execute(text(ddl))
+    with Session(engine) as session:
+        if request.param == "rows":
+            session.add_all(
+                RunSeries(
+                    run_id="run-1",
+                    t=t,
+                    region_id=region,
+                    **dict(zip(FRAME_FIELDS, CUBE[t, :, column].tolist(), strict=True)),
+                )
+                for t in range(len(CUBE))
+                for column, region in enumerate(REGIONS)
+            )
+        else:
+            session.add(
+                Artifacts(id="art-1", run_id="run-1", kind="series", storage_path="", bytes=0)
+            )
+            session.add_all(
+                RunSeriesChunks(
+                    run_id="run-1",
+                    artifact_id="art-1",
+                    t_start=start,
+                    t_end=start + 1,
+                    frames=2,
+                    payload=payload,
+                )
+                for start, payload in zip([0, 2], _payloads(), strict=True)
+            )
+        session.commit()
+        yield SqliteSession(session)
+
+
+def _page(frames) -> list[tuple[int, list[str]]]:
+    return [(frame.t, [point.region_id for point in frame.series]) for frame in frames]
+
+
+@pytest.mark.asyncio
+async def test_pages_hold_whole_frames(store: SqliteSession) -> None:
+    first = await run_series.list_frames(store, "run-1", limit=3)
+    assert _page(first) == [(t, REGIONS) for t in range(3)]
+    assert [point.I for point in first[2].series] == CUBE[2, 2].tolist()
+    rest = await run_series.list_frames(store, "run-1", limit=3, cursor=first[-1].t)
+    assert _page(rest) == [(3, REGIONS)]
+
+
+@pytest.mark.asyncio
+async def test_time_range_and_cursor_combine(store: SqliteSession) -> None:
+    ranged = await run_series.list_frames(store, "run-1", cursor=0, t_from=2)
+    assert [frame.t for frame in ranged] == [2, 3]
+    past_range = await run_series.list_frames(store, "run-1", cursor=2, t_from=1, t_to=2)
+    assert past_range == []
+    bounded = await run_series.list_frames(store, "run-1", t_from=1, t_to=2)
+    assert [frame.t for frame in bounded] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_region_filter_keeps_frames_without_matches(store: SqliteSession) -> None:
+    narrowed = await run_series.list_frames(store, "run-1", limit=2, region_ids=["c", "a"])
+    assert _page(narrowed) == [(0, ["a", "c"]), (1, ["a", "c"])]
+    unmatched = await run_series.list_frames(store, "run-1", limit=2, region_ids=["zz"])
+    assert _page(unmatched) == [(0, []), (1, [])]
@@ -0,0 +1,55 @@
+import pytest
+from pydantic import ValidationError
+
+from epidemic_sim.schemas.dto import EngineCfg, Run, RunCreateRequest
+
+BASE = {"type": "mechanistic", "version": "1.0.0", "seed": 1, "horizon": 30}
+
+
+def _request(
+    dt: float, output_interval: int, integrator: str, members: int = 1
+) -> RunCreateRequest:
+    engine = {
+        **BASE,
+        "dt": dt,
+        "output_interval": output_interval,
+        "integrator": integrator,
+        "ensemble_members": members,
+    }
+    return RunCreateRequest.model_validate({"scenario_id": "scn-1", "engine": engine, "seed": 1})
+
+
+@pytest.mark.parametrize(
+    ("dt", "output_interval", "integrator"),
+    [(1.0, 1, "rk4"), (0.25, 1, "rk4"), (0.5, 3, "tau-leap"), (0.3, 1, "dopri5")],
+)
+def test_runs_with_whole_steps_per_frame_are_accepted(
+    dt: float, output_interval: int, integrator: str
+) -> None:
+    _request(dt, output_interval, integrator)
+
+
+@pytest.mark.parametrize(
+    ("dt", "output_interval", "integrator"),
+    [(0.3, 1, "rk4"), (0.7, 1, "tau-leap"), (2.0, 1, "rk4"), (0.0, 1, "rk4"), (-1.0, 1, "dopri5")],
+)
+def test_runs_the_worker_cannot_step_are_rejected(
+    dt: float, output_interval: int, integrator: str
+) -> None:
+    with pytest.raises(ValidationError):
+        _request(dt, output_interval, integrator)
+
+
+@pytest.mark.parametrize("integrator", ["rk4", "dopri5"])
+def test_ensembles_need_a_stochastic_integrator(integrator: str) -> None:
+    _request(1.0, 1, "tau-leap", members=16)
+    with pytest.raises(ValidationError):
+        _request(1.0, 1, integrator, members=16)
+
+
+def test_stored_engines_stay_readable() -> None:
+    engine = EngineCfg(**BASE, dt=0.3)
+    run = Run(
+        id="run-1", scenario_id="scn-1", owner_id="user-1", engine=engine, status="failed", seed=1
+    )
+    assert run.engine.dt == 0.3
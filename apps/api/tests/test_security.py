@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from epidemic_sim.core import security
+from epidemic_sim.core.errors import ApiError
+
+_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+class CountingJwks(security.JwksCache):
+    """JWKS cache whose endpoint serves ``served`` kids and counts the fetches."""
+
+    def __init__(self, ttl: float = 3600, min_refetch: float = 30) -> None:
+        super().__init__("http://jwks.invalid", ttl=ttl, min_refetch=min_refetch)
+        self.served = {"k1"}
+        self.fetches = 0
+
+    async def _fetch(self) -> None:
+        self.fetches += 1
+        await asyncio.sleep(0)
+        self._keys = {kid: _KEY.public_key() for kid in self.served}
+        self._fetched_at = time.monotonic()
+
+
+def _age(cache: security.JwksCache, seconds: float) -> None:
+    """Pretend the last fetch, and the last attempt, happened ``seconds`` earlier."""
+
+    cache._fetched_at -= seconds
+    cache._attempted_at -= seconds
+
+
+async def _unreachable(cache: CountingJwks) -> None:
+    cache.fetches += 1
+    await asyncio.sleep(0.01)
+    raise httpx.ConnectError("jwks down")
+
+
+def _token(kid: str = "k1", **claims: object) -> str:
+    payload = {"sub": "user-1", "exp": int(time.time()) + 600, **claims}
+    return jwt.encode(payload, _KEY, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def jwks(monkeypatch: pytest.MonkeyPatch) -> CountingJwks:
+    cache = CountingJwks()
+    monkeypatch.setattr(security, "get_jwks_cache", lambda: cache)
+    tokens = security.VerifiedTokenCache(maxsize=2)
+    monkeypatch.setattr(security, "get_token_cache", lambda: tokens)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_verified_tokens_skip_the_signature_check(jwks: CountingJwks) -> None:
+    token = _token()
+    first = await security.resolve_auth(f"Bearer {token}")
+    jwks.served = set()
+    jwks._fetched_at = float("-inf")
+    assert await security.resolve_auth(f"Bearer {token}") is first
+    assert jwks.fetches == 1
+    assert len(security.get_token_cache()) == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_or_unsigned_tokens_are_rejected(jwks: CountingJwks) -> None:
+    with pytest.raises(ApiError) as expired:
+        await security.resolve_auth(None, _token(exp=int(time.time()) - 1))
+    assert expired.value.problem.code == "auth.invalid_token"
+    with pytest.raises(ApiError) as garbled:
+        await security.resolve_auth(None, "not-a-jwt")
+    assert garbled.value.problem.code == "auth.invalid_token"
+    assert len(security.get_token_cache()) == 0
+
+
+def test_token_cache_drops_expired_and_least_recent_entries() -> None:
+    cache = security.VerifiedTokenCache(maxsize=2)
+    context = security.AuthContext("user-1", None)
+    now = time.time()
+    cache.put("stale", context, now - 1)
+    assert cache.get("stale") is None
+    cache.put("a", context, now + 60)
+    cache.put("b", context, now + 60)
+    assert cache.get("a") is context
+    cache.put("c", context, now + 60)
+    assert cache.get("b") is None
+    assert cache.get("a") is context
+
+
+@pytest.mark.asyncio
+async def test_rotated_kids_refetch_at_most_once_per_interval(jwks: CountingJwks) -> None:
+    assert await jwks.get("k1") is not None
+    jwks.served = {"k1", "k2"}
+    assert await jwks.get("k2") is None  # the last fetch is too recent to try again
+    _age(jwks, 30)
+    results = await asyncio.gather(jwks.get("k2"), jwks.get("k2"), jwks.get("k3"))
+    assert results[0] is not None and results[1] is not None and results[2] is None
+    assert jwks.fetches == 2
+
+
+@pytest.mark.asyncio
+async def test_aging_keys_refresh_in_the_background() -> None:
+    cache = CountingJwks(ttl=100)
+    await cache.get("k1")
+    _age(cache, 60)
+    assert await cache.get("k1") is not None
+    assert cache.fetches == 1
+    await asyncio.sleep(0.01)
+    assert cache.fetches == 2
+    assert time.monotonic() - cache._fetched_at < 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_kids_during_an_outage_are_unauthorized(
+    jwks: CountingJwks, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    assert await jwks.get("k1") is not None
+    monkeypatch.setattr(jwks, "_fetch", lambda: _unreachable(jwks))
+    _age(jwks, 30)
+
+    forged = _token(kid="forged")
+    results = await asyncio.gather(
+        *(security.resolve_auth(None, forged) for _ in range(10)), return_exceptions=True
+    )
+    assert all(isinstance(result, ApiError) for result in results)
+    assert {result.problem.code for result in results} == {"auth.unknown_key"}
+    assert jwks.fetches == 2
+    with pytest.raises(ApiError):
+        await security.resolve_auth(None, forged)
+    assert jwks.fetches == 2
+    assert await jwks.get("k1") is not None
+
+
+@pytest.mark.asyncio
+async def test_expired_keys_stay_in_use_while_the_endpoint_is_down(
+    jwks: CountingJwks, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    key = await jwks.get("k1")
+    monkeypatch.setattr(jwks, "_fetch", lambda: _unreachable(jwks))
+    _age(jwks, 3600)
+
+    assert await asyncio.gather(*(jwks.get("k1") for _ in range(10))) == [key] * 10
+    assert jwks.fetches == 2
+    assert await asyncio.gather(*(jwks.get("k1") for _ in range(10))) == [key] * 10
+    assert jwks.fetches == 2  # backing off after the failed attempt
+
+    jwks._attempted_at -= 30
+    assert await jwks.get("k1") is key
+    assert jwks.fetches == 3
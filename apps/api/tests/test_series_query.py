@@ -0,0 +1,42 @@
+import numpy as np
+
+from epidemic_sim.core.columnar import SeriesChunk
+from epidemic_sim.schemas.dto import SeriesQuery
+from epidemic_sim.services.series_query import aggregate_chunk, lttb
+
+FIELDS = ["S", "E", "I", "R", "D", "new_cases", "rt"]
+
+
+def _chunk() -> SeriesChunk:
+    # Frame t, field f, region r holds 100 * t + 10 * f + r.
+    t = [0, 1, 2, 3]
+    cube = np.fromfunction(lambda ti, f, r: 100.0 * ti + 10.0 * f + r, (4, len(FIELDS), 3))
+    return SeriesChunk(t=t, region_ids=["a", "b", "c"], fields=FIELDS, values=cube)
+
+
+def test_chunks_aggregate_over_overlapping_groups() -> None:
+    query = SeriesQuery(
+        fields=["I"], agg="mean", groups={"ab": ["a", "b"], "bc": ["b", "c", "zz"]}, t_from=1
+    )
+    aggregated = aggregate_chunk(_chunk(), query)
+    t, ab = aggregated["ab", "I"]
+    assert t.tolist() == [1, 2, 3]
+    assert ab.tolist() == [120.5, 220.5, 320.5]
+    assert aggregated["bc", "I"][1].tolist() == [121.5, 221.5, 321.5]
+
+
+def test_chunks_sum_every_region_by_default() -> None:
+    aggregated = aggregate_chunk(_chunk(), SeriesQuery(fields=["S"], t_to=1))
+    assert list(aggregated) == [("all", "S")]
+    assert aggregated["all", "S"][1].tolist() == [3.0, 303.0]
+
+
+def test_lttb_keeps_the_ends_and_the_peak() -> None:
+    t = np.arange(1_000)
+    y = np.exp(-(((t - 613) / 40.0) ** 2))
+    picked = lttb(t, y, 50)
+    assert len(picked) == 50
+    assert picked[0] == 0 and picked[-1] == 999
+    assert np.all(np.diff(picked) > 0)
+    assert y[picked].max() > 0.99
+    assert lttb(t[:10], y[:10], 50).tolist() == list(range(10))
@@ -8,6 +8,8 @@
   ScenarioCreateRequest,
 } from "@epidemic-sim/shared-schemas";
 
+import { type FrameIndex, type PackedFrame, PackedFrameDecoder } from "@/lib/frame-codec";
+
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_BASE_URL ?? "http://localhost:8000/v1";
 
 async function handleResponse<T>(response: Response): Promise<T> {
@@ -57,32 +59,316 @@ export async function createRun(token: string, payload: RunCreateRequest): Promi
   return handleResponse<Run>(response);
 }
 
+export interface RunFramesQuery {
+  readonly cursor?: number;
+  readonly limit?: number;
+  readonly regions?: readonly string[];
+  readonly tFrom?: number;
+  readonly tTo?: number;
+  readonly precision?: "f8" | "f4";
+}
+
+const PACKED_FRAMES_MEDIA_TYPE = "application/vnd.epidemic-sim.frames";
+
+/** A page of frames in the packed binary format; the page is full when it holds `limit` frames. */
+export async function getRunFramesPacked(
+  token: string,
+  runId: string,
+  query: RunFramesQuery = {},
+): Promise<PackedFrame[]> {
+  const params = new URLSearchParams();
+  query.regions?.forEach((region) => params.append("regions", region));
+  if (query.cursor !== undefined) {
+    params.set("cursor", String(query.cursor));
+  }
+  if (query.limit !== undefined) {
+    params.set("limit", String(query.limit));
+  }
+  if (query.tFrom !== undefined) {
+    params.set("t_from", String(query.tFrom));
+  }
+  if (query.tTo !== undefined) {
+    params.set("t_to", String(query.tTo));
+  }
+  params.set("precision", query.precision ?? "f8");
+  const response = await fetch(`${API_BASE_URL}/runs/${runId}/frames?${params.toString()}`, {
+    headers: {
+      Accept: PACKED_FRAMES_MEDIA_TYPE,
+      Authorization: `Bearer ${token}`,
+    },
+    // Pages of completed runs are immutable and revalidate by ETag.
+    cache: "default",
+  });
+  if (!response.ok) {
+    return handleResponse<PackedFrame[]>(response);
+  }
+  const buffer = await response.arrayBuffer();
+  const view = new DataView(buffer);
+  const indexLength = view.getUint32(0, true);
+  const index = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 4, indexLength))) as {
+    regions: string[];
+    fields: string[];
+  };
+  const decoder = new PackedFrameDecoder({ ...index, quantum: null });
+  const itemSize = query.precision === "f4" ? 4 : 8;
+  const frameBytes = 16 + index.fields.length * index.regions.length * itemSize;
+  const frames: PackedFrame[] = [];
+  for (let offset = 4 + indexLength; offset < buffer.byteLength; offset += frameBytes) {
+    frames.push(decoder.decodeBytes(buffer.slice(offset, offset + frameBytes)));
+  }
+  return frames;
+}
+
+export interface RunSeriesQuery {
+  readonly fields?: readonly string[];
+  readonly agg?: "sum" | "mean";
+  /** Group label -> region ids; every region forms one `all` group when omitted. */
+  readonly groups?: Readonly<Record<string, readonly string[]>>;
+  readonly step?: number;
+  readonly tFrom?: number;
+  readonly tTo?: number;
+  /** LTTB target point count per series. */
+  readonly points?: number;
+}
+
+export interface AggregateSeries {
+  readonly group: string;
+  readonly field: string;
+  readonly t: number[];
+  readonly values: (number | null)[];
+}
+
+export async function getRunSeries(
+  token: string,
+  runId: string,
+  query: RunSeriesQuery = {},
+): Promise<{ run_id: string; agg: "sum" | "mean"; series: AggregateSeries[] }> {
+  const params = new URLSearchParams();
+  query.fields?.forEach((field) => params.append("fields", field));
+  Object.entries(query.groups ?? {}).forEach(([label, regions]) =>
+    params.append("group", `${label}:${regions.join(",")}`),
+  );
+  if (query.agg) {
+    params.set("agg", query.agg);
+  }
+  if (query.step !== undefined) {
+    params.set("step", String(query.step));
+  }
+  if (query.tFrom !== undefined) {
+    params.set("t_from", String(query.tFrom));
+  }
+  if (query.tTo !== undefined) {
+    params.set("t_to", String(query.tTo));
+  }
+  if (query.points !== undefined) {
+    params.set("points", String(query.points));
+  }
+  const response = await fetch(`${API_BASE_URL}/runs/${runId}/series?${params.toString()}`, {
+    headers: {
+      Authorization: `Bearer ${token}`,
+    },
+    cache: "no-store",
+  });
+  return handleResponse(response);
+}
+
+export interface RunStreamOptions {
+  /** `packed` frames arrive as `PackedFrame`s instead of JSON frames. */
+  readonly format?: "json" | "packed";
+  readonly precision?: "f8" | "f4";
+  /** Quantization step for packed values; required for `delta`. */
+  readonly quantum?: number;
+  readonly delta?: boolean;
+  /** Frames kept when the client falls behind: the newest, or every `stride`-th. */
+  readonly conflate?: "latest" | "stride";
+  readonly stride?: number;
+}
+
 export function openRunStream(
   token: string,
   runId: string,
   onMessage: (frame: unknown) => void,
+  options: RunStreamOptions = {},
 ): () => void {
   const controller = new AbortController();
-  const url = `${API_BASE_URL}/runs/${runId}/stream?token=${encodeURIComponent(token)}`;
-  const eventSource = new EventSource(url, { withCredentials: false });
-
-  eventSource.onmessage = (event) => {
-    try {
-      const data = JSON.parse(event.data);
-      onMessage(data);
-    } catch (error) {
-      console.error("stream.parse", error);
+  const params = new URLSearchParams({ token });
+  if (options.format === "packed") {
+    params.set("format", "packed");
+    params.set("precision", options.precision ?? "f8");
+    if (options.quantum !== undefined) {
+      params.set("quantum", String(options.quantum));
     }
-  };
-  eventSource.onerror = (error) => {
-    console.error("stream.error", error);
-    eventSource.close();
+    if (options.delta) {
+      params.set("delta", "true");
+    }
+  }
+  if (options.conflate) {
+    params.set("conflate", options.conflate);
+    if (options.stride !== undefined) {
+      params.set("stride", String(options.stride));
+    }
+  }
+  let lastEventId: string | null = null;
+  let eventSource: EventSource | null = null;
+
+  const connect = () => {
+    if (controller.signal.aborted) {
+      return;
+    }
+    if (lastEventId) {
+      params.set("lastEventId", lastEventId);
+    }
+    const source = new EventSource(`${API_BASE_URL}/runs/${runId}/stream?${params.toString()}`, {
+      withCredentials: false,
+    });
+    eventSource = source;
+    // A reconnect replays from lastEventId, and the server restarts the delta chain with it.
+    let decoder: PackedFrameDecoder | null = null;
+
+    source.addEventListener("index", (event) => {
+      const index = JSON.parse((event as MessageEvent<string>).data) as FrameIndex;
+      decoder = new PackedFrameDecoder(index);
+    });
+    source.addEventListener("frame", (event) => {
+      const message = event as MessageEvent<string>;
+      try {
+        if (options.format !== "packed") {
+          onMessage(JSON.parse(message.data));
+        } else if (decoder) {
+          onMessage(decoder.decode(message.data));
+        }
+        lastEventId = message.lastEventId || lastEventId;
+      } catch (error) {
+        console.error("stream.parse", error);
+      }
+    });
+    source.addEventListener("end", () => {
+      source.close();
+    });
+    source.onerror = (error) => {
+      console.error("stream.error", error);
+      source.close();
+      if (!controller.signal.aborted) {
+        window.setTimeout(connect, 1_000);
+      }
+    };
   };
 
+  connect();
   controller.signal.addEventListener("abort", () => {
-    eventSource.close();
+    eventSource?.close();
   });
 
   return () => controller.abort();
 }
 
+export interface RunSubscription {
+  /** Region ids to receive; every region when omitted. */
+  readonly regions?: readonly string[];
+  readonly fields?: readonly string[];
+  /** Minimum days between delivered frames. */
+  readonly step?: number;
+}
+
+export interface RunSocket {
+  /** Replaces the subscription from the next frame on. */
+  subscribe(subscription: RunSubscription): void;
+  close(): void;
+}
+
+export function openRunSocket(
+  token: string,
+  runId: string,
+  onMessage: (frame: unknown) => void,
+  subscription: RunSubscription = {},
+  options: RunStreamOptions = {},
+): RunSocket {
+  const params = new URLSearchParams({ token });
+  if (options.format === "packed") {
+    params.set("format", "packed");
+    params.set("precision", options.precision ?? "f8");
+    if (options.quantum !== undefined) {
+      params.set("quantum", String(options.quantum));
+    }
+    if (options.delta) {
+      params.set("delta", "true");
+    }
+  }
+  if (options.conflate) {
+    params.set("conflate", options.conflate);
+    if (options.stride !== undefined) {
+      params.set("stride", String(options.stride));
+    }
+  }
+  const wsBase = API_BASE_URL.replace(/^http/, "ws");
+  let current = subscription;
+  let lastEventId: string | null = null;
+  let socket: WebSocket | null = null;
+  let closed = false;
+
+  const connect = () => {
+    if (closed) {
+      return;
+    }
+    // Reconnects resume from the last frame with the latest subscription.
+    const query = new URLSearchParams(params);
+    current.regions?.forEach((region) => query.append("regions", region));
+    current.fields?.forEach((field) => query.append("fields", field));
+    if (current.step !== undefined) {
+      query.set("step", String(current.step));
+    }
+    if (lastEventId) {
+      query.set("lastEventId", lastEventId);
+    }
+    const ws = new WebSocket(`${wsBase}/runs/${runId}/ws?${query.toString()}`);
+    ws.binaryType = "arraybuffer";
+    socket = ws;
+    let decoder: PackedFrameDecoder | null = null;
+    let ended = false;
+
+    ws.onmessage = (event: MessageEvent<string | ArrayBuffer>) => {
+      try {
+        if (typeof event.data !== "string") {
+          if (decoder) {
+            const frame = decoder.decodeBytes(event.data);
+            lastEventId = String(frame.t);
+            onMessage(frame);
+          }
+          return;
+        }
+        const message = JSON.parse(event.data) as { type: string; id?: string };
+        if (message.type === "index") {
+          decoder = new PackedFrameDecoder(message as unknown as FrameIndex);
+        } else if (message.type === "frame") {
+          lastEventId = message.id ?? lastEventId;
+          onMessage(message);
+        } else if (message.type === "end") {
+          ended = true;
+        } else if (message.type === "error") {
+          console.error("stream.subscription", message);
+        }
+      } catch (error) {
+        console.error("stream.parse", error);
+      }
+    };
+    ws.onclose = () => {
+      if (!closed && !ended) {
+        window.setTimeout(connect, 1_000);
+      }
+    };
+  };
+
+  connect();
+  return {
+    subscribe(next: RunSubscription) {
+      current = next;
+      if (socket?.readyState === WebSocket.OPEN) {
+        socket.send(JSON.stringify(next));
+      }
+    },
+    close() {
+      closed = true;
+      socket?.close();
+    },
+  };
+}
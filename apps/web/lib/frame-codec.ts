@@ -0,0 +1,87 @@
+// Decoder for the API's packed frames (`/runs/{id}/stream?format=packed` and `/runs/{id}/ws`).
+// Each frame is a 16-byte little-endian header followed by (fields x regions) values; region ids
+// arrive once in the stream's `index` event.
+
+export interface FrameIndex {
+  readonly regions: string[];
+  readonly fields: string[];
+  readonly quantum: number | null;
+}
+
+export interface PackedFrame {
+  readonly t: number;
+  readonly regionIds: readonly string[];
+  readonly columns: Readonly<Record<string, Float64Array>>;
+}
+
+const HEADER_BYTES = 16;
+const FLAG_DELTA = 1;
+
+function readValues(buffer: ArrayBuffer, typecode: string, count: number): ArrayLike<number> {
+  // Typed arrays use the platform byte order, which is little-endian on every supported browser.
+  switch (typecode) {
+    case "d":
+      return new Float64Array(buffer, HEADER_BYTES, count);
+    case "f":
+      return new Float32Array(buffer, HEADER_BYTES, count);
+    case "i":
+      return new Int32Array(buffer, HEADER_BYTES, count);
+    case "h":
+      return new Int16Array(buffer, HEADER_BYTES, count);
+    case "b":
+      return new Int8Array(buffer, HEADER_BYTES, count);
+    default:
+      throw new Error(`frame.typecode ${typecode}`);
+  }
+}
+
+export class PackedFrameDecoder {
+  private previous: Float64Array | null = null;
+
+  constructor(private readonly index: FrameIndex) {}
+
+  decode(encoded: string): PackedFrame {
+    const binary = atob(encoded);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i += 1) {
+      bytes[i] = binary.charCodeAt(i);
+    }
+    return this.decodeBytes(bytes.buffer);
+  }
+
+  decodeBytes(buffer: ArrayBuffer): PackedFrame {
+    const bytes = new Uint8Array(buffer);
+    if (bytes[0] !== 0x45 || bytes[1] !== 0x46 || bytes[2] !== 1) {
+      throw new Error("frame.version");
+    }
+    const view = new DataView(bytes.buffer);
+    const flags = bytes[3];
+    const typecode = String.fromCharCode(bytes[4]);
+    const fields = bytes[5];
+    const t = view.getInt32(8, true);
+    const regions = view.getUint32(12, true);
+
+    let values = Float64Array.from(readValues(bytes.buffer, typecode, fields * regions));
+    if (typecode === "d" || typecode === "f") {
+      this.previous = null;
+    } else {
+      if (flags & FLAG_DELTA) {
+        if (!this.previous) {
+          throw new Error("frame.delta_without_base");
+        }
+        for (let i = 0; i < values.length; i += 1) {
+          values[i] += this.previous[i];
+        }
+      }
+      this.previous = values;
+      const quantum = this.index.quantum ?? 1;
+      values = values.map((value) => value * quantum);
+    }
+
+    const columns: Record<string, Float64Array> = {};
+    this.index.fields.forEach((field, offset) => {
+      columns[field] = values.subarray(offset * regions, (offset + 1) * regions);
+    });
+    return { t, regionIds: this.index.regions, columns };
+  }
+}
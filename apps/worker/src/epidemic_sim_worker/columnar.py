@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from collections.abc import Sequence
+
+import numpy as np
+
+FORMAT_VERSION = 1
+SERIES_FIELDS = ("S", "E", "I", "R", "D", "new_cases", "rt")
+
+_HEADER = struct.Struct("<I")
+
+
+def _shuffle(values: np.ndarray) -> bytes:
+    # Grouping the n-th byte of every value together puts exponents and high mantissa bytes next
+    # to each other, which deflate compresses far better than interleaved floats.
+    raw = np.ascontiguousarray(values).view(np.uint8).reshape(-1, values.dtype.itemsize)
+    return raw.T.tobytes()
+
+
+def _unshuffle(body: bytes, dtype: np.dtype, shape: tuple[int, ...]) -> np.ndarray:
+    raw = np.frombuffer(body, dtype=np.uint8).reshape(dtype.itemsize, -1)
+    return np.ascontiguousarray(raw.T).view(dtype).reshape(shape)
+
+
+def encode_chunk(
+    times: np.ndarray, region_ids: Sequence[str], values: np.ndarray, level: int = 6
+) -> bytes:
+    """Pack ``values`` shaped (frames, ``SERIES_FIELDS``, regions) into one compressed chunk.
+
+    The chunk is self-describing: a JSON header carries the frame times, region order and dtype,
+    followed by the byte-shuffled array; the whole payload is deflated.
+    """
+
+    frames, fields, regions = values.shape
+    if fields != len(SERIES_FIELDS) or frames != len(times) or regions != len(region_ids):
+        raise ValueError("values must be shaped (len(times), len(SERIES_FIELDS), len(region_ids))")
+    header = json.dumps(
+        {
+            "version": FORMAT_VERSION,
+            "dtype": values.dtype.str,
+            "shape": list(values.shape),
+            "fields": list(SERIES_FIELDS),
+            "t": [int(t) for t in times],
+            "regions": list(region_ids),
+        },
+        separators=(",", ":"),
+    ).encode()
+    return zlib.compress(_HEADER.pack(len(header)) + header + _shuffle(values), level)
+
+
+def decode_chunk(payload: bytes) -> tuple[list[int], list[str], np.ndarray]:
+    """Inverse of ``encode_chunk``: frame times, region ids and the chunk values."""
+
+    raw = zlib.decompress(payload)
+    (size,) = _HEADER.unpack_from(raw)
+    header = json.loads(raw[_HEADER.size : _HEADER.size + size])
+    if header["version"] != FORMAT_VERSION:
+        raise ValueError(f"unsupported chunk format version {header['version']}")
+    values = _unshuffle(
+        raw[_HEADER.size + size :], np.dtype(header["dtype"]), tuple(header["shape"])
+    )
+    return header["t"], header["regions"], values
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -16,6 +17,16 @@ class WorkerSettings(BaseSettings):
     )
     run_queue_name: str = Field(default="simulation-runs", alias="RUN_QUEUE_NAME")
     batch_size: int = Field(default=24, ge=1, alias="BATCH_SIZE")
+    preload: bool = Field(default=True, alias="WORKER_PRELOAD")
+    frame_chunk_size: int = Field(default=16, ge=1, alias="FRAME_CHUNK_SIZE")
+    checkpoint_every_chunks: int = Field(default=4, ge=1, alias="CHECKPOINT_EVERY_CHUNKS")
+    checkpoint_ttl_seconds: int = Field(default=86_400, ge=1, alias="CHECKPOINT_TTL_SECONDS")
+    result_store: Literal["rows", "columnar"] = Field(default="rows", alias="RESULT_STORE")
+    series_chunk_days: int = Field(default=30, ge=1, alias="SERIES_CHUNK_DAYS")
+    frame_encoding: Literal["json", "packed"] = Field(default="json", alias="FRAME_ENCODING")
+    # Frames kept per run stream for late subscribers; never fewer than a run leaves uncommitted.
+    frame_stream_maxlen: int = Field(default=512, ge=1, alias="FRAME_STREAM_MAXLEN")
+    frame_stream_ttl_seconds: int = Field(default=86_400, ge=1, alias="FRAME_STREAM_TTL_SECONDS")
 
 
 @lru_cache(maxsize=1)
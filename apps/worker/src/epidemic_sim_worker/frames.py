@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import struct
+from typing import Any
+
+import numpy as np
+
+from epidemic_sim_worker.columnar import SERIES_FIELDS
+
+# Mirrors ``epidemic_sim.core.frames`` in the API, which decodes and re-encodes per client.
+FRAME_ENCODINGS = ("json", "packed")
+PACKED_MAGIC = b"EF"
+PACKED_VERSION = 1
+
+_HEADER = struct.Struct("<2sBBcB2xiI")  # magic, version, flags, typecode, fields, t, regions
+_TYPECODES = {np.dtype(np.float64): b"d", np.dtype(np.float32): b"f"}
+_PAYLOAD_KEYS = ("regionId", "S", "E", "I", "R", "D", "newCases", "rt")
+
+
+def stream_key(run_id: str) -> str:
+    """Capped Redis Stream every frame of a run is appended to."""
+
+    return f"run:{run_id}:frames"
+
+
+def index_key(run_id: str) -> str:
+    """Redis key holding the region order that packed frames refer to."""
+
+    return f"run:{run_id}:index"
+
+
+def frame_index(region_ids: list[str]) -> dict[str, Any]:
+    return {"regions": region_ids, "fields": list(SERIES_FIELDS)}
+
+
+def frame_payload(run_id: str, t: int, region_ids: list[str], values: np.ndarray) -> dict[str, Any]:
+    """JSON frame message; ``values`` stacks ``SERIES_FIELDS`` by region."""
+
+    return {
+        "runId": run_id,
+        "t": t,
+        "series": [
+            dict(zip(_PAYLOAD_KEYS, cell, strict=True))
+            for cell in zip(region_ids, *values.tolist(), strict=True)
+        ],
+        "perf": {"stepsPerSecond": 0.0},
+    }
+
+
+def pack_frame(t: int, values: np.ndarray) -> bytes:
+    """Packed frame: a 16-byte header, then ``values`` (fields, regions) as little-endian floats."""
+
+    body = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+    fields, regions = body.shape
+    header = _HEADER.pack(
+        PACKED_MAGIC, PACKED_VERSION, 0, _TYPECODES[values.dtype], fields, t, regions
+    )
+    return header + body.tobytes()
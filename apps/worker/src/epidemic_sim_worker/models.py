@@ -3,7 +3,17 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base, mapped_column, relationship
 
@@ -22,13 +32,17 @@ class Runs(Base):
     started_at = Column(DateTime)
     finished_at = Column(DateTime)
     metrics_summary = Column(JSONB)
+    fingerprint = Column(String, index=True)
+    results_run_id = Column(String, ForeignKey("runs.id"))
 
 
 class RunSeries(Base):
     __tablename__ = "run_series"
+    # Doubles as the index that frame pages and resume truncation scan by (run_id, t).
+    __table_args__ = (UniqueConstraint("run_id", "t", "region_id", name="uq_run_series"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    run_id = Column(String, ForeignKey("runs.id"), index=True, nullable=False)
+    run_id = Column(String, ForeignKey("runs.id"), nullable=False)
     t = Column(Integer, nullable=False)
     region_id = Column(String, nullable=False)
     S = Column(Float, nullable=False)
@@ -41,6 +55,29 @@ class RunSeries(Base):
     policy_state = Column(JSON)
 
 
+class Artifacts(Base):
+    __tablename__ = "artifacts"
+
+    id = Column(String, primary_key=True)
+    run_id = Column(String, ForeignKey("runs.id"), nullable=False)
+    kind = Column(String, nullable=False)
+    storage_path = Column(String, nullable=False)
+    bytes = Column(Integer, nullable=False)
+
+
+class RunSeriesChunks(Base):
+    __tablename__ = "run_series_chunks"
+    __table_args__ = (UniqueConstraint("run_id", "t_start", name="uq_run_series_chunks"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String, ForeignKey("runs.id"), index=True, nullable=False)
+    artifact_id = Column(String, ForeignKey("artifacts.id"), nullable=False)
+    t_start = Column(Integer, nullable=False)
+    t_end = Column(Integer, nullable=False)
+    frames = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+
+
 class Regions(Base):
     __tablename__ = "regions"
 
@@ -51,6 +88,16 @@ class Regions(Base):
     population = Column(Integer, nullable=False)
 
 
+class MobilityEdges(Base):
+    __tablename__ = "mobility_edges"
+
+    id = Column(String, primary_key=True)
+    dataset_id = Column(String, nullable=False)
+    src_region_id = Column(String, nullable=False)
+    dst_region_id = Column(String, nullable=False)
+    weight = Column(Float, nullable=False)
+
+
 class Scenarios(Base):
     __tablename__ = "scenarios"
 
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from itertools import repeat
+
+import numpy as np
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from epidemic_sim_worker.columnar import SERIES_FIELDS, decode_chunk, encode_chunk
+from epidemic_sim_worker.models import Artifacts, RunSeries, RunSeriesChunks
+from epidemic_sim_worker.simulation.model import COMPARTMENTS
+
+RESULT_STORES = ("rows", "columnar")
+
+SERIES_COLUMNS = (
+    "run_id",
+    "t",
+    "region_id",
+    "S",
+    "E",
+    "I",
+    "R",
+    "D",
+    "new_cases",
+    "rt",
+    "policy_state",
+)
+
+_CHUNK_COLUMNS = ("artifact_id", "t_start", "t_end", "frames", "payload")
+
+
+class RunSeriesWriter:
+    """Buffers ``run_series`` rows and writes them with binary ``COPY``, one commit per flush.
+
+    Drivers without ``COPY`` support fall back to a single multi-row insert per flush.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        run_id: str,
+        region_ids: Sequence[str],
+        rt: float,
+        batch_frames: int,
+    ) -> None:
+        self._session = session
+        self._run_id = run_id
+        self._regions = np.array(region_ids, dtype=object)
+        self._rt = rt
+        self._batch_frames = batch_frames
+        self._rows: list[tuple[object, ...]] = []
+        self._frames = 0
+
+    @property
+    def due(self) -> bool:
+        return self._frames >= self._batch_frames
+
+    def add_frames(self, times: np.ndarray, data: np.ndarray, new_cases: np.ndarray) -> None:
+        """Queue frames at ``times``; ``data`` is (frames, compartments, regions)."""
+
+        frames = len(times)
+        columns = (
+            self._run_id,
+            np.repeat(times, len(self._regions)),
+            np.tile(self._regions, frames),
+            *data.transpose(1, 0, 2).reshape(len(COMPARTMENTS), -1),
+            new_cases.ravel(),
+            self._rt,
+            None,
+        )
+        rows = frames * len(self._regions)
+        self._rows.extend(
+            zip(
+                *(
+                    column.tolist() if np.ndim(column) else repeat(column, rows)
+                    for column in columns
+                ),
+                strict=False,
+            )
+        )
+        self._frames += frames
+
+    async def flush(self) -> None:
+        if not self._rows:
+            return
+        connection = await self._session.connection()
+        raw = await connection.get_raw_connection()
+        driver = raw.driver_connection
+        if hasattr(driver, "copy_records_to_table"):
+            await driver.copy_records_to_table(
+                RunSeries.__tablename__, records=self._rows, columns=SERIES_COLUMNS
+            )
+        else:
+            await self._session.execute(
+                insert(RunSeries.__table__),
+                [dict(zip(SERIES_COLUMNS, row, strict=True)) for row in self._rows],
+            )
+        await self._session.commit()
+        self._rows = []
+        self._frames = 0
+
+    async def truncate(self, after_t: int | None = None) -> None:
+        """Drop stored frames after ``after_t``, or all of them."""
+
+        table = RunSeries.__table__
+        stmt = delete(table).where(table.c.run_id == self._run_id)
+        if after_t is not None:
+            stmt = stmt.where(table.c.t > after_t)
+        await self._session.execute(stmt)
+
+    async def copy_prefix(self, source_run_id: str, last_t: int, frames: int) -> bool:
+        """Copy frames up to ``last_t`` from ``source_run_id``; False unless all ``frames`` came."""
+
+        table = RunSeries.__table__
+        names = [name for name in SERIES_COLUMNS if name != "run_id"]
+        rows = select(literal(self._run_id), *(table.c[name] for name in names)).where(
+            table.c.run_id == source_run_id, table.c.t <= last_t
+        )
+        result = await self._session.execute(insert(table).from_select(["run_id", *names], rows))
+        return result.rowcount == frames * len(self._regions)
+
+    async def peak(self, field: str) -> float:
+        column = RunSeries.__table__.c[field]
+        stmt = select(func.max(column)).where(RunSeries.run_id == self._run_id)
+        return float((await self._session.execute(stmt)).scalar() or 0.0)
+
+    async def finish(self) -> None:
+        await self.flush()
+
+
+class RunSeriesChunkWriter:
+    """Stores frames as compressed columnar chunks, one ``run_series_chunks`` row per flush.
+
+    Every chunk holds a contiguous range of frames for all regions (see ``columnar``) and hangs
+    off a single ``series`` artifact per run, whose size is settled by ``finish``.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        run_id: str,
+        region_ids: Sequence[str],
+        rt: float,
+        batch_frames: int,
+    ) -> None:
+        self._session = session
+        self._run_id = run_id
+        self._region_ids = list(region_ids)
+        self._rt = rt
+        self._batch_frames = batch_frames
+        self._artifact_id = f"{run_id}:series"
+        self._times: list[np.ndarray] = []
+        self._values: list[np.ndarray] = []
+        self._frames = 0
+
+    @property
+    def due(self) -> bool:
+        return self._frames >= self._batch_frames
+
+    def add_frames(self, times: np.ndarray, data: np.ndarray, new_cases: np.ndarray) -> None:
+        """Queue frames at ``times``; ``data`` is (frames, compartments, regions)."""
+
+        frames, compartments, regions = data.shape
+        values = np.empty((frames, len(SERIES_FIELDS), regions), dtype=data.dtype)
+        values[:, :compartments] = data
+        values[:, compartments] = new_cases
+        values[:, compartments + 1] = self._rt
+        self._times.append(np.asarray(times))
+        self._values.append(values)
+        self._frames += frames
+
+    async def _ensure_artifact(self) -> None:
+        await self._session.execute(
+            pg_insert(Artifacts.__table__)
+            .values(
+                id=self._artifact_id,
+                run_id=self._run_id,
+                kind="series",
+                storage_path=f"{RunSeriesChunks.__tablename__}/{self._run_id}",
+                bytes=0,
+            )
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+
+    async def flush(self) -> None:
+        if not self._values:
+            return
+        times = np.concatenate(self._times)
+        payload = encode_chunk(times, self._region_ids, np.concatenate(self._values))
+        await self._ensure_artifact()
+        await self._session.execute(
+            insert(RunSeriesChunks.__table__).values(
+                run_id=self._run_id,
+                artifact_id=self._artifact_id,
+                t_start=int(times[0]),
+                t_end=int(times[-1]),
+                frames=len(times),
+                payload=payload,
+            )
+        )
+        await self._session.commit()
+        self._times = []
+        self._values = []
+        self._frames = 0
+
+    async def truncate(self, after_t: int | None = None) -> None:
+        """Drop stored frames after ``after_t``, or all of them.
+
+        Checkpoints are only published after a flush, so resume points always fall on chunk ends.
+        """
+
+        table = RunSeriesChunks.__table__
+        stmt = delete(table).where(table.c.run_id == self._run_id)
+        if after_t is not None:
+            stmt = stmt.where(table.c.t_end > after_t)
+        await self._session.execute(stmt)
+
+    async def copy_prefix(self, source_run_id: str, last_t: int, frames: int) -> bool:
+        """Copy chunks up to ``last_t`` from ``source_run_id``; False unless all ``frames`` came."""
+
+        table = RunSeriesChunks.__table__
+        await self._ensure_artifact()
+        chunks = select(
+            literal(self._run_id),
+            literal(self._artifact_id),
+            *(table.c[name] for name in _CHUNK_COLUMNS[1:]),
+        ).where(table.c.run_id == source_run_id, table.c.t_end <= last_t)
+        await self._session.execute(
+            insert(table).from_select(["run_id", *_CHUNK_COLUMNS], chunks)
+        )
+        copied = select(func.coalesce(func.sum(table.c.frames), 0)).where(
+            table.c.run_id == self._run_id
+        )
+        return (await self._session.execute(copied)).scalar() == frames
+
+    async def peak(self, field: str) -> float:
+        index = SERIES_FIELDS.index(field)
+        payloads = await self._session.execute(
+            select(RunSeriesChunks.payload).where(RunSeriesChunks.run_id == self._run_id)
+        )
+        peak = 0.0
+        for (payload,) in payloads:
+            peak = max(peak, float(decode_chunk(payload)[2][:, index].max()))
+        return peak
+
+    async def finish(self) -> None:
+        """Store any frames still queued as a last, possibly short, chunk and size the artifact."""
+
+        await self.flush()
+        table = RunSeriesChunks.__table__
+        stored = select(func.coalesce(func.sum(func.length(table.c.payload)), 0)).where(
+            table.c.run_id == self._run_id
+        )
+        await self._session.execute(
+            update(Artifacts.__table__)
+            .where(Artifacts.id == self._artifact_id)
+            .values(bytes=stored.scalar_subquery())
+        )
+        await self._session.commit()
+
+
+def series_writer(
+    store: str,
+    session: AsyncSession,
+    run_id: str,
+    region_ids: Sequence[str],
+    rt: float,
+    batch_frames: int,
+) -> RunSeriesWriter | RunSeriesChunkWriter:
+    if store not in RESULT_STORES:
+        raise ValueError(f"result store must be one of {RESULT_STORES}")
+    writer = RunSeriesChunkWriter if store == "columnar" else RunSeriesWriter
+    return writer(session, run_id, region_ids, rt, batch_frames)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import redis.asyncio as redis_async
+
+from epidemic_sim_worker.simulation.checkpoint import Checkpoint
+
+
+def _run_key(run_id: str) -> str:
+    return f"run:{run_id}:checkpoint"
+
+
+def _prefix_key(digest: str) -> str:
+    return f"checkpoint:prefix:{digest}"
+
+
+def prefix_frames(num_frames: int, chunk_frames: int, every_chunks: int) -> list[int]:
+    """Frames after which runs publish prefix checkpoints: the end of every ``every_chunks`` chunk.
+
+    Chunk ends stay on this grid when a run resumes from one of them, so branches keep sharing.
+    """
+
+    stride = chunk_frames * every_chunks
+    return list(range(stride - 1, num_frames, stride))
+
+
+async def save_run_checkpoint(
+    client: redis_async.Redis, run_id: str, checkpoint: Checkpoint, ttl_seconds: int
+) -> None:
+    await client.set(_run_key(run_id), checkpoint.to_bytes(), ex=ttl_seconds)
+
+
+async def load_run_checkpoint(client: redis_async.Redis, run_id: str) -> Checkpoint | None:
+    payload = await client.get(_run_key(run_id))
+    return Checkpoint.from_bytes(payload) if payload is not None else None
+
+
+async def clear_run_checkpoint(client: redis_async.Redis, run_id: str) -> None:
+    await client.delete(_run_key(run_id))
+
+
+async def save_prefix_checkpoint(
+    client: redis_async.Redis,
+    digest: str,
+    run_id: str,
+    checkpoint: Checkpoint,
+    ttl_seconds: int,
+) -> None:
+    shared = Checkpoint(checkpoint.frame, checkpoint.state, checkpoint.trial_step, source=run_id)
+    await client.set(_prefix_key(digest), shared.to_bytes(), ex=ttl_seconds)
+
+
+async def find_prefix_checkpoint(
+    client: redis_async.Redis, digests: dict[int, str]
+) -> Checkpoint | None:
+    """Latest shared checkpoint among ``digests`` (frame -> prefix key), in one round trip."""
+
+    frames = sorted(digests, reverse=True)
+    if not frames:
+        return None
+    payloads = await client.mget([_prefix_key(digests[frame]) for frame in frames])
+    for payload in payloads:
+        if payload is not None:
+            return Checkpoint.from_bytes(payload)
+    return None
@@ -2,25 +2,117 @@ from __future__ import annotations
 
 import asyncio
 import json
+import math
+from collections.abc import Iterator
 from datetime import datetime
 from typing import Any
 
 import numpy as np
-import redis.asyncio as redis_async
 from rq import get_current_job
 from sqlalchemy import select
 
-from epidemic_sim_worker.config.settings import get_settings
+from epidemic_sim_worker import runtime
+from epidemic_sim_worker.columnar import SERIES_FIELDS
+from epidemic_sim_worker.config.settings import WorkerSettings, get_settings
 from epidemic_sim_worker.db import session_scope
+from epidemic_sim_worker.frames import (
+    frame_index,
+    frame_payload,
+    index_key,
+    pack_frame,
+    stream_key,
+)
 from epidemic_sim_worker.logging import get_logger
-from epidemic_sim_worker.models import Pathogens, Regions, RunSeries, Runs, Scenarios
-from epidemic_sim_worker.simulation.model import NpiSchedule, SeirdParams, simulate
+from epidemic_sim_worker.models import (
+    MobilityEdges,
+    Pathogens,
+    Regions,
+    Runs,
+    Scenarios,
+)
+from epidemic_sim_worker.persistence import series_writer
+from epidemic_sim_worker.queue.checkpoints import (
+    clear_run_checkpoint,
+    find_prefix_checkpoint,
+    load_run_checkpoint,
+    prefix_frames,
+    save_prefix_checkpoint,
+    save_run_checkpoint,
+)
+from epidemic_sim_worker.simulation.adaptive import DEFAULT_ATOL, DEFAULT_RTOL
+from epidemic_sim_worker.simulation.checkpoint import Checkpoint, prefix_keys
+from epidemic_sim_worker.simulation.ensemble import EnsembleParams, member_mean, simulate_ensemble
+from epidemic_sim_worker.simulation.mobility import MobilityOperator, mobility_operator_from_edges
+from epidemic_sim_worker.simulation.model import (
+    COMPARTMENTS,
+    NpiSchedule,
+    SeirdParams,
+    SimulationFrames,
+    simulate_iter,
+)
 
 LOGGER = get_logger(__name__)
 
 
+def _mobility_from_edges(
+    region_ids: list[str], edges: list[tuple[str, str, float]]
+) -> MobilityOperator | None:
+    index = {region_id: idx for idx, region_id in enumerate(region_ids)}
+    linked = [
+        (index[src], index[dst], weight)
+        for src, dst, weight in edges
+        if src in index and dst in index
+    ]
+    if not linked:
+        return None
+    src_idx, dst_idx, weights = zip(*linked, strict=True)
+    return mobility_operator_from_edges(
+        np.array(src_idx, dtype=np.int64),
+        np.array(dst_idx, dtype=np.int64),
+        np.array(weights, dtype=np.float64),
+        len(region_ids),
+    )
+
+
+async def _save_checkpoints(
+    client: Any,
+    run_id: str,
+    checkpoints: list[Checkpoint],
+    digests: dict[int, str],
+    settings: WorkerSettings,
+) -> None:
+    ttl = settings.checkpoint_ttl_seconds
+    for checkpoint in checkpoints:
+        if checkpoint.frame in digests:
+            await save_prefix_checkpoint(client, digests[checkpoint.frame], run_id, checkpoint, ttl)
+    if checkpoints:
+        await save_run_checkpoint(client, run_id, checkpoints[-1], ttl)
+
+
+def _frame_chunks(frames: SimulationFrames, chunk_frames: int) -> Iterator[SimulationFrames]:
+    """Split computed frames into ``simulate_iter``-shaped chunks without checkpoints."""
+
+    for start in range(0, frames.data.shape[0], chunk_frames):
+        yield SimulationFrames(
+            frames.data[start : start + chunk_frames], frames.output_interval, start
+        )
+
+
+def _member_spread(ensemble: SimulationFrames) -> dict[str, Any]:
+    """5th, 50th and 95th percentiles across members of the per-member peak and deaths."""
+
+    quantiles = (0.05, 0.5, 0.95)
+    peaks = ensemble["I"].max(axis=(1, 2))
+    deaths = ensemble["D"][:, -1].sum(axis=1, dtype=np.float64)
+    return {
+        "ensembleMembers": int(ensemble.data.shape[0]),
+        "peakInfectedQuantiles": np.quantile(peaks, quantiles).tolist(),
+        "totalDeathsQuantiles": np.quantile(deaths, quantiles).tolist(),
+    }
+
+
 def run_simulation(run_payload: dict[str, Any]) -> None:
-    asyncio.run(_run_simulation(run_payload))
+    runtime.run(_run_simulation(run_payload))
 
 
 async def _run_simulation(run_payload: dict[str, Any]) -> None:
@@ -47,10 +139,17 @@ async def _run_simulation(run_payload: dict[str, Any]) -> None:
 
         dataset_ids = scenario.datasets or []
         dataset_id = dataset_ids[0] if dataset_ids else None
-        region_query = select(Regions)
+        # Stable region order keeps checkpoint states aligned across runs of the same dataset.
+        region_query = select(Regions).order_by(Regions.id)
         if dataset_id:
             region_query = region_query.where(Regions.dataset_id == dataset_id)
         regions = (await session.execute(region_query)).scalars().all()
+        edges: list[tuple[str, str, float]] = []
+        if dataset_id:
+            edge_query = select(
+                MobilityEdges.src_region_id, MobilityEdges.dst_region_id, MobilityEdges.weight
+            ).where(MobilityEdges.dataset_id == dataset_id)
+            edges = [tuple(row) for row in (await session.execute(edge_query)).all()]
 
     if not regions:
         LOGGER.warning("worker.no_regions", run_id=run_id)
@@ -70,11 +169,13 @@ async def _run_simulation(run_payload: dict[str, Any]) -> None:
     initial_D = np.zeros(num_regions)
     initial_S -= initial_I
 
-    mobility = np.eye(num_regions) * 0.9
-    if num_regions > 1:
-        mobility += (np.ones((num_regions, num_regions)) - np.eye(num_regions)) * 0.1 / (
-            num_regions - 1
-        )
+    mobility: np.ndarray | MobilityOperator | None = _mobility_from_edges(region_ids, edges)
+    if mobility is None:
+        mobility = np.eye(num_regions) * 0.9
+        if num_regions > 1:
+            mobility += (np.ones((num_regions, num_regions)) - np.eye(num_regions)) * 0.1 / (
+                num_regions - 1
+            )
 
     params = SeirdParams(
         beta=pathogen.params.get("beta", 0.25),
@@ -95,65 +196,168 @@ async def _run_simulation(run_payload: dict[str, Any]) -> None:
         for entry in scenario.npi_timeline
     ]
 
-    frames = simulate(
-        {"S": initial_S, "E": initial_E, "I": initial_I, "R": initial_R, "D": initial_D},
-        params,
-        horizon=run.engine.get("horizon", 180),
-        npi_schedule=schedule,
-    )
+    output_interval = int(run.engine.get("output_interval", 1))
+    horizon = int(run.engine.get("horizon", 180))
+    integrator = run.engine.get("integrator", "rk4")
+    rtol = run.engine.get("rtol", DEFAULT_RTOL)
+    atol = run.engine.get("atol", DEFAULT_ATOL)
+    frame_dtype = run.engine.get("frame_dtype", "float64")
+    members = int(run.engine.get("ensemble_members", 1))
+    initial_state = {"S": initial_S, "E": initial_E, "I": initial_I, "R": initial_R, "D": initial_D}
+    # Ensembles integrate in one call, so they are neither checkpointed nor resumed.
+    digests: dict[int, str] = {}
+    if members == 1:
+        digests = prefix_keys(
+            initial_state,
+            params,
+            schedule,
+            prefix_frames(
+                horizon // output_interval + 1,
+                settings.frame_chunk_size,
+                settings.checkpoint_every_chunks,
+            ),
+            integrator=integrator,
+            seed=run.seed,
+            rtol=rtol,
+            atol=atol,
+            output_interval=output_interval,
+            frame_dtype=frame_dtype,
+            labels=region_ids,
+        )
 
-    redis_client = redis_async.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
-    channel = f"run:{run_id}:frames"
+    redis_client = runtime.get_async_redis()
+    stream = stream_key(run_id)
+    stream_ttl = settings.frame_stream_ttl_seconds
+    await redis_client.set(index_key(run_id), json.dumps(frame_index(region_ids)), ex=stream_ttl)
+    resume_from: Checkpoint | None = None
+    if members == 1:
+        resume_from = await load_run_checkpoint(redis_client, run_id)
+        if resume_from is None:
+            resume_from = await find_prefix_checkpoint(redis_client, digests)
+
+    rt = float(params.beta / params.gamma) if params.gamma > 0 else 0.0
+    if settings.result_store == "columnar":
+        batch_frames = math.ceil(settings.series_chunk_days / output_interval)
+    else:
+        batch_frames = settings.batch_size
 
     async with session_scope() as session:
-        await session.execute(RunSeries.__table__.delete().where(RunSeries.run_id == run_id))
+        writer = series_writer(settings.result_store, session, run_id, region_ids, rt, batch_frames)
+        if resume_from is not None and resume_from.source not in (None, run_id):
+            last_t = resume_from.frame * output_interval
+            await writer.truncate()
+            copied = await writer.copy_prefix(resume_from.source, last_t, resume_from.frame + 1)
+            if not copied:
+                LOGGER.warning("worker.prefix_missing", run_id=run_id, source=resume_from.source)
+                await session.rollback()
+                resume_from = None
+            else:
+                LOGGER.info(
+                    "worker.prefix_resume",
+                    run_id=run_id,
+                    source=resume_from.source,
+                    frame=resume_from.frame,
+                )
+        elif resume_from is not None:
+            last_t = resume_from.frame * output_interval
+            await writer.truncate(last_t)
+            LOGGER.info("worker.resume", run_id=run_id, frame=resume_from.frame)
+        if resume_from is None:
+            await writer.truncate()
         await session.commit()
+        if resume_from is None or resume_from.source not in (None, run_id):
+            await redis_client.delete(stream)
 
-        total_steps = frames["S"].shape[0]
-        for t in range(total_steps):
-            batch = []
-            for idx, region_id in enumerate(region_ids):
-                batch.append(
-                    {
-                        "run_id": run_id,
-                        "t": t,
-                        "region_id": region_id,
-                        "S": float(frames["S"][t, idx]),
-                        "E": float(frames["E"][t, idx]),
-                        "I": float(frames["I"][t, idx]),
-                        "R": float(frames["R"][t, idx]),
-                        "D": float(frames["D"][t, idx]),
-                        "new_cases": float(
-                            frames["I"][t, idx] - frames["I"][max(t - 1, 0), idx]
-                        )
-                        if t > 0
-                        else float(frames["I"][t, idx]),
-                        "rt": float(params.beta / params.gamma) if params.gamma > 0 else 0.0,
-                        "policy_state": None,
-                    }
-                )
-            await session.execute(RunSeries.__table__.insert(), batch)
-            await session.commit()
-
-            payload = {
-                "runId": run_id,
-                "t": t,
-                "series": [
-                    {
-                        "regionId": item["region_id"],
-                        "S": item["S"],
-                        "E": item["E"],
-                        "I": item["I"],
-                        "R": item["R"],
-                        "D": item["D"],
-                        "newCases": item["new_cases"],
-                        "rt": item["rt"],
-                    }
-                    for item in batch
-                ],
-                "perf": {"stepsPerSecond": 0.0},
-            }
-            await redis_client.publish(channel, json.dumps(payload))
+        spread: dict[str, Any] = {}
+        if members > 1:
+            # Member m draws from member_seeds(run.seed)[m], so member 0 replays the single run.
+            ensemble = await asyncio.to_thread(
+                simulate_ensemble,
+                initial_state,
+                EnsembleParams.from_members([params] * members),
+                horizon,
+                [schedule] * members,
+                integrator=integrator,
+                seed=run.seed,
+                rtol=rtol,
+                atol=atol,
+                output_interval=output_interval,
+                frame_dtype=frame_dtype,
+            )
+            spread = _member_spread(ensemble)
+            chunks = _frame_chunks(member_mean(ensemble), settings.frame_chunk_size)
+            del ensemble
+        else:
+            chunks = simulate_iter(
+                initial_state,
+                params,
+                horizon=horizon,
+                npi_schedule=schedule,
+                mode=run.engine.get("mode", "fused"),
+                integrator=integrator,
+                seed=run.seed,
+                rtol=rtol,
+                atol=atol,
+                output_interval=output_interval,
+                frame_dtype=frame_dtype,
+                chunk_frames=settings.frame_chunk_size,
+                resume_from=resume_from,
+            )
+
+        peak_infected = 0.0
+        total_deaths = 0.0
+        previous_I = np.zeros(num_regions)
+        if resume_from is not None:
+            peak_infected = await writer.peak("I")
+            total_deaths = float(resume_from.state[4].sum())
+            previous_I = resume_from.state[2]
+        # The kernels release the GIL, so the next chunk integrates in a thread while this one is
+        # persisted and published.
+        packed = settings.frame_encoding == "packed"
+        # Subscribers replay stored frames before the stream, so it must outlast every frame that
+        # is published but not yet committed.
+        stream_maxlen = max(settings.frame_stream_maxlen, batch_frames + settings.frame_chunk_size)
+        unsaved: list[Checkpoint] = []
+        pending = asyncio.create_task(asyncio.to_thread(next, chunks, None))
+        while (chunk := await pending) is not None:
+            pending = asyncio.create_task(asyncio.to_thread(next, chunks, None))
+            num_frames = chunk.data.shape[0]
+            times = (chunk.start_frame + np.arange(num_frames)) * output_interval
+            infected = chunk["I"].astype(np.float64)
+            new_cases = np.diff(infected, axis=0, prepend=previous_I[np.newaxis])
+            writer.add_frames(times, chunk.data, new_cases)
+            values = np.empty(
+                (num_frames, len(SERIES_FIELDS), num_regions),
+                dtype=chunk.data.dtype if packed else np.float64,
+            )
+            values[:, : len(COMPARTMENTS)] = chunk.data
+            values[:, len(COMPARTMENTS)] = new_cases
+            values[:, len(COMPARTMENTS) + 1] = rt
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for offset in range(num_frames):
+                    t = int(times[offset])
+                    if packed:
+                        message: bytes | str = pack_frame(t, values[offset])
+                    else:
+                        message = json.dumps(frame_payload(run_id, t, region_ids, values[offset]))
+                    pipe.xadd(stream, {"t": t, "data": message}, maxlen=stream_maxlen)
+                pipe.expire(stream, stream_ttl)
+                await pipe.execute()
+            previous_I = infected[-1]
+            peak_infected = max(peak_infected, float(chunk["I"].max()))
+            total_deaths = float(chunk["D"][-1].sum())
+
+            # Checkpoints only become visible once the frames before them are committed; prefix
+            # frames always close a batch so branches can copy whole chunks up to them.
+            if chunk.checkpoint is not None:
+                unsaved.append(chunk.checkpoint)
+            if writer.due or (chunk.checkpoint is not None and chunk.checkpoint.frame in digests):
+                await writer.flush()
+                await _save_checkpoints(redis_client, run_id, unsaved, digests, settings)
+                unsaved = []
+        await writer.flush()
+        await _save_checkpoints(redis_client, run_id, unsaved, digests, settings)
+        await writer.finish()
 
         await session.execute(
             Runs.__table__.update()
@@ -162,12 +366,16 @@ async def _run_simulation(run_payload: dict[str, Any]) -> None:
                 status="completed",
                 finished_at=datetime.utcnow(),
                 metrics_summary={
-                    "peakInfected": float(frames["I"].max()),
-                    "totalDeaths": float(frames["D"].sum(axis=1)[-1]),
+                    "peakInfected": peak_infected,
+                    "totalDeaths": total_deaths,
+                    **spread,
                 },
             )
         )
         await session.commit()
 
-    await redis_client.aclose()
+    await redis_client.xadd(stream, {"end": 1})
+    await redis_client.expire(stream, stream_ttl)
+    await clear_run_checkpoint(redis_client, run_id)
+    await runtime.release_async_redis(redis_client)
     LOGGER.info("worker.complete", run_id=run_id)
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import asyncio
+import time
 
-from rq import Connection, Queue, Worker
 import redis
+from rq import Connection, Queue, SimpleWorker, Worker
 
+from epidemic_sim_worker import runtime
 from epidemic_sim_worker.config.settings import get_settings
 from epidemic_sim_worker.logging import configure_logging, get_logger
 
@@ -12,13 +13,30 @@ configure_logging()
 LOGGER = get_logger(__name__)
 
 
+def preload() -> None:
+    """Import job code, warm every kernel and open the shared loop's pools before taking jobs."""
+
+    started = time.perf_counter()
+    import epidemic_sim_worker.queue.jobs  # noqa: F401
+    from epidemic_sim_worker.simulation.warmup import warm_up
+
+    warm_up()
+    runtime.start_runtime()
+    LOGGER.info("worker.preloaded", seconds=round(time.perf_counter() - started, 3))
+
+
 def main() -> None:
     settings = get_settings()
     redis_conn = redis.from_url(settings.redis_url)
     queue = Queue(settings.run_queue_name, connection=redis_conn)
-    LOGGER.info("worker.boot", queue=settings.run_queue_name)
+    LOGGER.info("worker.boot", queue=settings.run_queue_name, preload=settings.preload)
+    worker_class = Worker
+    if settings.preload:
+        preload()
+        # Jobs run in this process so they reuse the warmed kernels and pooled connections.
+        worker_class = SimpleWorker
     with Connection(redis_conn):
-        worker = Worker([queue])
+        worker = worker_class([queue])
         worker.work(with_scheduler=True)
 
 
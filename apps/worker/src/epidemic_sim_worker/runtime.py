@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+import redis.asyncio as redis_async
+from sqlalchemy import text
+
+from epidemic_sim_worker.config.settings import get_settings
+from epidemic_sim_worker.db import session_scope
+
+T = TypeVar("T")
+
+_loop: asyncio.AbstractEventLoop | None = None
+_redis: redis_async.Redis | None = None
+
+
+def start_runtime() -> None:
+    """Start the event loop that every job of a preloaded worker shares, and open its pools.
+
+    The loop lives on a daemon thread so the DB pool and Redis client survive between jobs.
+    """
+
+    global _loop
+    if _loop is not None:
+        return
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="worker-event-loop", daemon=True).start()
+    _loop = loop
+    run(_open_pools())
+
+
+async def _open_pools() -> None:
+    global _redis
+    async with session_scope() as session:
+        await session.execute(text("SELECT 1"))
+    _redis = redis_async.from_url(get_settings().redis_url)
+    await _redis.ping()
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` on the shared loop, or on a fresh one when the runtime is not started.
+
+    If the caller is interrupted (an RQ job timeout or a signal), ``coro`` is cancelled too, so it
+    cannot keep writing for a job RQ already gave up on.
+    """
+
+    if _loop is None:
+        return asyncio.run(coro)
+    future = asyncio.run_coroutine_threadsafe(coro, _loop)
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def get_async_redis() -> redis_async.Redis:
+    if _redis is not None:
+        return _redis
+    return redis_async.from_url(get_settings().redis_url)
+
+
+async def release_async_redis(client: redis_async.Redis) -> None:
+    if client is not _redis:
+        await client.aclose()
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import numpy as np
+from numba import njit, prange
+
+from epidemic_sim_worker.simulation.dynamics import derivatives
+
+DEFAULT_RTOL = 1e-6
+DEFAULT_ATOL = 1e-3
+
+# Dormand-Prince 5(4) tableau.
+_A21 = 1.0 / 5.0
+_A31, _A32 = 3.0 / 40.0, 9.0 / 40.0
+_A41, _A42, _A43 = 44.0 / 45.0, -56.0 / 15.0, 32.0 / 9.0
+_A51, _A52, _A53, _A54 = 19372.0 / 6561.0, -25360.0 / 2187.0, 64448.0 / 6561.0, -212.0 / 729.0
+_A61, _A62, _A63 = 9017.0 / 3168.0, -355.0 / 33.0, 46732.0 / 5247.0
+_A64, _A65 = 49.0 / 176.0, -5103.0 / 18656.0
+_B1, _B3, _B4 = 35.0 / 384.0, 500.0 / 1113.0, 125.0 / 192.0
+_B5, _B6 = -2187.0 / 6784.0, 11.0 / 84.0
+_E1, _E3, _E4 = 71.0 / 57600.0, -71.0 / 16695.0, 71.0 / 1920.0
+_E5, _E6, _E7 = -17253.0 / 339200.0, 22.0 / 525.0, -1.0 / 40.0
+# Hairer's continuous extension for dense output.
+_D1, _D3 = -12715105075.0 / 11282082432.0, 87487479700.0 / 32700410799.0
+_D4, _D5 = -10690763975.0 / 1880347072.0, 701980252875.0 / 199316789632.0
+_D6, _D7 = -1453857185.0 / 822651844.0, 69997945.0 / 29380423.0
+
+_SAFETY = 0.9
+_MIN_FACTOR = 0.2
+_MAX_FACTOR = 5.0
+
+
+@njit(cache=True, nogil=True)
+def _integrate_dopri5(
+    state: np.ndarray,
+    beta: float,
+    sigma: float,
+    gamma: float,
+    mu: float,
+    dt: float,
+    output_interval: float,
+    rtol: float,
+    atol: float,
+    population: np.ndarray,
+    dense: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    data: np.ndarray,
+    outbound: np.ndarray,
+    npi_times: np.ndarray,
+    npi_beta: np.ndarray,
+    npi_mobility: np.ndarray,
+    first_frame: int,
+    out: np.ndarray,
+    parallel_regions: bool,
+) -> float:
+    """Adaptive RK45 writing frames on the ``k * output_interval`` grid by dense interpolation.
+
+    Starts from frame ``first_frame`` with trial step ``dt`` and returns the step to resume
+    with, filling every row of ``out``. Steps are clipped at the ``npi_times`` switch points and
+    at the end of ``out``; inside a segment one step may cover many frames. ``parallel_regions``
+    spreads each stage's right-hand side over numba's threads.
+    """
+
+    num_compartments, num_regions = state.shape
+    k1 = np.empty_like(state)
+    k2 = np.empty_like(state)
+    k3 = np.empty_like(state)
+    k4 = np.empty_like(state)
+    k5 = np.empty_like(state)
+    k6 = np.empty_like(state)
+    k7 = np.empty_like(state)
+    stage = np.empty_like(state)
+    args = (beta, sigma, gamma, mu, population, dense, indptr, indices, data, outbound)
+    size = num_compartments * num_regions
+    min_step = 1e-10 * output_interval
+    frame_tolerance = 1e-9 * output_interval
+
+    num_frames = out.shape[0]
+    t = first_frame * output_interval
+    t_final = (first_frame + num_frames) * output_interval
+    frame = 0
+    h = dt
+    schedule_index = 0
+    beta_scale = 1.0
+    mobility_scale = 1.0
+    while frame < num_frames:
+        while schedule_index < npi_times.shape[0] and npi_times[schedule_index] <= t:
+            beta_scale = npi_beta[schedule_index]
+            mobility_scale = npi_mobility[schedule_index]
+            schedule_index += 1
+        t_end = t_final
+        if schedule_index < npi_times.shape[0]:
+            t_end = min(t_end, npi_times[schedule_index])
+
+        derivatives(parallel_regions, state, *args, beta_scale, mobility_scale, k1)
+        while True:
+            proposed = h
+            reaches_end = t + h >= t_end * (1.0 - 1e-12)
+            if reaches_end:
+                h = t_end - t
+
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    stage[c, j] = state[c, j] + h * _A21 * k1[c, j]
+            derivatives(parallel_regions, stage, *args, beta_scale, mobility_scale, k2)
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    stage[c, j] = state[c, j] + h * (_A31 * k1[c, j] + _A32 * k2[c, j])
+            derivatives(parallel_regions, stage, *args, beta_scale, mobility_scale, k3)
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    stage[c, j] = state[c, j] + h * (
+                        _A41 * k1[c, j] + _A42 * k2[c, j] + _A43 * k3[c, j]
+                    )
+            derivatives(parallel_regions, stage, *args, beta_scale, mobility_scale, k4)
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    stage[c, j] = state[c, j] + h * (
+                        _A51 * k1[c, j] + _A52 * k2[c, j] + _A53 * k3[c, j] + _A54 * k4[c, j]
+                    )
+            derivatives(parallel_regions, stage, *args, beta_scale, mobility_scale, k5)
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    stage[c, j] = state[c, j] + h * (
+                        _A61 * k1[c, j]
+                        + _A62 * k2[c, j]
+                        + _A63 * k3[c, j]
+                        + _A64 * k4[c, j]
+                        + _A65 * k5[c, j]
+                    )
+            derivatives(parallel_regions, stage, *args, beta_scale, mobility_scale, k6)
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    stage[c, j] = state[c, j] + h * (
+                        _B1 * k1[c, j]
+                        + _B3 * k3[c, j]
+                        + _B4 * k4[c, j]
+                        + _B5 * k5[c, j]
+                        + _B6 * k6[c, j]
+                    )
+            derivatives(parallel_regions, stage, *args, beta_scale, mobility_scale, k7)
+
+            error = 0.0
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    local = h * (
+                        _E1 * k1[c, j]
+                        + _E3 * k3[c, j]
+                        + _E4 * k4[c, j]
+                        + _E5 * k5[c, j]
+                        + _E6 * k6[c, j]
+                        + _E7 * k7[c, j]
+                    )
+                    scale = atol + rtol * max(abs(state[c, j]), abs(stage[c, j]))
+                    error += (local / scale) ** 2
+            error = np.sqrt(error / size)
+
+            if error > 1.0 and h > min_step:
+                h *= max(_MIN_FACTOR, _SAFETY * error**-0.2)
+                continue
+
+            t_next = t_end if reaches_end else t + h
+            while frame < num_frames:
+                t_frame = (first_frame + frame + 1) * output_interval
+                if t_frame > t_next + frame_tolerance:
+                    break
+                theta = (t_frame - t) / h
+                theta1 = 1.0 - theta
+                for c in range(num_compartments):
+                    for j in range(num_regions):
+                        y_old = state[c, j]
+                        y_diff = stage[c, j] - y_old
+                        slope = h * k1[c, j] - y_diff
+                        curve = y_diff - h * k7[c, j] - slope
+                        cubic = h * (
+                            _D1 * k1[c, j]
+                            + _D3 * k3[c, j]
+                            + _D4 * k4[c, j]
+                            + _D5 * k5[c, j]
+                            + _D6 * k6[c, j]
+                            + _D7 * k7[c, j]
+                        )
+                        value = y_old + theta * (
+                            y_diff + theta1 * (slope + theta * (curve + theta1 * cubic))
+                        )
+                        out[frame, c, j] = max(value, 0.0)
+                frame += 1
+
+            t = t_next
+            clipped = False
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    if stage[c, j] < 0.0:
+                        stage[c, j] = 0.0
+                        clipped = True
+                    state[c, j] = stage[c, j]
+            if clipped:
+                derivatives(parallel_regions, state, *args, beta_scale, mobility_scale, k1)
+            else:
+                k1[:] = k7
+            factor = _MAX_FACTOR if error == 0.0 else _SAFETY * error**-0.2
+            h *= min(_MAX_FACTOR, max(_MIN_FACTOR, factor))
+            if reaches_end:
+                # Do not let a step clipped at a boundary shrink the next segment's first step.
+                h = max(h, proposed)
+                break
+    return h
+
+
+@njit(cache=True, parallel=True)
+def _dopri5_ensemble(
+    states: np.ndarray,
+    beta: np.ndarray,
+    sigma: np.ndarray,
+    gamma: np.ndarray,
+    mu: np.ndarray,
+    dt: float,
+    output_interval: float,
+    rtol: float,
+    atol: float,
+    population: np.ndarray,
+    dense: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    data: np.ndarray,
+    outbound: np.ndarray,
+    npi_times: np.ndarray,
+    npi_beta: np.ndarray,
+    npi_mobility: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    for member in prange(states.shape[0]):
+        _integrate_dopri5(
+            states[member],
+            beta[member],
+            sigma[member],
+            gamma[member],
+            mu[member],
+            dt,
+            output_interval,
+            rtol,
+            atol,
+            population,
+            dense,
+            indptr,
+            indices,
+            data,
+            outbound,
+            npi_times[member],
+            npi_beta[member],
+            npi_mobility[member],
+            0,
+            out[member],
+            False,
+        )
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+import io
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from epidemic_sim_worker.simulation.dynamics import COMPARTMENTS
+from epidemic_sim_worker.simulation.mobility import as_mobility_operator
+
+if TYPE_CHECKING:
+    from epidemic_sim_worker.simulation.model import NpiSchedule, SeirdParams
+
+
+@dataclass
+class Checkpoint:
+    """Integrator state right after frame ``frame``; ``trial_step`` carries dopri5's next step."""
+
+    frame: int
+    state: np.ndarray
+    trial_step: float
+    source: str | None = None
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            frame=np.int64(self.frame),
+            state=self.state,
+            trial_step=np.float64(self.trial_step),
+            source=np.array(self.source or ""),
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> Checkpoint:
+        with np.load(io.BytesIO(payload), allow_pickle=False) as arrays:
+            return cls(
+                frame=int(arrays["frame"]),
+                state=arrays["state"].astype(np.float64),
+                trial_step=float(arrays["trial_step"]),
+                source=str(arrays["source"]) or None,
+            )
+
+
+def prefix_keys(
+    initial_state: dict[str, np.ndarray],
+    params: SeirdParams,
+    npi_schedule: Iterable[NpiSchedule] | None,
+    frames: Sequence[int],
+    integrator: str = "rk4",
+    seed: int = 0,
+    rtol: float = 0.0,
+    atol: float = 0.0,
+    output_interval: float = 1.0,
+    frame_dtype: str = "float64",
+    labels: Sequence[str] = (),
+) -> dict[int, str]:
+    """Digest of every input that shapes the frames up to each of ``frames``.
+
+    Two runs share the key for frame ``k`` when they differ only in NPI entries switching on at
+    or after frame ``k``, so a branch can resume from the other's checkpoint. ``labels`` (e.g.
+    region ids) pins the region order and ``frame_dtype`` the precision of the stored frames a
+    branch copies; the seed only counts for tau-leap and the tolerances for dopri5. Step choices
+    of dopri5 near the branch point can still differ within tolerance.
+    """
+
+    operator = as_mobility_operator(params.mobility)
+    common = hashlib.sha256()
+    common.update(integrator.encode())
+    common.update(np.dtype(frame_dtype).str.encode())
+    common.update("\0".join(labels).encode())
+    scalars = [params.beta, params.sigma, params.gamma, params.mu, params.dt, output_interval]
+    if integrator == "tau-leap":
+        scalars.append(float(seed))
+    if integrator == "dopri5":
+        scalars.extend([rtol, atol])
+    common.update(np.array(scalars, dtype=np.float64).tobytes())
+    for array in (
+        np.asarray(params.population, dtype=np.float64),
+        operator.dense,
+        operator.indptr,
+        operator.indices,
+        operator.data,
+        *(np.asarray(initial_state[name], dtype=np.float64) for name in COMPARTMENTS),
+    ):
+        common.update(np.ascontiguousarray(array).tobytes())
+
+    schedule = sorted(list(npi_schedule or []), key=lambda item: item.day)
+    keys: dict[int, str] = {}
+    for frame in frames:
+        digest = common.copy()
+        for entry in schedule:
+            if max(entry.day - 1.0, 0.0) < frame * output_interval:
+                digest.update(
+                    np.array(
+                        [entry.day, entry.beta_multiplier, entry.mobility_multiplier],
+                        dtype=np.float64,
+                    ).tobytes()
+                )
+        digest.update(np.int64(frame).tobytes())
+        keys[frame] = digest.hexdigest()
+    return keys
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import numpy as np
+from numba import njit, prange
+
+from epidemic_sim_worker.simulation.mobility import mobility_flux, mobility_inflow, net_flux
+
+COMPARTMENTS = ("S", "E", "I", "R", "D")
+
+# Regions per task when one run's right-hand side is spread over numba's threads.
+REGION_BLOCK = 256
+
+
+@njit(cache=True)
+def _local_terms(
+    state: np.ndarray,
+    effective_beta: float,
+    sigma: float,
+    gamma: float,
+    mu: float,
+    population: np.ndarray,
+    lo: int,
+    hi: int,
+    out: np.ndarray,
+) -> None:
+    """Add the infection, progression and death terms of regions ``[lo, hi)`` to ``out``."""
+
+    for j in range(lo, hi):
+        force = effective_beta * state[0, j] * state[2, j] / population[j]
+        out[0, j] -= force
+        out[1, j] += force - sigma * state[1, j]
+        out[2, j] += sigma * state[1, j] - (gamma + mu) * state[2, j]
+        out[3, j] += gamma * state[2, j]
+        out[4, j] = mu * state[2, j]
+
+
+@njit(cache=True)
+def seird_derivatives(
+    state: np.ndarray,
+    beta: float,
+    sigma: float,
+    gamma: float,
+    mu: float,
+    population: np.ndarray,
+    dense: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    data: np.ndarray,
+    outbound: np.ndarray,
+    beta_scale: float,
+    mobility_scale: float,
+    out: np.ndarray,
+) -> None:
+    """Right-hand side of the metapopulation SEIRD system, written into ``out``."""
+
+    mobility_flux(state, dense, indptr, indices, data, outbound, mobility_scale, out)
+    _local_terms(state, beta * beta_scale, sigma, gamma, mu, population, 0, state.shape[1], out)
+
+
+@njit(cache=True, parallel=True)
+def seird_derivatives_parallel(
+    state: np.ndarray,
+    beta: float,
+    sigma: float,
+    gamma: float,
+    mu: float,
+    population: np.ndarray,
+    dense: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    data: np.ndarray,
+    outbound: np.ndarray,
+    beta_scale: float,
+    mobility_scale: float,
+    out: np.ndarray,
+) -> None:
+    """``seird_derivatives`` with blocks of ``REGION_BLOCK`` regions spread over numba's threads.
+
+    Each block only writes its own columns of ``out``, and the result matches the serial kernel
+    bit for bit.
+    """
+
+    num_regions = state.shape[1]
+    effective_beta = beta * beta_scale
+    for block in prange((num_regions + REGION_BLOCK - 1) // REGION_BLOCK):
+        lo = block * REGION_BLOCK
+        hi = min(lo + REGION_BLOCK, num_regions)
+        mobility_inflow(state, dense, indptr, indices, data, lo, hi, out)
+        net_flux(state, outbound, mobility_scale, lo, hi, out)
+        _local_terms(state, effective_beta, sigma, gamma, mu, population, lo, hi, out)
+
+
+@njit(cache=True)
+def derivatives(
+    parallel_regions: bool,
+    state: np.ndarray,
+    beta: float,
+    sigma: float,
+    gamma: float,
+    mu: float,
+    population: np.ndarray,
+    dense: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    data: np.ndarray,
+    outbound: np.ndarray,
+    beta_scale: float,
+    mobility_scale: float,
+    out: np.ndarray,
+) -> None:
+    """Dispatch to the region-parallel right-hand side when ``parallel_regions`` is set.
+
+    Ensemble kernels already run one member per thread and always pass ``False``, so numba never
+    launches a parallel region from inside another.
+    """
+
+    args = (beta, sigma, gamma, mu, population, dense, indptr, indices, data, outbound)
+    if parallel_regions:
+        seird_derivatives_parallel(state, *args, beta_scale, mobility_scale, out)
+    else:
+        seird_derivatives(state, *args, beta_scale, mobility_scale, out)
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+import numba
+import numpy as np
+from numba import njit, prange
+
+from epidemic_sim_worker.simulation.adaptive import DEFAULT_ATOL, DEFAULT_RTOL, _dopri5_ensemble
+from epidemic_sim_worker.simulation.mobility import (
+    MobilityOperator,
+    as_mobility_operator,
+    source_major_csr,
+)
+from epidemic_sim_worker.simulation.model import (
+    COMPARTMENTS,
+    INTEGRATORS,
+    NpiSchedule,
+    SeirdParams,
+    SimulationFrames,
+    _check_frame_dtype,
+    _frame_count,
+    _integrate_rk4,
+    _schedule_arrays,
+    _substeps,
+    _switch_steps,
+    _switch_times,
+)
+from epidemic_sim_worker.simulation.stochastic import _tau_leap_ensemble, member_seeds
+
+
+@dataclass
+class EnsembleParams:
+    """Per-member rates for a stack of runs that share regions, mobility and ``dt``."""
+
+    beta: np.ndarray
+    sigma: np.ndarray
+    gamma: np.ndarray
+    mu: np.ndarray
+    dt: float
+    population: np.ndarray
+    mobility: np.ndarray | MobilityOperator
+
+    @property
+    def members(self) -> int:
+        return int(np.shape(self.beta)[0])
+
+    @classmethod
+    def from_members(cls, members: Sequence[SeirdParams]) -> EnsembleParams:
+        if not members:
+            raise ValueError("An ensemble needs at least one member")
+        first = members[0]
+        for member in members[1:]:
+            if member.dt != first.dt or not np.array_equal(member.population, first.population):
+                raise ValueError("Ensemble members must share dt and population")
+        return cls(
+            beta=np.array([member.beta for member in members], dtype=np.float64),
+            sigma=np.array([member.sigma for member in members], dtype=np.float64),
+            gamma=np.array([member.gamma for member in members], dtype=np.float64),
+            mu=np.array([member.mu for member in members], dtype=np.float64),
+            dt=first.dt,
+            population=first.population,
+            mobility=first.mobility,
+        )
+
+
+@njit(cache=True, parallel=True)
+def _integrate_ensemble(
+    states: np.ndarray,
+    beta: np.ndarray,
+    sigma: np.ndarray,
+    gamma: np.ndarray,
+    mu: np.ndarray,
+    dt: float,
+    population: np.ndarray,
+    dense: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    data: np.ndarray,
+    outbound: np.ndarray,
+    npi_steps: np.ndarray,
+    npi_beta: np.ndarray,
+    npi_mobility: np.ndarray,
+    substeps: int,
+    out: np.ndarray,
+) -> None:
+    for member in prange(states.shape[0]):
+        _integrate_rk4(
+            states[member],
+            beta[member],
+            sigma[member],
+            gamma[member],
+            mu[member],
+            dt,
+            population,
+            dense,
+            indptr,
+            indices,
+            data,
+            outbound,
+            npi_steps[member],
+            npi_beta[member],
+            npi_mobility[member],
+            substeps,
+            0,
+            out[member],
+            False,
+        )
+
+
+def _stacked_schedules(
+    npi_schedules: Sequence[Iterable[NpiSchedule] | None] | None, members: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    schedules = list(npi_schedules) if npi_schedules is not None else [None] * members
+    if len(schedules) != members:
+        raise ValueError("Expected one NPI schedule per ensemble member")
+    arrays = [_schedule_arrays(schedule) for schedule in schedules]
+    width = max((days.shape[0] for days, _, _ in arrays), default=0)
+    npi_days = np.full((members, width), np.inf)
+    npi_beta = np.ones((members, width), dtype=np.float64)
+    npi_mobility = np.ones((members, width), dtype=np.float64)
+    for member, (days, beta, mobility) in enumerate(arrays):
+        npi_days[member, : days.shape[0]] = days
+        npi_beta[member, : beta.shape[0]] = beta
+        npi_mobility[member, : mobility.shape[0]] = mobility
+    return npi_days, npi_beta, npi_mobility
+
+
+def _thread_count(workers: int | None, members: int) -> int:
+    limit = numba.config.NUMBA_NUM_THREADS
+    requested = limit if workers is None else max(1, min(workers, limit))
+    return max(1, min(requested, members))
+
+
+def simulate_ensemble(
+    initial_state: dict[str, np.ndarray],
+    params: EnsembleParams,
+    horizon: float,
+    npi_schedules: Sequence[Iterable[NpiSchedule] | None] | None = None,
+    workers: int | None = None,
+    integrator: str = "rk4",
+    seed: int = 0,
+    rtol: float = DEFAULT_RTOL,
+    atol: float = DEFAULT_ATOL,
+    output_interval: float = 1.0,
+    frame_dtype: str = "float64",
+) -> SimulationFrames:
+    """Integrate every member in one compiled call, spreading members across ``workers`` threads.
+
+    Initial compartments may be ``(regions,)`` (shared by all members) or
+    ``(members, regions)``. Frames land in one ``(members, frames, compartments, regions)``
+    buffer on the same ``output_interval`` grid and ``frame_dtype`` as ``simulate``.
+    Members never interact and stochastic members draw from ``member_seeds``, so
+    the output is bit-identical for any ``workers`` value.
+    """
+
+    if integrator not in INTEGRATORS:
+        raise ValueError(f"Unknown integrator: {integrator}")
+    _check_frame_dtype(frame_dtype)
+
+    members = params.members
+    # Plain floats keep one compiled signature per kernel, as in ``simulate``.
+    dt, output_interval, rtol, atol = (
+        float(value) for value in (params.dt, output_interval, rtol, atol)
+    )
+    operator = as_mobility_operator(params.mobility)
+    population = np.asarray(params.population, dtype=np.float64)
+    num_regions = population.shape[0]
+    states = np.empty((members, len(COMPARTMENTS), num_regions))
+    for idx, name in enumerate(COMPARTMENTS):
+        states[:, idx] = np.broadcast_to(
+            np.asarray(initial_state[name], dtype=np.float64), (members, num_regions)
+        )
+    npi_days, npi_beta, npi_mobility = _stacked_schedules(npi_schedules, members)
+    num_frames = _frame_count(horizon, output_interval)
+    if integrator != "dopri5":
+        substeps = _substeps(dt, output_interval)
+        npi_steps = _switch_steps(npi_days, dt)
+    out = np.empty((members, num_frames, len(COMPARTMENTS), num_regions), dtype=frame_dtype)
+    if integrator == "tau-leap":
+        states = np.rint(states)
+    out[:, 0] = states
+
+    previous_threads = numba.get_num_threads()
+    numba.set_num_threads(_thread_count(workers, members))
+    rates = [
+        np.ascontiguousarray(np.broadcast_to(value, (members,)), dtype=np.float64)
+        for value in (params.beta, params.sigma, params.gamma, params.mu)
+    ]
+    try:
+        if integrator == "tau-leap":
+            _tau_leap_ensemble(
+                states,
+                member_seeds(seed, members, num_frames)[:, 1:],
+                *rates,
+                dt,
+                population,
+                *source_major_csr(operator),
+                operator.outbound,
+                npi_steps,
+                npi_beta,
+                npi_mobility,
+                substeps,
+                out[:, 1:],
+            )
+        elif integrator == "dopri5":
+            _dopri5_ensemble(
+                states,
+                *rates,
+                dt,
+                output_interval,
+                rtol,
+                atol,
+                population,
+                operator.dense,
+                operator.indptr,
+                operator.indices,
+                operator.data,
+                operator.outbound,
+                _switch_times(npi_days),
+                npi_beta,
+                npi_mobility,
+                out[:, 1:],
+            )
+        else:
+            _integrate_ensemble(
+                states,
+                *rates,
+                dt,
+                population,
+                operator.dense,
+                operator.indptr,
+                operator.indices,
+                operator.data,
+                operator.outbound,
+                npi_steps,
+                npi_beta,
+                npi_mobility,
+                substeps,
+                out[:, 1:],
+            )
+    finally:
+        numba.set_num_threads(previous_threads)
+    return SimulationFrames(out, output_interval)
+
+
+def member_mean(frames: SimulationFrames) -> SimulationFrames:
+    """Average ensemble ``frames`` over members into one run's ``(frames, compartments, regions)``.
+
+    Sums in float64 whatever the frame dtype, then stores the mean back in that dtype.
+    """
+
+    data = frames.data.mean(axis=0, dtype=np.float64).astype(frames.data.dtype, copy=False)
+    return SimulationFrames(data, frames.output_interval)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from numba import njit
+
+# Above this fill ratio a dense row-major sweep beats CSR gathers.
+SPARSE_DENSITY_THRESHOLD = 0.25
+# Slack on the row sums, so fractions that add up to 1 in the source data are not rejected.
+_ROW_SUM_TOLERANCE = 1e-9
+
+
+@dataclass
+class MobilityOperator:
+    """Mobility matrix prepared once per run for the integration kernels.
+
+    Sparse networks are stored as the CSR transpose (row ``j`` lists the sources feeding region
+    ``j``); dense ones keep the source-major matrix so the kernel can stream it row by row.
+    Self-loops are dropped because they cancel out of the net flow.
+    """
+
+    num_regions: int
+    dense: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    outbound: np.ndarray
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.indptr.shape[0] > 0
+
+    @property
+    def nnz(self) -> int:
+        if self.is_sparse:
+            return int(self.data.shape[0])
+        return int(np.count_nonzero(self.dense))
+
+
+def _empty_dense() -> np.ndarray:
+    return np.zeros((0, 0), dtype=np.float64)
+
+
+def _empty_csr() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return (
+        np.zeros(0, dtype=np.int64),
+        np.zeros(0, dtype=np.int64),
+        np.zeros(0, dtype=np.float64),
+    )
+
+
+def mobility_operator_from_edges(
+    src: np.ndarray,
+    dst: np.ndarray,
+    weight: np.ndarray,
+    num_regions: int,
+    density_threshold: float = SPARSE_DENSITY_THRESHOLD,
+) -> MobilityOperator:
+    """Build an operator from ``src -> dst`` edge lists without materialising an N x N matrix.
+
+    Weights are the daily fraction of a region's population travelling along each edge, so they
+    must be non-negative and a region's outgoing weights may add up to at most 1; anything else
+    would move more people than the region holds and raises ``ValueError``.
+    """
+
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    weight = np.asarray(weight, dtype=np.float64)
+    keep = (src != dst) & (weight != 0.0)
+    src, dst, weight = src[keep], dst[keep], weight[keep]
+    if np.any(weight < 0.0):
+        raise ValueError("Mobility weights must be non-negative")
+
+    outbound = np.bincount(src, weights=weight, minlength=num_regions).astype(np.float64)
+    overfull = np.flatnonzero(outbound > 1.0 + _ROW_SUM_TOLERANCE)
+    if overfull.size:
+        raise ValueError(
+            "Outgoing mobility weights must sum to at most 1 per region; regions "
+            f"{overfull[:10].tolist()} export more than their population"
+        )
+    cells = max(num_regions * num_regions, 1)
+    if weight.shape[0] / cells > density_threshold:
+        dense = np.zeros((num_regions, num_regions), dtype=np.float64)
+        np.add.at(dense, (src, dst), weight)
+        indptr, indices, data = _empty_csr()
+        return MobilityOperator(num_regions, dense, indptr, indices, data, outbound)
+
+    order = np.argsort(dst, kind="stable")
+    indices = np.ascontiguousarray(src[order])
+    data = np.ascontiguousarray(weight[order])
+    indptr = np.zeros(num_regions + 1, dtype=np.int64)
+    np.cumsum(np.bincount(dst, minlength=num_regions), out=indptr[1:])
+    return MobilityOperator(num_regions, _empty_dense(), indptr, indices, data, outbound)
+
+
+def build_mobility_operator(
+    mobility: np.ndarray, density_threshold: float = SPARSE_DENSITY_THRESHOLD
+) -> MobilityOperator:
+    mobility = np.asarray(mobility, dtype=np.float64)
+    src, dst = np.nonzero(mobility)
+    return mobility_operator_from_edges(
+        src, dst, mobility[src, dst], mobility.shape[0], density_threshold
+    )
+
+
+def as_mobility_operator(mobility: np.ndarray | MobilityOperator) -> MobilityOperator:
+    if isinstance(mobility, MobilityOperator):
+        return mobility
+    return build_mobility_operator(mobility)
+
+
+def source_major_csr(operator: MobilityOperator) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """CSR rows keyed by source region, for kernels that move discrete individuals."""
+
+    if operator.is_sparse:
+        dst = np.repeat(np.arange(operator.num_regions), np.diff(operator.indptr))
+        src, weight = operator.indices, operator.data
+    else:
+        src, dst = np.nonzero(operator.dense)
+        weight = operator.dense[src, dst]
+    order = np.argsort(src, kind="stable")
+    indptr = np.zeros(operator.num_regions + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=operator.num_regions), out=indptr[1:])
+    return (
+        indptr,
+        np.ascontiguousarray(dst[order], dtype=np.int64),
+        np.ascontiguousarray(weight[order], dtype=np.float64),
+    )
+
+
+@njit(cache=True)
+def mobility_inflow(
+    state: np.ndarray,
+    dense: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    data: np.ndarray,
+    lo: int,
+    hi: int,
+    out: np.ndarray,
+) -> None:
+    """Write ``M.T @ x`` for the S, E, I, R rows of ``state`` into regions ``[lo, hi)`` of ``out``.
+
+    Every region sums its sources in ascending order, so splitting the range into blocks does not
+    change a single bit of the result.
+    """
+
+    if indptr.shape[0] > 0:
+        for j in range(lo, hi):
+            in_s = 0.0
+            in_e = 0.0
+            in_i = 0.0
+            in_r = 0.0
+            for p in range(indptr[j], indptr[j + 1]):
+                src = indices[p]
+                w = data[p]
+                in_s += w * state[0, src]
+                in_e += w * state[1, src]
+                in_i += w * state[2, src]
+                in_r += w * state[3, src]
+            out[0, j] = in_s
+            out[1, j] = in_e
+            out[2, j] = in_i
+            out[3, j] = in_r
+    else:
+        out[:4, lo:hi] = 0.0
+        for src in range(state.shape[1]):
+            x_s = state[0, src]
+            x_e = state[1, src]
+            x_i = state[2, src]
+            x_r = state[3, src]
+            for j in range(lo, hi):
+                w = dense[src, j]
+                out[0, j] += w * x_s
+                out[1, j] += w * x_e
+                out[2, j] += w * x_i
+                out[3, j] += w * x_r
+
+
+@njit(cache=True)
+def net_flux(
+    state: np.ndarray, outbound: np.ndarray, scale: float, lo: int, hi: int, out: np.ndarray
+) -> None:
+    """Turn the inflow in regions ``[lo, hi)`` of ``out`` into ``scale * (inflow - outflow)``."""
+
+    for c in range(4):
+        for j in range(lo, hi):
+            out[c, j] = scale * (out[c, j] - outbound[j] * state[c, j])
+
+
+@njit(cache=True)
+def mobility_flux(
+    state: np.ndarray,
+    dense: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    data: np.ndarray,
+    outbound: np.ndarray,
+    scale: float,
+    out: np.ndarray,
+) -> None:
+    """Write ``scale * (M.T @ x - outbound * x)`` for the S, E, I, R rows of ``state``."""
+
+    num_regions = state.shape[1]
+    mobility_inflow(state, dense, indptr, indices, data, 0, num_regions, out)
+    net_flux(state, outbound, scale, 0, num_regions, out)
@@ -1,11 +1,36 @@
 from __future__ import annotations
 
+from collections.abc import Iterator, Mapping
 from dataclasses import dataclass
 from typing import Iterable
 
 import numpy as np
 from numba import njit
 
+from epidemic_sim_worker.simulation.adaptive import (
+    DEFAULT_ATOL,
+    DEFAULT_RTOL,
+    _integrate_dopri5,
+)
+from epidemic_sim_worker.simulation.checkpoint import Checkpoint
+from epidemic_sim_worker.simulation.dynamics import COMPARTMENTS, derivatives, seird_derivatives
+from epidemic_sim_worker.simulation.mobility import (
+    MobilityOperator,
+    as_mobility_operator,
+    source_major_csr,
+)
+from epidemic_sim_worker.simulation.stochastic import _tau_leap, member_seeds
+
+ENGINE_MODES = ("stepwise", "fused")
+INTEGRATORS = ("rk4", "dopri5", "tau-leap")
+FRAME_DTYPES = ("float64", "float32")
+# From this many regions a single deterministic run spreads its right-hand side over all threads.
+PARALLEL_MIN_REGIONS = 512
+_COMPARTMENT_INDEX = {name: idx for idx, name in enumerate(COMPARTMENTS)}
+
+# Switch step for NPI slots that never fire (padding, or days beyond any horizon).
+_NEVER = np.iinfo(np.int64).max
+
 
 @dataclass
 class SeirdParams:
@@ -15,7 +40,7 @@ class SeirdParams:
     mu: float
     dt: float
     population: np.ndarray
-    mobility: np.ndarray
+    mobility: np.ndarray | MobilityOperator
 
 
 @dataclass
@@ -25,138 +50,415 @@ class NpiSchedule:
     mobility_multiplier: float = 1.0
 
 
+@dataclass(eq=False)
+class SimulationFrames(Mapping[str, np.ndarray]):
+    """Frames held in one contiguous ``(..., frames, compartments, regions)`` buffer.
+
+    Looking up a compartment returns a strided view, so ``frames["I"]`` never copies; ensembles
+    carry a leading member axis. Chunks from ``simulate_iter`` start at frame ``start_frame``;
+    single runs also carry the ``checkpoint`` to resume from after their last frame.
+    """
+
+    data: np.ndarray
+    output_interval: float = 1.0
+    start_frame: int = 0
+    checkpoint: Checkpoint | None = None
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.data[..., _COMPARTMENT_INDEX[name], :]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(COMPARTMENTS)
+
+    def __len__(self) -> int:
+        return len(COMPARTMENTS)
+
+    @property
+    def days(self) -> np.ndarray:
+        frames = np.arange(self.start_frame, self.start_frame + self.data.shape[-3])
+        return frames * self.output_interval
+
+
 @njit(cache=True)
 def _rk4_step(
-    S: np.ndarray,
-    E: np.ndarray,
-    I: np.ndarray,
-    R: np.ndarray,
-    D: np.ndarray,
+    state: np.ndarray,
     beta: float,
     sigma: float,
     gamma: float,
     mu: float,
     dt: float,
     population: np.ndarray,
-    mobility: np.ndarray,
+    dense: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    data: np.ndarray,
+    outbound: np.ndarray,
     beta_scale: float,
     mobility_scale: float,
-) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
-    mobility_scaled = mobility * mobility_scale
-    outbound = mobility_scaled @ np.ones_like(S)
-
-    def derivs(S_state, E_state, I_state, R_state, D_state):
-        force = beta * beta_scale * S_state * I_state / population
-        dS = -force
-        dE = force - sigma * E_state
-        dI = sigma * E_state - (gamma + mu) * I_state
-        dR = gamma * I_state
-        dD = mu * I_state
-
-        inflow_S = mobility_scaled.T @ S_state - outbound * S_state
-        inflow_E = mobility_scaled.T @ E_state - outbound * E_state
-        inflow_I = mobility_scaled.T @ I_state - outbound * I_state
-        inflow_R = mobility_scaled.T @ R_state - outbound * R_state
-
-        dS += inflow_S
-        dE += inflow_E
-        dI += inflow_I
-        dR += inflow_R
-        return dS, dE, dI, dR, dD
-
-    k1 = derivs(S, E, I, R, D)
-    k2 = derivs(
-        S + 0.5 * dt * k1[0],
-        E + 0.5 * dt * k1[1],
-        I + 0.5 * dt * k1[2],
-        R + 0.5 * dt * k1[3],
-        D + 0.5 * dt * k1[4],
-    )
-    k3 = derivs(
-        S + 0.5 * dt * k2[0],
-        E + 0.5 * dt * k2[1],
-        I + 0.5 * dt * k2[2],
-        R + 0.5 * dt * k2[3],
-        D + 0.5 * dt * k2[4],
-    )
-    k4 = derivs(
-        S + dt * k3[0],
-        E + dt * k3[1],
-        I + dt * k3[2],
-        R + dt * k3[3],
-        D + dt * k3[4],
+) -> np.ndarray:
+    k1 = np.empty_like(state)
+    k2 = np.empty_like(state)
+    k3 = np.empty_like(state)
+    k4 = np.empty_like(state)
+    args = (beta, sigma, gamma, mu, population, dense, indptr, indices, data, outbound)
+
+    seird_derivatives(state, *args, beta_scale, mobility_scale, k1)
+    seird_derivatives(state + 0.5 * dt * k1, *args, beta_scale, mobility_scale, k2)
+    seird_derivatives(state + 0.5 * dt * k2, *args, beta_scale, mobility_scale, k3)
+    seird_derivatives(state + dt * k3, *args, beta_scale, mobility_scale, k4)
+
+    next_state = state + (dt / 6.0) * (k1 + 2 * k2 + 2 * k3 + k4)
+    return np.maximum(next_state, 0.0)
+
+
+@njit(cache=True, nogil=True)
+def _integrate_rk4(
+    state: np.ndarray,
+    beta: float,
+    sigma: float,
+    gamma: float,
+    mu: float,
+    dt: float,
+    population: np.ndarray,
+    dense: np.ndarray,
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    data: np.ndarray,
+    outbound: np.ndarray,
+    npi_steps: np.ndarray,
+    npi_beta: np.ndarray,
+    npi_mobility: np.ndarray,
+    substeps: int,
+    step: int,
+    out: np.ndarray,
+    parallel_regions: bool,
+) -> None:
+    """Advance ``state`` in place from global ``step``, writing every row of ``out`` as the next
+    frame. Schedule entries already passed are re-applied, so the horizon can be resumed in chunks.
+    ``parallel_regions`` spreads each stage's right-hand side over numba's threads.
+    """
+
+    num_compartments, num_regions = state.shape
+    k1 = np.empty_like(state)
+    k2 = np.empty_like(state)
+    k3 = np.empty_like(state)
+    k4 = np.empty_like(state)
+    stage = np.empty_like(state)
+    args = (beta, sigma, gamma, mu, population, dense, indptr, indices, data, outbound)
+    half_dt = 0.5 * dt
+    sixth_dt = dt / 6.0
+
+    schedule_index = 0
+    beta_scale = 1.0
+    mobility_scale = 1.0
+    for frame in range(out.shape[0]):
+        for _ in range(substeps):
+            step += 1
+            while schedule_index < npi_steps.shape[0] and npi_steps[schedule_index] <= step:
+                beta_scale = npi_beta[schedule_index]
+                mobility_scale = npi_mobility[schedule_index]
+                schedule_index += 1
+
+            derivatives(parallel_regions, state, *args, beta_scale, mobility_scale, k1)
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    stage[c, j] = state[c, j] + half_dt * k1[c, j]
+            derivatives(parallel_regions, stage, *args, beta_scale, mobility_scale, k2)
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    stage[c, j] = state[c, j] + half_dt * k2[c, j]
+            derivatives(parallel_regions, stage, *args, beta_scale, mobility_scale, k3)
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    stage[c, j] = state[c, j] + dt * k3[c, j]
+            derivatives(parallel_regions, stage, *args, beta_scale, mobility_scale, k4)
+
+            for c in range(num_compartments):
+                for j in range(num_regions):
+                    increment = k1[c, j] + 2 * k2[c, j] + 2 * k3[c, j] + k4[c, j]
+                    state[c, j] = max(state[c, j] + sixth_dt * increment, 0.0)
+        out[frame] = state
+
+
+def _schedule_arrays(
+    npi_schedule: Iterable[NpiSchedule] | None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    schedule = sorted(list(npi_schedule or []), key=lambda item: item.day)
+    return (
+        np.array([entry.day for entry in schedule], dtype=np.float64),
+        np.array([entry.beta_multiplier for entry in schedule], dtype=np.float64),
+        np.array([entry.mobility_multiplier for entry in schedule], dtype=np.float64),
     )
 
-    S_next = S + (dt / 6.0) * (k1[0] + 2 * k2[0] + 2 * k3[0] + k4[0])
-    E_next = E + (dt / 6.0) * (k1[1] + 2 * k2[1] + 2 * k3[1] + k4[1])
-    I_next = I + (dt / 6.0) * (k1[2] + 2 * k2[2] + 2 * k3[2] + k4[2])
-    R_next = R + (dt / 6.0) * (k1[3] + 2 * k2[3] + 2 * k3[3] + k4[3])
-    D_next = D + (dt / 6.0) * (k1[4] + 2 * k2[4] + 2 * k3[4] + k4[4])
 
-    S_next = np.maximum(S_next, 0.0)
-    E_next = np.maximum(E_next, 0.0)
-    I_next = np.maximum(I_next, 0.0)
-    R_next = np.maximum(R_next, 0.0)
-    D_next = np.maximum(D_next, 0.0)
+def _switch_times(npi_days: np.ndarray) -> np.ndarray:
+    """Simulated time at which each entry takes effect: a day-``d`` entry covers ``(d - 1, d]``."""
 
-    return S_next, E_next, I_next, R_next, D_next
+    return np.maximum(npi_days - 1.0, 0.0)
+
+
+def _switch_steps(npi_days: np.ndarray, dt: float) -> np.ndarray:
+    """First fixed ``dt`` step (1-based) starting at or after each entry's switch time."""
+
+    steps = np.full(npi_days.shape, _NEVER, dtype=np.int64)
+    finite = np.isfinite(npi_days)
+    steps[finite] = np.ceil(_switch_times(npi_days[finite]) / dt - 1e-9).astype(np.int64) + 1
+    return steps
+
+
+def _frame_count(horizon: float, output_interval: float) -> int:
+    if output_interval <= 0:
+        raise ValueError("output_interval must be positive")
+    return int(horizon / output_interval + 1e-9) + 1
+
+
+def _substeps(dt: float, output_interval: float) -> int:
+    """Fixed ``dt`` steps between two frames."""
+
+    substeps = max(int(round(output_interval / dt)), 1) if dt > 0 else 0
+    if substeps == 0 or abs(substeps * dt - output_interval) > 1e-9 * output_interval:
+        raise ValueError("output_interval must be a whole multiple of dt")
+    return substeps
+
+
+class _Integration:
+    """Integrator state carried between chunks of one run."""
+
+    def __init__(
+        self,
+        initial_state: dict[str, np.ndarray],
+        params: SeirdParams,
+        npi_schedule: Iterable[NpiSchedule] | None,
+        mode: str,
+        integrator: str,
+        seed: int,
+        rtol: float,
+        atol: float,
+        output_interval: float,
+        num_frames: int,
+        resume_from: Checkpoint | None,
+    ) -> None:
+        if mode not in ENGINE_MODES:
+            raise ValueError(f"Unknown engine mode: {mode}")
+        if integrator not in INTEGRATORS:
+            raise ValueError(f"Unknown integrator: {integrator}")
+
+        self.mode = mode
+        self.integrator = integrator
+        # Plain floats keep one compiled signature per kernel, whatever types the caller passes.
+        self.rates = tuple(
+            float(rate) for rate in (params.beta, params.sigma, params.gamma, params.mu)
+        )
+        self.dt = float(params.dt)
+        self.rtol = float(rtol)
+        self.atol = float(atol)
+        self.output_interval = float(output_interval)
+        self.state = np.stack([initial_state[name].astype(np.float64) for name in COMPARTMENTS])
+        self.operator = as_mobility_operator(params.mobility)
+        self.population = np.asarray(params.population, dtype=np.float64)
+        self.parallel_regions = self.state.shape[1] >= PARALLEL_MIN_REGIONS
+        npi_days, self.npi_beta, self.npi_mobility = _schedule_arrays(npi_schedule)
+        self.frame = 0
+        self.trial_step = self.dt
+        if integrator == "dopri5":
+            self.npi_times = _switch_times(npi_days)
+        else:
+            self.substeps = _substeps(self.dt, self.output_interval)
+            self.npi_steps = _switch_steps(npi_days, self.dt)
+        if integrator == "tau-leap":
+            self.state = np.rint(self.state)
+            self.seeds = member_seeds(seed, 1, num_frames)[0]
+            self.moves = source_major_csr(self.operator)
+        if resume_from is not None:
+            if resume_from.state.shape != self.state.shape or resume_from.frame >= num_frames:
+                raise ValueError("Checkpoint does not fit this run")
+            self.state = resume_from.state.astype(np.float64, copy=True)
+            self.frame = resume_from.frame
+            self.trial_step = float(resume_from.trial_step)
+
+    def checkpoint(self) -> Checkpoint:
+        return Checkpoint(self.frame, self.state.copy(), self.trial_step)
+
+    def advance(self, out: np.ndarray) -> None:
+        """Write the next ``out.shape[0]`` frames into ``out``."""
+
+        operator = self.operator
+        rates = self.rates
+        csr = (operator.dense, operator.indptr, operator.indices, operator.data, operator.outbound)
+        if self.integrator == "dopri5":
+            self.trial_step = _integrate_dopri5(
+                self.state,
+                *rates,
+                self.trial_step,
+                self.output_interval,
+                self.rtol,
+                self.atol,
+                self.population,
+                *csr,
+                self.npi_times,
+                self.npi_beta,
+                self.npi_mobility,
+                self.frame,
+                out,
+                self.parallel_regions,
+            )
+        elif self.integrator == "tau-leap":
+            _tau_leap(
+                self.state,
+                self.seeds[self.frame + 1 : self.frame + 1 + out.shape[0]],
+                *rates,
+                self.dt,
+                self.population,
+                *self.moves,
+                operator.outbound,
+                self.npi_steps,
+                self.npi_beta,
+                self.npi_mobility,
+                self.substeps,
+                self.frame * self.substeps,
+                out,
+            )
+        elif self.mode == "fused":
+            _integrate_rk4(
+                self.state,
+                *rates,
+                self.dt,
+                self.population,
+                *csr,
+                self.npi_steps,
+                self.npi_beta,
+                self.npi_mobility,
+                self.substeps,
+                self.frame * self.substeps,
+                out,
+                self.parallel_regions,
+            )
+        else:
+            step = self.frame * self.substeps
+            for frame in range(out.shape[0]):
+                for _ in range(self.substeps):
+                    step += 1
+                    active = int(np.searchsorted(self.npi_steps, step, side="right")) - 1
+                    self.state = _rk4_step(
+                        self.state,
+                        *rates,
+                        self.dt,
+                        self.population,
+                        *csr,
+                        float(self.npi_beta[active]) if active >= 0 else 1.0,
+                        float(self.npi_mobility[active]) if active >= 0 else 1.0,
+                    )
+                out[frame] = self.state
+        self.frame += out.shape[0]
+
+
+def _check_frame_dtype(frame_dtype: str) -> None:
+    if frame_dtype not in FRAME_DTYPES:
+        raise ValueError(f"Unknown frame dtype: {frame_dtype}")
 
 
 def simulate(
     initial_state: dict[str, np.ndarray],
     params: SeirdParams,
-    horizon: int,
+    horizon: float,
     npi_schedule: Iterable[NpiSchedule] | None = None,
-) -> dict[str, np.ndarray]:
-    S = initial_state["S"].astype(np.float64)
-    E = initial_state["E"].astype(np.float64)
-    I = initial_state["I"].astype(np.float64)
-    R = initial_state["R"].astype(np.float64)
-    D = initial_state["D"].astype(np.float64)
-
-    frames = {
-        "S": np.zeros((horizon + 1, S.shape[0])),
-        "E": np.zeros((horizon + 1, S.shape[0])),
-        "I": np.zeros((horizon + 1, S.shape[0])),
-        "R": np.zeros((horizon + 1, S.shape[0])),
-        "D": np.zeros((horizon + 1, S.shape[0])),
-    }
-    frames["S"][0] = S
-    frames["E"][0] = E
-    frames["I"][0] = I
-    frames["R"][0] = R
-    frames["D"][0] = D
+    mode: str = "fused",
+    integrator: str = "rk4",
+    seed: int = 0,
+    rtol: float = DEFAULT_RTOL,
+    atol: float = DEFAULT_ATOL,
+    output_interval: float = 1.0,
+    frame_dtype: str = "float64",
+    resume_from: Checkpoint | None = None,
+) -> SimulationFrames:
+    """Integrate ``horizon`` days into a ``(frames, compartments, regions)`` buffer.
 
-    schedule = sorted(list(npi_schedule or []), key=lambda item: item.day)
-    schedule_index = 0
-    beta_multiplier = 1.0
-    mobility_multiplier = 1.0
-
-    for step in range(1, horizon + 1):
-        while schedule_index < len(schedule) and schedule[schedule_index].day <= step:
-            beta_multiplier = schedule[schedule_index].beta_multiplier
-            mobility_multiplier = schedule[schedule_index].mobility_multiplier
-            schedule_index += 1
-        S, E, I, R, D = _rk4_step(
-            S,
-            E,
-            I,
-            R,
-            D,
-            params.beta,
-            params.sigma,
-            params.gamma,
-            params.mu,
-            params.dt,
-            params.population,
-            params.mobility,
-            beta_multiplier,
-            mobility_multiplier,
-        )
-        frames["S"][step] = S
-        frames["E"][step] = E
-        frames["I"][step] = I
-        frames["R"][step] = R
-        frames["D"][step] = D
+    Frames are written every ``output_interval`` days starting at day 0, independently of the
+    integration step ``dt``; an NPI entry for day ``d`` is in force over ``(d - 1, d]`` whatever
+    the step size. ``integrator="rk4"`` is deterministic: ``mode="fused"`` runs the whole horizon
+    in one compiled call, ``"stepwise"`` dispatches ``_rk4_step`` once per step as a reference
+    implementation. ``integrator="dopri5"`` adapts its step to ``rtol``/``atol`` starting from
+    ``dt`` and interpolates the frames. ``integrator="tau-leap"`` draws chain-binomial transitions
+    from ``seed``; it matches member 0 of a stochastic ensemble with the same seed.
+    ``frame_dtype="float32"`` halves the stored frames; integration always runs in float64.
+    With ``resume_from`` the result only holds the frames after the checkpoint.
+    """
+
+    _check_frame_dtype(frame_dtype)
+    num_frames = _frame_count(horizon, output_interval)
+    integration = _Integration(
+        initial_state,
+        params,
+        npi_schedule,
+        mode,
+        integrator,
+        seed,
+        rtol,
+        atol,
+        output_interval,
+        num_frames,
+        resume_from,
+    )
+    start = 0 if resume_from is None else integration.frame + 1
+    out = np.empty((num_frames - start, *integration.state.shape), dtype=frame_dtype)
+    if resume_from is None:
+        out[0] = integration.state
+        integration.advance(out[1:])
+    else:
+        integration.advance(out)
+    return SimulationFrames(out, output_interval, start, integration.checkpoint())
 
-    return frames
+
+def simulate_iter(
+    initial_state: dict[str, np.ndarray],
+    params: SeirdParams,
+    horizon: float,
+    npi_schedule: Iterable[NpiSchedule] | None = None,
+    mode: str = "fused",
+    integrator: str = "rk4",
+    seed: int = 0,
+    rtol: float = DEFAULT_RTOL,
+    atol: float = DEFAULT_ATOL,
+    output_interval: float = 1.0,
+    frame_dtype: str = "float64",
+    chunk_frames: int = 16,
+    resume_from: Checkpoint | None = None,
+) -> Iterator[SimulationFrames]:
+    """Yield the frames of ``simulate`` in chunks of at most ``chunk_frames`` as they are computed.
+
+    The first chunk starts with the initial state, or right after ``resume_from``. Nothing is
+    computed ahead of the consumer, so memory stays at one chunk whatever the horizon. Each chunk
+    carries a checkpoint, so a run can be resumed between chunks. Fixed-step integrators match
+    ``simulate`` exactly; dopri5 also clips its steps at chunk ends, which only moves results
+    within tolerance.
+    """
+
+    if chunk_frames < 1:
+        raise ValueError("chunk_frames must be positive")
+    _check_frame_dtype(frame_dtype)
+    num_frames = _frame_count(horizon, output_interval)
+    integration = _Integration(
+        initial_state,
+        params,
+        npi_schedule,
+        mode,
+        integrator,
+        seed,
+        rtol,
+        atol,
+        output_interval,
+        num_frames,
+        resume_from,
+    )
+    shape = integration.state.shape
+    start = 0 if resume_from is None else integration.frame + 1
+    while start < num_frames:
+        size = min(chunk_frames, num_frames - start)
+        out = np.empty((size, *shape), dtype=frame_dtype)
+        if start == 0:
+            out[0] = integration.state
+            integration.advance(out[1:])
+        else:
+            integration.advance(out)
+        yield SimulationFrames(out, output_interval, start, integration.checkpoint())
+        start += size
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import numpy as np
+from numba import njit, prange
+
+
+def member_seeds(seed: int, members: int, frames: int = 1) -> np.ndarray:
+    """Kernel seeds per ensemble member and output frame derived from a run seed.
+
+    Member ``m`` always takes the ``m``-th child of ``SeedSequence(seed)`` and frame ``k`` its
+    ``k``-th word, so draws depend only on the run seed and those indices, never on ensemble
+    size, thread count or how the horizon is chunked. Returns ``(members, frames)``.
+    """
+
+    children = np.random.SeedSequence(seed).spawn(members)
+    return np.array([child.generate_state(frames, np.uint32) for child in children]).astype(
+        np.int64
+    )
+
+
+# Above this variance a rounded normal draw replaces the exact binomial (Langevin regime).
+NORMAL_APPROX_VARIANCE = 25.0
+
+
+@njit(cache=True)
+def _binomial(count: float, probability: float) -> float:
+    n = int(count)
+    if n <= 0 or probability <= 0.0:
+        return 0.0
+    if probability >= 1.0:
+        return float(n)
+    mean = n * probability
+    variance = mean * (1.0 - probability)
+    if variance > NORMAL_APPROX_VARIANCE:
+        draw = np.rint(mean + np.sqrt(variance) * np.random.standard_normal())
+        return min(max(draw, 0.0), float(n))
+    return float(np.random.binomial(n, probability))
+
+
+@njit(cache=True, nogil=True)
+def _tau_leap(
+    state: np.ndarray,
+    seeds: np.ndarray,
+    beta: float,
+    sigma: float,
+    gamma: float,
+    mu: float,
+    dt: float,
+    population: np.ndarray,
+    move_indptr: np.ndarray,
+    move_indices: np.ndarray,
+    move_weights: np.ndarray,
+    outbound: np.ndarray,
+    npi_steps: np.ndarray,
+    npi_beta: np.ndarray,
+    npi_mobility: np.ndarray,
+    substeps: int,
+    step: int,
+    out: np.ndarray,
+) -> None:
+    """Chain-binomial SEIRD with binomial movement, one frame every ``substeps`` leaps of ``dt``.
+
+    Resumes from global ``step`` like ``_integrate_rk4``. Numba's thread-local generator is
+    reseeded from ``seeds[k]`` before frame ``k``, so the draws never depend on the thread.
+    """
+
+    num_compartments, num_regions = state.shape
+    moved = np.empty((4, num_regions))
+    p_incubation = 1.0 - np.exp(-sigma * dt)
+    p_exit = 1.0 - np.exp(-(gamma + mu) * dt)
+    death_share = mu / (gamma + mu) if gamma + mu > 0.0 else 0.0
+
+    schedule_index = 0
+    beta_scale = 1.0
+    mobility_scale = 1.0
+    for frame in range(out.shape[0]):
+        np.random.seed(seeds[frame])
+        for _ in range(substeps):
+            step += 1
+            while schedule_index < npi_steps.shape[0] and npi_steps[schedule_index] <= step:
+                beta_scale = npi_beta[schedule_index]
+                mobility_scale = npi_mobility[schedule_index]
+                schedule_index += 1
+
+            for j in range(num_regions):
+                force = beta * beta_scale * state[2, j] / population[j]
+                infected = _binomial(state[0, j], 1.0 - np.exp(-force * dt))
+                onset = _binomial(state[1, j], p_incubation)
+                exits = _binomial(state[2, j], p_exit)
+                deaths = _binomial(exits, death_share)
+                state[0, j] -= infected
+                state[1, j] += infected - onset
+                state[2, j] += onset - exits
+                state[3, j] += exits - deaths
+                state[4, j] += deaths
+
+            moved[:] = 0.0
+            for src in range(num_regions):
+                rate = mobility_scale * outbound[src]
+                if rate <= 0.0:
+                    continue
+                p_leave = 1.0 - np.exp(-rate * dt)
+                for c in range(4):
+                    remaining = _binomial(state[c, src], p_leave)
+                    moved[c, src] -= remaining
+                    weight_left = outbound[src]
+                    for p in range(move_indptr[src], move_indptr[src + 1]):
+                        if remaining <= 0.0:
+                            break
+                        share = move_weights[p] / weight_left if weight_left > 0.0 else 1.0
+                        arrivals = _binomial(remaining, share)
+                        moved[c, move_indices[p]] += arrivals
+                        remaining -= arrivals
+                        weight_left -= move_weights[p]
+                    moved[c, src] += remaining
+            for c in range(4):
+                for j in range(num_regions):
+                    state[c, j] += moved[c, j]
+        out[frame] = state
+
+
+@njit(cache=True, parallel=True)
+def _tau_leap_ensemble(
+    states: np.ndarray,
+    seeds: np.ndarray,
+    beta: np.ndarray,
+    sigma: np.ndarray,
+    gamma: np.ndarray,
+    mu: np.ndarray,
+    dt: float,
+    population: np.ndarray,
+    move_indptr: np.ndarray,
+    move_indices: np.ndarray,
+    move_weights: np.ndarray,
+    outbound: np.ndarray,
+    npi_steps: np.ndarray,
+    npi_beta: np.ndarray,
+    npi_mobility: np.ndarray,
+    substeps: int,
+    out: np.ndarray,
+) -> None:
+    for member in prange(states.shape[0]):
+        _tau_leap(
+            states[member],
+            seeds[member],
+            beta[member],
+            sigma[member],
+            gamma[member],
+            mu[member],
+            dt,
+            population,
+            move_indptr,
+            move_indices,
+            move_weights,
+            outbound,
+            npi_steps[member],
+            npi_beta[member],
+            npi_mobility[member],
+            substeps,
+            0,
+            out[member],
+        )
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import numpy as np
+
+from epidemic_sim_worker.simulation.ensemble import EnsembleParams, simulate_ensemble
+from epidemic_sim_worker.simulation.mobility import build_mobility_operator
+from epidemic_sim_worker.simulation.model import (
+    FRAME_DTYPES,
+    INTEGRATORS,
+    NpiSchedule,
+    SeirdParams,
+    simulate,
+)
+
+
+def warm_up() -> None:
+    """Compile or load from numba's cache every kernel signature a worker job dispatches.
+
+    Runs each integrator and frame dtype once on a three-region network, both as a single run
+    and as a two-member ensemble, so the first real job starts integrating immediately.
+    """
+
+    population = np.array([1_000.0, 800.0, 600.0])
+    mobility = build_mobility_operator(np.full((3, 3), 0.01))
+    initial_state = {
+        "S": population - 1,
+        "E": np.zeros(3),
+        "I": np.ones(3),
+        "R": np.zeros(3),
+        "D": np.zeros(3),
+    }
+    params = SeirdParams(0.3, 0.2, 0.1, 0.01, 0.5, population, mobility)
+    schedule = [NpiSchedule(day=1, beta_multiplier=0.5)]
+    members = EnsembleParams.from_members([params, params])
+    for integrator in INTEGRATORS:
+        for frame_dtype in FRAME_DTYPES:
+            simulate(
+                initial_state, params, 2, schedule, integrator=integrator, frame_dtype=frame_dtype
+            )
+            simulate_ensemble(
+                initial_state,
+                members,
+                2,
+                [schedule, schedule],
+                integrator=integrator,
+                frame_dtype=frame_dtype,
+            )
+    simulate(initial_state, params, 1, schedule, mode="stepwise")
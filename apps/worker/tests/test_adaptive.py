@@ -0,0 +1,32 @@
+import numpy as np
+
+from epidemic_sim_worker.simulation.model import NpiSchedule, SeirdParams, simulate
+
+
+def test_dopri5_matches_fine_rk4_on_the_daily_grid() -> None:
+    population = np.array([50_000.0, 20_000.0, 35_000.0])
+    mobility = np.array([[0.0, 0.01, 0.02], [0.01, 0.0, 0.0], [0.03, 0.0, 0.0]])
+    initial_state = {
+        "S": population - 10,
+        "E": np.zeros(3),
+        "I": np.array([10.0, 10.0, 10.0]),
+        "R": np.zeros(3),
+        "D": np.zeros(3),
+    }
+    schedule = [NpiSchedule(day=31, beta_multiplier=0.5)]
+    fine = simulate(
+        initial_state,
+        SeirdParams(0.3, 0.2, 0.1, 0.01, 1.0 / 64, population, mobility),
+        horizon=120,
+        npi_schedule=schedule,
+    )
+    adaptive = simulate(
+        initial_state,
+        SeirdParams(0.3, 0.2, 0.1, 0.01, 1.0, population, mobility),
+        horizon=120,
+        npi_schedule=schedule,
+        integrator="dopri5",
+    )
+    for name in ("S", "E", "I", "R", "D"):
+        assert adaptive[name].shape == (121, 3)
+        assert np.allclose(adaptive[name], fine[name], rtol=1e-4, atol=1e-2)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from epidemic_sim_worker.simulation.checkpoint import Checkpoint, prefix_keys
+from epidemic_sim_worker.simulation.model import NpiSchedule, SeirdParams, simulate, simulate_iter
+
+POPULATION = np.array([4000.0, 2500.0, 1800.0])
+PARAMS = SeirdParams(0.3, 0.2, 0.1, 0.01, 0.5, POPULATION, np.full((3, 3), 0.01))
+INITIAL_STATE = {
+    "S": POPULATION - 10,
+    "E": np.zeros(3),
+    "I": np.full(3, 10.0),
+    "R": np.zeros(3),
+    "D": np.zeros(3),
+}
+
+
+def test_resume_from_chunk_checkpoint_matches_uninterrupted_run() -> None:
+    schedule = [NpiSchedule(day=12, beta_multiplier=0.4)]
+    for integrator in ("rk4", "tau-leap"):
+        whole = simulate(INITIAL_STATE, PARAMS, 40, schedule, integrator=integrator, seed=5)
+        first = next(
+            simulate_iter(
+                INITIAL_STATE, PARAMS, 40, schedule, integrator=integrator, seed=5, chunk_frames=10
+            )
+        )
+        saved = Checkpoint.from_bytes(first.checkpoint.to_bytes())
+        assert saved.frame == 9
+
+        resumed = simulate(
+            INITIAL_STATE, PARAMS, 40, schedule, integrator=integrator, seed=5, resume_from=saved
+        )
+        assert resumed.start_frame == 10
+        assert np.array_equal(resumed.data, whole.data[10:])
+
+
+def test_prefix_keys_are_shared_until_the_first_differing_entry() -> None:
+    base = [NpiSchedule(day=5, beta_multiplier=0.8)]
+    branch = [*base, NpiSchedule(day=21, beta_multiplier=0.3)]
+    frames = [10, 20, 21, 30]
+    base_keys = prefix_keys(INITIAL_STATE, PARAMS, base, frames)
+    branch_keys = prefix_keys(INITIAL_STATE, PARAMS, branch, frames)
+
+    assert [base_keys[frame] == branch_keys[frame] for frame in frames] == [
+        True,
+        True,
+        False,
+        False,
+    ]
+    other_seed = prefix_keys(INITIAL_STATE, PARAMS, base, frames, seed=9)
+    assert other_seed == base_keys
+    assert prefix_keys(INITIAL_STATE, PARAMS, base, frames, "tau-leap", seed=9) != prefix_keys(
+        INITIAL_STATE, PARAMS, base, frames, "tau-leap", seed=1
+    )
+    float32_keys = prefix_keys(INITIAL_STATE, PARAMS, base, frames, frame_dtype="float32")
+    assert set(float32_keys.values()).isdisjoint(base_keys.values())
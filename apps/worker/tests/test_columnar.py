@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from epidemic_sim_worker.columnar import SERIES_FIELDS, decode_chunk, encode_chunk
+from epidemic_sim_worker.simulation.model import SeirdParams, simulate
+
+REGIONS = 40
+POPULATION = np.linspace(5_000.0, 400_000.0, REGIONS)
+PARAMS = SeirdParams(0.3, 0.2, 0.1, 0.01, 1.0, POPULATION, np.eye(REGIONS))
+INITIAL_STATE = {
+    "S": POPULATION - 10,
+    "E": np.zeros(REGIONS),
+    "I": np.full(REGIONS, 10.0),
+    "R": np.zeros(REGIONS),
+    "D": np.zeros(REGIONS),
+}
+REGION_IDS = [f"region-{index:04d}" for index in range(REGIONS)]
+
+
+def _chunk_values(frame_dtype: str) -> np.ndarray:
+    data = simulate(INITIAL_STATE, PARAMS, 29, frame_dtype=frame_dtype).data
+    new_cases = np.diff(data[:, 2], axis=0, prepend=data[:1, 2])
+    rt = np.full_like(new_cases, 3.0)
+    return np.concatenate([data, new_cases[:, np.newaxis], rt[:, np.newaxis]], axis=1)
+
+
+def test_chunk_round_trip_is_lossless() -> None:
+    for frame_dtype in ("float64", "float32"):
+        values = _chunk_values(frame_dtype)
+        times = np.arange(values.shape[0]) * 2
+        payload = encode_chunk(times, REGION_IDS, values)
+
+        decoded_times, region_ids, decoded = decode_chunk(payload)
+        assert decoded_times == times.tolist()
+        assert region_ids == REGION_IDS
+        assert decoded.dtype == values.dtype
+        assert np.array_equal(decoded, values)
+        # A run_series row costs well over 150 bytes with its indexes; a chunk cell a fraction.
+        assert len(payload) < values.shape[0] * REGIONS * 40
+
+
+def test_chunk_shape_must_match_times_and_regions() -> None:
+    values = np.zeros((3, len(SERIES_FIELDS), REGIONS))
+    with pytest.raises(ValueError):
+        encode_chunk(np.arange(2), REGION_IDS, values)
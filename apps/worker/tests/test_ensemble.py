@@ -0,0 +1,94 @@
+import numpy as np
+
+from epidemic_sim_worker.simulation.ensemble import EnsembleParams, member_mean, simulate_ensemble
+from epidemic_sim_worker.simulation.model import NpiSchedule, SeirdParams, simulate
+from epidemic_sim_worker.simulation.stochastic import member_seeds
+
+
+def test_ensemble_matches_individual_runs() -> None:
+    population = np.array([2000.0, 1200.0, 900.0])
+    mobility = np.full((3, 3), 0.02)
+    initial_state = {
+        "S": population - 10,
+        "E": np.zeros(3),
+        "I": np.full(3, 10.0),
+        "R": np.zeros(3),
+        "D": np.zeros(3),
+    }
+    members = [
+        SeirdParams(beta, 0.2, gamma, 0.01, 1.0, population, mobility)
+        for beta, gamma in [(0.25, 0.1), (0.4, 0.12), (0.3, 0.08)]
+    ]
+    schedules = [
+        None,
+        [NpiSchedule(day=5, beta_multiplier=0.5)],
+        [NpiSchedule(day=3, mobility_multiplier=0.1), NpiSchedule(day=9, beta_multiplier=0.7)],
+    ]
+
+    stacked = simulate_ensemble(
+        initial_state, EnsembleParams.from_members(members), horizon=25, npi_schedules=schedules
+    )
+
+    for idx, (member, schedule) in enumerate(zip(members, schedules, strict=True)):
+        single = simulate(initial_state, member, horizon=25, npi_schedule=schedule)
+        for name in ("S", "E", "I", "R", "D"):
+            assert stacked[name].shape == (3, 26, 3)
+            assert np.array_equal(stacked[name][idx], single[name])
+
+
+def test_parallel_ensemble_is_independent_of_worker_count() -> None:
+    population = np.array([5000.0, 3000.0])
+    mobility = np.array([[0.0, 0.05], [0.02, 0.0]])
+    initial_state = {
+        "S": population - 5,
+        "E": np.zeros(2),
+        "I": np.full(2, 5.0),
+        "R": np.zeros(2),
+        "D": np.zeros(2),
+    }
+    params = EnsembleParams(
+        beta=np.linspace(0.2, 0.5, 8),
+        sigma=np.full(8, 0.2),
+        gamma=np.full(8, 0.1),
+        mu=np.full(8, 0.01),
+        dt=1.0,
+        population=population,
+        mobility=mobility,
+    )
+    serial = simulate_ensemble(initial_state, params, horizon=40, workers=1)
+    threaded = simulate_ensemble(initial_state, params, horizon=40, workers=4)
+    for name in ("S", "E", "I", "R", "D"):
+        assert np.array_equal(serial[name], threaded[name])
+
+
+def test_member_seeds_do_not_depend_on_ensemble_size() -> None:
+    small = member_seeds(42, 2, frames=3)
+    large = member_seeds(42, 6, frames=5)
+    assert np.array_equal(small, large[:2, :3])
+    assert len(set(large.ravel().tolist())) == 30
+
+
+def test_member_mean_averages_stochastic_members() -> None:
+    population = np.array([4000.0, 2500.0])
+    initial_state = {
+        "S": population - 20,
+        "E": np.zeros(2),
+        "I": np.full(2, 20.0),
+        "R": np.zeros(2),
+        "D": np.zeros(2),
+    }
+    params = SeirdParams(0.35, 0.2, 0.1, 0.01, 0.5, population, np.full((2, 2), 0.01))
+    ensemble = simulate_ensemble(
+        initial_state,
+        EnsembleParams.from_members([params] * 4),
+        horizon=12,
+        integrator="tau-leap",
+        seed=5,
+        frame_dtype="float32",
+    )
+
+    mean = member_mean(ensemble)
+    assert mean.data.shape == ensemble.data.shape[1:]
+    assert mean.data.dtype == np.float32
+    assert np.allclose(mean["I"], ensemble["I"].astype(np.float64).mean(axis=0))
+    assert not np.array_equal(ensemble["I"][0], ensemble["I"][1])
@@ -0,0 +1,22 @@
+import struct
+
+import numpy as np
+
+from epidemic_sim_worker.columnar import SERIES_FIELDS
+from epidemic_sim_worker.frames import PACKED_MAGIC, frame_payload, pack_frame
+
+
+def test_packed_frame_matches_json_payload() -> None:
+    values = np.arange(len(SERIES_FIELDS) * 3, dtype=np.float32).reshape(len(SERIES_FIELDS), 3)
+    packed = pack_frame(12, values)
+
+    magic, version, flags, typecode, fields, t, regions = struct.unpack_from("<2sBBcB2xiI", packed)
+    assert (magic, version, flags, typecode) == (PACKED_MAGIC, 1, 0, b"f")
+    assert (fields, t, regions) == (len(SERIES_FIELDS), 12, 3)
+    body = np.frombuffer(packed, dtype="<f4", offset=16).reshape(fields, regions)
+
+    payload = frame_payload("run-1", 12, ["a", "b", "c"], values)
+    assert payload["series"][2] == {
+        "regionId": "c",
+        **dict(zip(("S", "E", "I", "R", "D", "newCases", "rt"), body[:, 2].tolist(), strict=True)),
+    }
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from epidemic_sim_worker.simulation import model
+from epidemic_sim_worker.simulation.dynamics import REGION_BLOCK
+from epidemic_sim_worker.simulation.mobility import (
+    build_mobility_operator,
+    mobility_operator_from_edges,
+)
+from epidemic_sim_worker.simulation.model import SeirdParams, simulate
+
+
+def _initial_state(population: np.ndarray) -> dict[str, np.ndarray]:
+    size = population.shape[0]
+    return {
+        "S": population - 10,
+        "E": np.zeros(size),
+        "I": np.full(size, 10.0),
+        "R": np.zeros(size),
+        "D": np.zeros(size),
+    }
+
+
+def test_sparse_and_dense_paths_agree() -> None:
+    rng = np.random.default_rng(7)
+    size = 40
+    mobility = rng.random((size, size)) * (rng.random((size, size)) < 0.05) * 0.01
+    population = rng.integers(1_000, 50_000, size).astype(np.float64)
+
+    sparse = build_mobility_operator(mobility, density_threshold=1.0)
+    dense = build_mobility_operator(mobility, density_threshold=0.0)
+    assert sparse.is_sparse
+    assert not dense.is_sparse
+
+    results = [
+        simulate(
+            _initial_state(population),
+            SeirdParams(0.3, 0.2, 0.1, 0.01, 1.0, population, operator),
+            horizon=30,
+        )
+        for operator in (sparse, dense)
+    ]
+    for name in ("S", "E", "I", "R", "D"):
+        assert np.allclose(results[0][name], results[1][name], rtol=1e-12)
+
+
+def test_edges_match_matrix_and_drop_self_loops() -> None:
+    src = np.array([0, 1, 2, 2, 1])
+    dst = np.array([1, 2, 0, 2, 1])
+    weight = np.array([0.1, 0.2, 0.3, 0.9, 0.5])
+    mobility = np.zeros((3, 3))
+    mobility[src, dst] = weight
+
+    from_edges = mobility_operator_from_edges(src, dst, weight, 3, density_threshold=1.0)
+    from_matrix = build_mobility_operator(mobility, density_threshold=1.0)
+
+    assert from_edges.nnz == 3
+    assert np.array_equal(from_edges.indptr, from_matrix.indptr)
+    assert np.array_equal(from_edges.indices, from_matrix.indices)
+    assert np.allclose(from_edges.outbound, [0.1, 0.2, 0.3])
+
+
+@pytest.mark.parametrize("integrator", ["rk4", "dopri5"])
+@pytest.mark.parametrize("density_threshold", [0.0, 1.0])
+def test_region_parallel_runs_match_serial_bit_for_bit(
+    monkeypatch: pytest.MonkeyPatch, integrator: str, density_threshold: float
+) -> None:
+    rng = np.random.default_rng(11)
+    size = 2 * REGION_BLOCK + 17
+    mobility = rng.random((size, size)) * (rng.random((size, size)) < 0.02) * 0.01
+    population = rng.integers(1_000, 50_000, size).astype(np.float64)
+    params = SeirdParams(
+        0.3,
+        0.2,
+        0.1,
+        0.01,
+        0.5,
+        population,
+        build_mobility_operator(mobility, density_threshold=density_threshold),
+    )
+
+    results = []
+    for threshold in (size + 1, size):
+        monkeypatch.setattr(model, "PARALLEL_MIN_REGIONS", threshold)
+        results.append(
+            simulate(_initial_state(population), params, horizon=10, integrator=integrator)
+        )
+    for name in ("S", "E", "I", "R", "D"):
+        assert np.array_equal(results[0][name], results[1][name])
+
+
+def test_regions_cannot_export_more_than_their_population() -> None:
+    src = np.array([0, 0, 1, 2])
+    dst = np.array([1, 2, 0, 0])
+    full = mobility_operator_from_edges(src, dst, np.array([0.7, 0.3, 1.0, 0.2]), 3)
+    assert np.allclose(full.outbound, [1.0, 1.0, 0.2])
+
+    with pytest.raises(ValueError, match=r"regions \[0\]"):
+        mobility_operator_from_edges(src, dst, np.array([0.7, 0.5, 1.0, 0.2]), 3)
+    with pytest.raises(ValueError, match="non-negative"):
+        mobility_operator_from_edges(src, dst, np.array([0.7, -0.1, 1.0, 0.2]), 3)
+    overfull = np.full((3, 3), 0.6)
+    with pytest.raises(ValueError, match=r"regions \[0, 1, 2\]"):
+        build_mobility_operator(overfull)
+    # Self-loops stay put, so they never count towards a region's exports.
+    staying = np.full((3, 3), 0.5)
+    np.fill_diagonal(staying, 5.0)
+    assert np.allclose(build_mobility_operator(staying).outbound, [1.0, 1.0, 1.0])
@@ -0,0 +1,156 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from epidemic_sim_worker.columnar import decode_chunk
+from epidemic_sim_worker.models import Artifacts, Base, RunSeries, RunSeriesChunks
+from epidemic_sim_worker.persistence import SERIES_COLUMNS, RunSeriesChunkWriter, RunSeriesWriter
+
+REGIONS = ["a", "b"]
+# (frames, compartments, regions)
+DATA = np.arange(2 * 5 * 2, dtype=np.float64).reshape(2, 5, 2)
+NEW_CASES = np.array([[0.5, 1.5], [2.5, 3.5]])
+ROWS = [
+    ("run-1", 0, "a", 0.0, 2.0, 4.0, 6.0, 8.0, 0.5, 2.5, None),
+    ("run-1", 0, "b", 1.0, 3.0, 5.0, 7.0, 9.0, 1.5, 2.5, None),
+    ("run-1", 1, "a", 10.0, 12.0, 14.0, 16.0, 18.0, 2.5, 2.5, None),
+    ("run-1", 1, "b", 11.0, 13.0, 15.0, 17.0, 19.0, 3.5, 2.5, None),
+]
+
+
+class CopyDriver:
+    """asyncpg stand-in that records ``copy_records_to_table`` calls."""
+
+    def __init__(self) -> None:
+        self.copies: list[tuple[str, list[tuple], tuple[str, ...]]] = []
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copies.append((table, list(records), columns))
+
+
+class SqliteSession:
+    """Runs the writer's statements on an in-memory SQLite database.
+
+    ``driver`` is what the raw connection exposes; SQLite's own has no ``COPY``.
+    """
+
+    def __init__(self, session: Session, driver: object | None = None) -> None:
+        self.session = session
+        self.driver = driver if driver is not None else object()
+        self.commits = 0
+
+    async def execute(self, stmt, params=None):
+        return self.session.execute(stmt, params)
+
+    async def commit(self) -> None:
+        self.session.commit()
+        self.commits += 1
+
+    async def connection(self):
+        return self
+
+    async def get_raw_connection(self):
+        return SimpleNamespace(driver_connection=self.driver)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    tables = [RunSeries.__table__, RunSeriesChunks.__table__, Artifacts.__table__]
+    Base.metadata.create_all(engine, tables=tables)
+    with Session(engine) as session:
+        yield session
+
+
+def _writer(session: SqliteSession) -> RunSeriesWriter:
+    writer = RunSeriesWriter(session, "run-1", REGIONS, rt=2.5, batch_frames=2)
+    writer.add_frames(np.array([0, 1]), DATA, NEW_CASES)
+    return writer
+
+
+def test_copy_sends_one_record_per_frame_and_region(session: Session) -> None:
+    driver = CopyDriver()
+    fake = SqliteSession(session, driver)
+    writer = _writer(fake)
+    assert writer.due
+
+    asyncio.run(writer.flush())
+    assert driver.copies == [("run_series", ROWS, SERIES_COLUMNS)]
+    assert fake.commits == 1
+    assert not writer.due
+    asyncio.run(writer.flush())
+    assert len(driver.copies) == 1
+
+
+def test_drivers_without_copy_insert_the_same_rows(session: Session) -> None:
+    fake = SqliteSession(session)
+    asyncio.run(_writer(fake).flush())
+
+    table = RunSeries.__table__
+    stored = session.execute(
+        select(*(table.c[name] for name in SERIES_COLUMNS)).order_by(table.c.id)
+    ).all()
+    assert [tuple(row) for row in stored] == ROWS
+    assert fake.commits == 1
+
+
+def _chunks(session: Session, run_id: str) -> list[tuple]:
+    table = RunSeriesChunks.__table__
+    stmt = select(table.c.artifact_id, table.c.t_start, table.c.t_end, table.c.frames)
+    return [tuple(row) for row in session.execute(stmt.where(table.c.run_id == run_id))]
+
+
+def _store_chunks(fake: SqliteSession, run_id: str, frames: int) -> RunSeriesChunkWriter:
+    """Write ``frames`` frames for ``run_id`` in flushed chunks of two, ``t`` counting from 0."""
+
+    writer = RunSeriesChunkWriter(fake, run_id, REGIONS, rt=2.5, batch_frames=2)
+    for start in range(0, frames, 2):
+        writer.add_frames(np.array([start, start + 1]), DATA, NEW_CASES)
+        asyncio.run(writer.flush())
+    return writer
+
+
+def test_truncate_keeps_chunks_up_to_the_checkpoint(session: Session) -> None:
+    fake = SqliteSession(session)
+    writer = _store_chunks(fake, "run-1", 6)
+
+    asyncio.run(writer.truncate(after_t=3))
+    assert [t_start for _, t_start, _, _ in _chunks(session, "run-1")] == [0, 2]
+    asyncio.run(writer.truncate())
+    assert _chunks(session, "run-1") == []
+
+
+def test_prefix_copies_whole_chunks_under_the_new_artifact(session: Session) -> None:
+    fake = SqliteSession(session)
+    _store_chunks(fake, "source", 6)
+    writer = RunSeriesChunkWriter(fake, "branch", REGIONS, rt=2.5, batch_frames=2)
+
+    assert asyncio.run(writer.copy_prefix("source", last_t=3, frames=4))
+    assert _chunks(session, "branch") == [("branch:series", 0, 1, 2), ("branch:series", 2, 3, 2)]
+    assert session.get(Artifacts, "branch:series").run_id == "branch"
+    session.rollback()
+    assert not asyncio.run(writer.copy_prefix("source", last_t=3, frames=5))
+
+
+def test_finish_writes_the_last_partial_chunk(session: Session) -> None:
+    fake = SqliteSession(session)
+    writer = _store_chunks(fake, "run-1", 2)
+    writer.add_frames(np.array([2]), DATA[:1], NEW_CASES[:1])
+    assert not writer.due
+
+    asyncio.run(writer.finish())
+    assert _chunks(session, "run-1") == [("run-1:series", 0, 1, 2), ("run-1:series", 2, 2, 1)]
+    payloads = session.scalars(select(RunSeriesChunks.payload).order_by(RunSeriesChunks.t_start))
+    sizes = []
+    for payload in payloads:
+        sizes.append(len(payload))
+        times, regions, values = decode_chunk(payload)
+        assert regions == REGIONS
+    assert times == [2]
+    assert np.array_equal(values[0, :5], DATA[0])
+    assert values[0, 5].tolist() == NEW_CASES[0].tolist()
+    assert session.get(Artifacts, "run-1:series").bytes == sum(sizes)
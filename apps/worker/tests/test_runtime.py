@@ -0,0 +1,49 @@
+import asyncio
+import signal
+import threading
+
+import pytest
+
+from epidemic_sim_worker import runtime
+
+
+class JobTimeoutError(Exception):
+    pass
+
+
+def _timeout(signum, frame) -> None:
+    raise JobTimeoutError
+
+
+@pytest.fixture
+def shared_loop(monkeypatch: pytest.MonkeyPatch):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(runtime, "_loop", loop)
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_interrupted_jobs_cancel_their_coroutine(shared_loop: asyncio.AbstractEventLoop) -> None:
+    cancelled = threading.Event()
+
+    async def job() -> None:
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    previous = signal.signal(signal.SIGALRM, _timeout)
+    try:
+        signal.setitimer(signal.ITIMER_REAL, 0.05)
+        with pytest.raises(JobTimeoutError):
+            runtime.run(job())
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+    assert cancelled.wait(timeout=5)
+    assert runtime.run(asyncio.sleep(0, result="next job")) == "next job"
@@ -1,6 +1,6 @@
 import numpy as np
 
-from epidemic_sim_worker.simulation.model import NpiSchedule, SeirdParams, simulate
+from epidemic_sim_worker.simulation.model import NpiSchedule, SeirdParams, simulate, simulate_iter
 
 
 def test_population_conservation() -> None:
@@ -24,3 +24,91 @@ def test_population_conservation() -> None:
     frames = simulate(initial_state, params, horizon=10, npi_schedule=[NpiSchedule(day=5, beta_multiplier=0.8)])
     total = frames["S"] + frames["E"] + frames["I"] + frames["R"] + frames["D"]
     assert np.allclose(total, population, atol=1e-3)
+
+
+def test_fused_mode_matches_stepwise() -> None:
+    population = np.array([1000.0, 1500.0, 800.0])
+    mobility = np.full((3, 3), 0.01)
+    params = SeirdParams(
+        beta=0.3,
+        sigma=0.2,
+        gamma=0.1,
+        mu=0.01,
+        dt=0.5,
+        population=population,
+        mobility=mobility,
+    )
+    initial_state = {
+        "S": population - 10,
+        "E": np.zeros(3),
+        "I": np.full(3, 10.0),
+        "R": np.zeros(3),
+        "D": np.zeros(3),
+    }
+    schedule = [NpiSchedule(day=4, beta_multiplier=0.5, mobility_multiplier=0.2)]
+    stepwise = simulate(initial_state, params, horizon=20, npi_schedule=schedule, mode="stepwise")
+    fused = simulate(initial_state, params, horizon=20, npi_schedule=schedule, mode="fused")
+    for name in ("S", "E", "I", "R", "D"):
+        assert np.array_equal(stepwise[name], fused[name])
+
+
+def test_output_interval_decouples_frames_from_dt() -> None:
+    population = np.array([1000.0, 1500.0, 800.0])
+    params = SeirdParams(0.3, 0.2, 0.1, 0.01, 0.25, population, np.full((3, 3), 0.01))
+    initial_state = {
+        "S": population - 10,
+        "E": np.zeros(3),
+        "I": np.full(3, 10.0),
+        "R": np.zeros(3),
+        "D": np.zeros(3),
+    }
+    schedule = [NpiSchedule(day=6, beta_multiplier=0.5)]
+    every_step = simulate(
+        initial_state, params, horizon=21, npi_schedule=schedule, output_interval=0.25
+    )
+    weekly = simulate(initial_state, params, horizon=21, npi_schedule=schedule, output_interval=7)
+    for name in ("S", "E", "I", "R", "D"):
+        assert weekly[name].shape == (4, 3)
+        assert np.array_equal(weekly[name], every_step[name][::28])
+
+
+def test_float32_frames_share_one_buffer() -> None:
+    population = np.array([1000.0, 1500.0])
+    params = SeirdParams(0.3, 0.2, 0.1, 0.01, 0.5, population, np.full((2, 2), 0.01))
+    initial_state = {
+        "S": population - 10,
+        "E": np.zeros(2),
+        "I": np.full(2, 10.0),
+        "R": np.zeros(2),
+        "D": np.zeros(2),
+    }
+    full = simulate(initial_state, params, horizon=30)
+    compact = simulate(initial_state, params, horizon=30, frame_dtype="float32")
+
+    assert compact.data.shape == (31, 5, 2)
+    assert compact.data.dtype == np.float32
+    assert compact.data.flags.c_contiguous
+    assert np.shares_memory(compact["I"], compact.data)
+    assert np.allclose(compact.data, full.data, rtol=1e-6)
+
+
+def test_simulate_iter_chunks_match_simulate() -> None:
+    population = np.array([1000.0, 1500.0, 800.0])
+    params = SeirdParams(0.3, 0.2, 0.1, 0.01, 0.5, population, np.full((3, 3), 0.01))
+    initial_state = {
+        "S": population - 10,
+        "E": np.zeros(3),
+        "I": np.full(3, 10.0),
+        "R": np.zeros(3),
+        "D": np.zeros(3),
+    }
+    schedule = [NpiSchedule(day=9, beta_multiplier=0.5, mobility_multiplier=0.2)]
+    for integrator in ("rk4", "tau-leap"):
+        whole = simulate(initial_state, params, 40, schedule, integrator=integrator, seed=3)
+        chunks = list(
+            simulate_iter(
+                initial_state, params, 40, schedule, integrator=integrator, seed=3, chunk_frames=7
+            )
+        )
+        assert [chunk.start_frame for chunk in chunks] == [0, 7, 14, 21, 28, 35]
+        assert np.array_equal(np.concatenate([chunk.data for chunk in chunks]), whole.data)
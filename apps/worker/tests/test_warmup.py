@@ -0,0 +1,45 @@
+import numpy as np
+
+from epidemic_sim_worker.simulation.adaptive import _dopri5_ensemble, _integrate_dopri5
+from epidemic_sim_worker.simulation.ensemble import (
+    EnsembleParams,
+    _integrate_ensemble,
+    simulate_ensemble,
+)
+from epidemic_sim_worker.simulation.model import SeirdParams, _integrate_rk4, simulate
+from epidemic_sim_worker.simulation.stochastic import _tau_leap, _tau_leap_ensemble
+from epidemic_sim_worker.simulation.warmup import warm_up
+
+
+def test_warm_up_covers_integer_engine_settings() -> None:
+    warm_up()
+    kernels = (
+        _integrate_rk4,
+        _integrate_dopri5,
+        _tau_leap,
+        _integrate_ensemble,
+        _dopri5_ensemble,
+        _tau_leap_ensemble,
+    )
+    compiled = [len(kernel.signatures) for kernel in kernels]
+
+    population = np.array([500.0, 700.0])
+    initial_state = {
+        "S": population - 5,
+        "E": np.zeros(2),
+        "I": np.full(2, 5.0),
+        "R": np.zeros(2),
+        "D": np.zeros(2),
+    }
+    params = SeirdParams(1, 0.2, 0.1, 0, 1, population, np.full((2, 2), 0.01))
+    for integrator in ("rk4", "dopri5", "tau-leap"):
+        simulate(initial_state, params, 3, integrator=integrator, rtol=1, atol=1, output_interval=1)
+        simulate_ensemble(
+            initial_state,
+            EnsembleParams.from_members([params] * 3),
+            3,
+            integrator=integrator,
+            frame_dtype="float32",
+        )
+
+    assert [len(kernel.signatures) for kernel in kernels] == compiled
@@ -49,10 +49,13 @@ export type Run = {
   started_at?: string | null;
   finished_at?: string | null;
   metrics_summary?: Record<string, unknown> | null;
+  fingerprint?: string | null;
+  results_run_id?: string | null;
 };
 
 export type RunCreateRequest = {
   scenario_id: string;
   engine: EngineCfg;
   seed: number;
+  recompute?: boolean;
 };
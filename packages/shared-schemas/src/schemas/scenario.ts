@@ -7,6 +7,13 @@ export const engineSchema = z.object({
   seed: z.number().int().nonnegative(),
   dt: z.number().positive(),
   horizon: z.number().int().positive(),
+  mode: z.enum(['stepwise', 'fused']).optional(),
+  integrator: z.enum(['rk4', 'dopri5', 'tau-leap']).optional(),
+  rtol: z.number().positive().optional(),
+  atol: z.number().positive().optional(),
+  output_interval: z.number().int().positive().optional(),
+  frame_dtype: z.enum(['float64', 'float32']).optional(),
+  ensemble_members: z.number().int().min(1).max(64).optional(),
 });
 
 export const npiSchema = z.object({